@@ -0,0 +1,212 @@
+import logging
+
+import pandas as pd
+
+import domains
+
+"""
+Tablas de agregados para las preguntas de la prueba, mantenidas por load.py a medida que se
+cargan datos nuevos:
+
+a. agg_runtime: cantidad, suma, promedio, mínimo y máximo de averageRuntime de los shows.
+b. agg_genre_counts: cantidad de shows por género.
+c. agg_domains: dominios registrables únicos del sitio oficial de los shows (a partir de
+   show_domains y domain_dim, que carga load.py con los dominios de clean.domains_creation).
+
+En lugar de recalcular todo en cada carga, solo se recalculan las claves (géneros y dominios)
+que tocan los shows cargados, y el runtime se ajusta con la diferencia entre el aporte anterior
+y el nuevo de esos shows. check_aggregates recalcula todo desde cero y lo compara.
+"""
+
+SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_shows_average_runtime ON shows (averageRuntime);
+
+CREATE TABLE IF NOT EXISTS agg_runtime (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    show_count INTEGER NOT NULL,
+    runtime_sum REAL NOT NULL,
+    avg_runtime REAL,
+    min_runtime REAL,
+    max_runtime REAL
+);
+
+CREATE TABLE IF NOT EXISTS agg_genre_counts (
+    genre_id INTEGER PRIMARY KEY,
+    genre TEXT NOT NULL,
+    show_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS agg_domains (
+    domain TEXT PRIMARY KEY,
+    show_count INTEGER NOT NULL
+);
+"""
+
+TABLES = ("agg_runtime", "agg_genre_counts", "agg_domains")
+
+# Consultas que calculan los agregados desde las tablas base; {where} restringe las claves
+RUNTIME_SQL = """
+SELECT 1 AS id, COUNT(averageRuntime) AS show_count, TOTAL(averageRuntime) AS runtime_sum,
+       AVG(averageRuntime) AS avg_runtime, MIN(averageRuntime) AS min_runtime,
+       MAX(averageRuntime) AS max_runtime
+FROM shows
+"""
+GENRE_COUNTS_SQL = """
+SELECT g.genre_id, d.name AS genre, COUNT(*) AS show_count
+FROM genres g JOIN genre_dim d ON d.id = g.genre_id
+{where}
+GROUP BY g.genre_id
+"""
+DOMAINS_SQL = """
+SELECT d.name AS domain, COUNT(*) AS show_count
+FROM show_domains s JOIN domain_dim d ON d.id = s.domain_id
+WHERE s.source = 'officialSite' {where}
+GROUP BY s.domain_id
+"""
+
+
+def is_initialized(conn):
+    """
+    :argumento conn: sqlite3.Connection
+    :return: BOOL, True si los agregados ya fueron calculados al menos una vez.
+    """
+    return conn.execute("SELECT COUNT(*) FROM agg_runtime").fetchone()[0] == 1
+
+
+def collect_keys(conn):
+    """
+    Registra los géneros y dominios de los shows de la tabla temporal stage_shows, y devuelve
+    su aporte al runtime. Se llama antes y después de la carga para cubrir valores viejos y nuevos.
+    :argumento conn: sqlite3.Connection
+    :return: TUPLA (cantidad, suma) de averageRuntime de esos shows.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS stage_genre_keys (genre_id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS stage_domain_keys (domain TEXT PRIMARY KEY)")
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO stage_genre_keys
+        SELECT genre_id FROM genres WHERE show_id IN (SELECT id FROM stage_shows)
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO stage_domain_keys
+        SELECT d.name FROM show_domains s JOIN domain_dim d ON d.id = s.domain_id
+        WHERE s.source = 'officialSite' AND s.show_id IN (SELECT id FROM stage_shows)
+        """
+    )
+    return conn.execute(
+        """
+        SELECT COUNT(averageRuntime), TOTAL(averageRuntime)
+        FROM shows WHERE id IN (SELECT id FROM stage_shows)
+        """
+    ).fetchone()
+
+
+def refresh_aggregates(conn, old_runtime):
+    """
+    Actualiza los agregados de forma incremental para los shows cargados (stage_shows), una
+    vez cargados sus géneros y dominios.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    :argumento old_runtime: TUPLA (cantidad, suma) devuelta por collect_keys antes de la carga.
+    :return: INT con el número de filas modificadas.
+    """
+    before = conn.total_changes
+    new_runtime = collect_keys(conn)
+
+    conn.execute(
+        "UPDATE agg_runtime SET show_count = show_count + ?, runtime_sum = runtime_sum + ?",
+        (new_runtime[0] - old_runtime[0], new_runtime[1] - old_runtime[1]),
+    )
+    # El mínimo y el máximo se leen del índice sobre shows.averageRuntime
+    conn.execute(
+        """
+        UPDATE agg_runtime SET
+            avg_runtime = CASE WHEN show_count > 0 THEN runtime_sum / show_count END,
+            min_runtime = (SELECT MIN(averageRuntime) FROM shows),
+            max_runtime = (SELECT MAX(averageRuntime) FROM shows)
+        """
+    )
+    conn.execute(
+        "DELETE FROM agg_genre_counts WHERE genre_id IN (SELECT genre_id FROM stage_genre_keys)"
+    )
+    conn.execute(
+        "INSERT INTO agg_genre_counts "
+        + GENRE_COUNTS_SQL.format(
+            where="WHERE g.genre_id IN (SELECT genre_id FROM stage_genre_keys)"
+        )
+    )
+    conn.execute("DELETE FROM agg_domains WHERE domain IN (SELECT domain FROM stage_domain_keys)")
+    conn.execute(
+        "INSERT INTO agg_domains "
+        + DOMAINS_SQL.format(where="AND d.name IN (SELECT domain FROM stage_domain_keys)")
+    )
+    return conn.total_changes - before
+
+
+def rebuild_aggregates(conn):
+    """
+    Recalcula todos los agregados desde las tablas base.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    :return: INT con el número de filas modificadas.
+    """
+    before = conn.total_changes
+    conn.execute("DELETE FROM agg_runtime")
+    conn.execute("INSERT INTO agg_runtime " + RUNTIME_SQL)
+    conn.execute("DELETE FROM agg_genre_counts")
+    conn.execute("INSERT INTO agg_genre_counts " + GENRE_COUNTS_SQL.format(where=""))
+    conn.execute("DELETE FROM agg_domains")
+    conn.execute("INSERT INTO agg_domains " + DOMAINS_SQL.format(where=""))
+    return conn.total_changes - before
+
+
+def check_aggregates(conn):
+    """
+    Recalcula los agregados desde cero y los compara con los mantenidos de forma incremental.
+    :argumento conn: sqlite3.Connection
+    :return: DICCIONARIO tabla -> DATAFRAME con las filas que difieren (vacío si todo coincide).
+    """
+    shows = pd.read_sql("SELECT id, officialSite, url, webChannel_site FROM shows", conn)
+    checks = {
+        "show_domains": (
+            domains.show_domain_links(shows),
+            """
+            SELECT s.show_id, s.source, d.name AS domain
+            FROM show_domains s JOIN domain_dim d ON d.id = s.domain_id
+            """,
+            ["show_id", "source"],
+        ),
+        "agg_runtime": (
+            pd.read_sql(RUNTIME_SQL, conn),
+            "SELECT * FROM agg_runtime",
+            ["id"],
+        ),
+        "agg_genre_counts": (
+            pd.read_sql(GENRE_COUNTS_SQL.format(where=""), conn),
+            "SELECT * FROM agg_genre_counts",
+            ["genre_id"],
+        ),
+        "agg_domains": (
+            pd.read_sql(DOMAINS_SQL.format(where=""), conn),
+            "SELECT * FROM agg_domains",
+            ["domain"],
+        ),
+    }
+    differences = {}
+    for table, (expected, maintained_sql, key) in checks.items():
+        maintained = pd.read_sql(maintained_sql, conn)
+        merged = expected.merge(
+            maintained, on=key, how="outer", suffixes=("_esperado", "_mantenido"), indicator=True
+        )
+        mismatch = merged["_merge"] != "both"
+        for column in expected.columns.difference(key):
+            left, right = merged[f"{column}_esperado"], merged[f"{column}_mantenido"]
+            if pd.api.types.is_float_dtype(left) or pd.api.types.is_float_dtype(right):
+                same = (left - right).abs() <= 1e-6 * right.abs().clip(lower=1)
+            else:
+                same = left == right
+            mismatch |= ~(same | (left.isna() & right.isna()))
+        differences[table] = merged[mismatch]
+        if mismatch.any():
+            logging.warning(f"{table}: {int(mismatch.sum())} filas no coinciden")
+    return differences
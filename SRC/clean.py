@@ -1,39 +1,53 @@
 import os
+import argparse
+import html
+import shutil
 import pandas as pd
-import ast  # Para convertir cadenas en listas reales
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import logging
 
+import domains
+import instrumentation
+import schema
+import validate
 
 """
 Script para limpiar los datos de los episodios y shows a partir de las sugerencias incluidas
 en el análisis.
 
 Se eliminarán columnas innecesarias, se creará un nuevo dataframe llamado genres para
-normalizar la información, se crearán 3 nuevos dataframes y se guardarán tanto en CSV como en formato parquet.
+normalizar la información, se extraerán los dominios de las URLs de los shows, se quitará el
+HTML de los resúmenes, se crearán 3 nuevos dataframes y se guardarán en formato parquet.
+Los datos de entrada son los Parquet tipados generados por dfs_creation.py, que se validan
+con validate.py antes de limpiarlos (las filas inválidas quedan en DATA/quarantine). En ellos
+genres y schedule_days ya son listas, por lo que no hay que volver a interpretar cadenas.
 """
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 # directorios y rutas base
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
-os.makedirs(DATA_FOLDER, exist_ok=True)
-episodes_path = os.path.join(DATA_FOLDER, "episodes.csv")
-shows_path = os.path.join(DATA_FOLDER, "shows.csv")
+episodes_path = os.path.join(DATA_FOLDER, "episodes.parquet")
+shows_path = os.path.join(DATA_FOLDER, "shows.parquet")
+# Dataset de episodios particionado por fecha de emisión (year=/month=/day=)
+EPISODES_DATASET_NAME = "episodes_cleaned"
+EPISODES_DATASET = os.path.join(DATA_FOLDER, EPISODES_DATASET_NAME)
+ROW_GROUP_SIZE = 64 * 1024
+WRITE_MODES = ("overwrite", "overwrite_partitions", "append")
+HTML_TAG = r"<[^>]*>"
 
 
+@instrumentation.timed("clean_load_data", rows=lambda dfs: len(dfs[0]))
 def load_data(episodes_path, shows_path):
     """
-    Carga los dataframes de los archivos CSV en la carpeta DATA.
+    Carga los dataframes de los archivos Parquet intermedios en la carpeta DATA, con los
+    dtypes de schema.py.
     :argumento episodes_path: STRING con la ruta del archivo de episodio.
     :argumento shows_path: STRING con la ruta del archivo de shows.
     :return: DATAFRAMES de episodios y shows editados.
     """
-    episodes_df = pd.read_csv(episodes_path)
-    shows_df = pd.read_csv(shows_path)
+    episodes_df = schema.apply_dtypes(pd.read_parquet(episodes_path), schema.EPISODES)
+    shows_df = schema.apply_dtypes(pd.read_parquet(shows_path), schema.SHOWS)
     return episodes_df, shows_df
 
 
@@ -52,6 +66,7 @@ def delete_unnecessary_columns(episodes_df, shows_df):
     return episodes_df, shows_df
 
 
+@instrumentation.timed(rows=lambda result: len(result[0]))
 def genres_creation(shows_df):
     """
     Extrae la información de los géneros de las series y crea un nuevo dataframe con la información normalizada.
@@ -59,10 +74,7 @@ def genres_creation(shows_df):
     :return: DATAFRAME de géneros
     :return: DATAFRAME de shows sin columna genre (normalizado).
     """
-    # convierto la cadena en listas, para luego hacerles un explode
-    shows_df["genres"] = shows_df["genres"].apply(
-        lambda x: ast.literal_eval(x) if isinstance(x, str) else x
-    )
+    # genres ya llega como lista desde el Parquet intermedio, se le hace un explode directamente
     shows_exploded = shows_df[["id", "genres"]].explode("genres").reset_index(drop=True)
     shows_df = shows_df.drop(
         columns=["genres"], errors="ignore"
@@ -75,38 +87,222 @@ def genres_creation(shows_df):
     genres_df.insert(
         0, "id", range(1, len(genres_df) + 1)
     )  # Añadir columna 'id', autoincremental
-    return genres_df, shows_df
+    return schema.apply_dtypes(genres_df, schema.GENRES), shows_df
 
 
-def save_as_parquet(episodes_df, shows_df, genres_df):
+@instrumentation.timed(rows=len)
+def domains_creation(shows_df):
     """
-    Almacena 3 dataframes que han sido limpiados en formato parquet
-    :argumento episodes_df: DATAFRAME de episodios.
+    Agrega a shows el dominio registrable de officialSite, url y webChannel_site
+    (officialSite_domain, url_domain y webChannel_domain), extraído de forma vectorizada con
+    domains.py. load.py los normaliza en domain_dim y show_domains.
     :argumento shows_df: DATAFRAME de shows.
-    :argumento genres_df: DATAFRAME de géneros.
+    :return: DATAFRAME de shows con las columnas de dominio.
+    """
+    return domains.add_domain_columns(shows_df)
+
+
+@instrumentation.timed(rows=len)
+def strip_html(shows_df, columns=("summary",)):
+    """
+    Convierte las entidades (&amp;) de los textos de los shows en caracteres y quita las
+    etiquetas HTML (<p>, <b>, <br />...), para mostrarlos e indexarlos en la búsqueda de texto
+    de load.py. Las entidades se convierten primero, así una etiqueta escapada (&lt;b&gt;)
+    también se quita; html.unescape solo se aplica a las filas que tienen un &, y las
+    etiquetas y los espacios repetidos se reemplazan en la columna completa.
+    :argumento shows_df: DATAFRAME de shows.
+    :argumento columns: columnas de texto con HTML.
+    :return: DATAFRAME de shows con los textos planos (None si quedan vacíos).
+    """
+    converted = {}
+    for column in columns:
+        text = shows_df[column].astype(schema.STRING)
+        entities = text.str.contains("&", regex=False).fillna(False)
+        if entities.any():
+            text = text.mask(entities, text[entities].map(html.unescape)).astype(schema.STRING)
+        text = text.str.replace(HTML_TAG, " ", regex=True)
+        text = text.str.replace(r"[\s\xa0]+", " ", regex=True).str.strip()
+        converted[column] = text.mask((text == "").fillna(False))
+    return shows_df.assign(**converted)
+
+
+def add_partition_columns(episodes_df):
+    """
+    Agrega las columnas year, month y day a partir de airdate (YYYY-MM-DD) para particionar.
+    :argumento episodes_df: DATAFRAME de episodios.
+    :return: DATAFRAME de episodios con las columnas de partición.
+    """
+    airdate = pd.to_datetime(episodes_df["airdate"], format="%Y-%m-%d", errors="coerce")
+    return episodes_df.assign(
+        year=airdate.dt.year.astype(schema.PARTITIONS["year"]),
+        month=airdate.dt.month.astype(schema.PARTITIONS["month"]),
+        day=airdate.dt.day.astype(schema.PARTITIONS["day"]),
+    )
+
+
+def _count_written_file(written_file):
+    instrumentation.count(
+        "bytes_written_total", written_file.size, stage="save_as_parquet"
+    )
+
+
+def save_episodes_dataset(
+    episodes_df,
+    dataset_path=EPISODES_DATASET,
+    mode="overwrite_partitions",
+    row_group_size=ROW_GROUP_SIZE,
+):
+    """
+    Guarda los episodios como un dataset Parquet particionado estilo Hive por airdate
+    (year/month/day), con estadísticas y codificación por diccionario.
+    :argumento episodes_df: DATAFRAME de episodios.
+    :argumento dataset_path: STRING con la carpeta del dataset.
+    :argumento mode: STRING, uno de:
+        overwrite: borra el dataset completo y lo vuelve a escribir.
+        overwrite_partitions: reemplaza solo las particiones (días) presentes en episodes_df.
+        append: agrega archivos nuevos a las particiones sin borrar los existentes.
+    :argumento row_group_size: INT con el número máximo de filas por grupo de filas.
     :return: None
     """
-    episodes_df.to_parquet(
-        os.path.join(DATA_FOLDER, "episodes_cleaned.parquet"),
-        index=False,
-        compression="snappy",
+    if mode not in WRITE_MODES:
+        raise ValueError(f"Modo de escritura no soportado: {mode}")
+    if mode == "overwrite" and os.path.exists(dataset_path):
+        shutil.rmtree(dataset_path)
+
+    table = schema.to_arrow(
+        add_partition_columns(episodes_df), {**schema.EPISODES, **schema.PARTITIONS}
     )
-    shows_df.to_parquet(
-        os.path.join(DATA_FOLDER, "shows_cleaned.parquet"),
-        index=False,
-        compression="snappy",
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression="snappy", use_dictionary=True, write_statistics=True
     )
-    genres_df.to_parquet(
-        os.path.join(DATA_FOLDER, "genres_cleaned.parquet"),
-        index=False,
-        compression="snappy",
+    # En modo append cada escritura usa un nombre de archivo distinto para no pisar los anteriores
+    if mode == "append":
+        basename = f"part-{pd.Timestamp.now():%Y%m%d%H%M%S%f}-{{i}}.parquet"
+    else:
+        basename = "part-{i}.parquet"
+    ds.write_dataset(
+        table,
+        dataset_path,
+        format="parquet",
+        partitioning=["year", "month", "day"],
+        partitioning_flavor="hive",
+        file_options=file_options,
+        basename_template=basename,
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024),
+        existing_data_behavior=(
+            "overwrite_or_ignore" if mode == "append" else "delete_matching"
+        ),
+        file_visitor=_count_written_file if instrumentation.enabled() else None,
     )
+
+
+@instrumentation.timed()
+def merge_saved(df, file_path, dtypes):
+    """
+    Combina un DataFrame de shows o géneros con el Parquet limpio ya guardado: se reemplazan
+    las filas de los shows presentes en df y se conservan las de los demás.
+    :argumento df: DATAFRAME de shows (clave id) o de géneros (clave show_id).
+    :argumento file_path: STRING con la ruta del Parquet guardado.
+    :argumento dtypes: DICCIONARIO columna -> dtype de schema.py.
+    :return: DATAFRAME combinado.
+    """
+    if not os.path.exists(file_path):
+        return df
+    key = "show_id" if "show_id" in dtypes else "id"
+    saved = pd.read_parquet(file_path)
+    saved = saved[~saved[key].isin(df[key].dropna())]
+    merged = pd.concat([saved, df], ignore_index=True)
+    if key == "show_id":
+        merged["id"] = range(1, len(merged) + 1)  # los ids de géneros son autoincrementales
+    return schema.apply_dtypes(merged, dtypes)
+
+
+def save_as_parquet(
+    episodes_df,
+    shows_df,
+    genres_df,
+    mode="overwrite_partitions",
+    row_group_size=ROW_GROUP_SIZE,
+    data_folder=DATA_FOLDER,
+    partial=False,
+):
+    """
+    Almacena 3 dataframes que han sido limpiados en formato parquet. Los episodios se guardan
+    particionados por fecha, de modo que una ejecución diaria solo toca sus particiones.
+    :argumento episodes_df: DATAFRAME de episodios.
+    :argumento shows_df: DATAFRAME de shows.
+    :argumento genres_df: DATAFRAME de géneros.
+    :argumento mode: STRING con el modo de escritura de los episodios (ver save_episodes_dataset).
+    :argumento row_group_size: INT con el número máximo de filas por grupo de filas.
+    :argumento data_folder: STRING con la ruta de la carpeta donde se guardarán los archivos
+        (los episodios en su subcarpeta episodes_cleaned).
+    :argumento partial: BOOL, True si los dataframes tienen solo los días modificados
+        (dfs_creation.py --changed-only): los shows y géneros se combinan con los ya guardados
+        en lugar de reemplazarlos.
+    :return: None
+    """
+    os.makedirs(data_folder, exist_ok=True)
+    save_episodes_dataset(
+        episodes_df,
+        os.path.join(data_folder, EPISODES_DATASET_NAME),
+        mode=mode,
+        row_group_size=row_group_size,
+    )
+    # Las columnas category se guardan como texto, ver schema.py
+    for df, dtypes, file_name in (
+        (shows_df, schema.SHOWS, "shows_cleaned.parquet"),
+        (genres_df, schema.GENRES, "genres_cleaned.parquet"),
+    ):
+        file_path = os.path.join(data_folder, file_name)
+        if partial:
+            df = merge_saved(df, file_path, dtypes)
+        pq.write_table(schema.to_arrow(df, dtypes), file_path, compression="snappy")
+        if instrumentation.enabled():
+            instrumentation.count(
+                "bytes_written_total", os.path.getsize(file_path), stage="save_as_parquet"
+            )
     logging.info("Dataframes guardados en formato parquet.")
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Limpia los Parquet de dfs_creation.py y guarda los Parquet limpios.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(description="Limpia los datos y los guarda en Parquet")
+    parser.add_argument(
+        "--mode",
+        choices=WRITE_MODES,
+        default="overwrite_partitions",
+        help="Modo de escritura del dataset de episodios",
+    )
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE)
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Los Parquet intermedios tienen solo los días modificados (dfs_creation.py "
+        "--changed-only): combina los shows y géneros con los ya guardados",
+    )
+    args = parser.parse_args(argv)
+
     episodios, shows = load_data(episodes_path, shows_path)
+    episodios, shows, _ = validate.validate(episodios, shows)
     episodios_clean, shows_clean = delete_unnecessary_columns(episodios, shows)
     genres_clean, shows_clean = genres_creation(shows_clean)
-    save_as_parquet(episodios_clean, shows_clean, genres_clean)
+    shows_clean = domains_creation(shows_clean)
+    shows_clean = strip_html(shows_clean)
+    save_as_parquet(
+        episodios_clean,
+        shows_clean,
+        genres_clean,
+        mode=args.mode,
+        row_group_size=args.row_group_size,
+        partial=args.changed_only,
+    )
     logging.info("Proceso de limpieza finalizado.")
+
+
+if __name__ == "__main__":
+    main()
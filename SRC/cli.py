@@ -0,0 +1,70 @@
+import sys
+import argparse
+import importlib
+
+"""
+Línea de comandos única del ETL, con un comando por etapa:
+
+    python SRC/cli.py extract --start 2024-01-01 --end 2024-01-31
+    python SRC/cli.py clean --mode overwrite
+    python SRC/cli.py read --backend arrow
+    python SRC/cli.py pipeline --from-stage transform
+
+Cada comando ejecuta el main del script correspondiente con los mismos argumentos (y
+`python SRC/cli.py <comando> --help` muestra su ayuda). Este módulo solo usa la biblioteca
+estándar y cada script se importa al ejecutar su comando, así que pandas, pyarrow o requests
+solo se cargan si el comando los necesita. Los scripts configuran los logs y la
+instrumentación en su main, no al importarse. `benchmarks/bench_startup.py` mide el tiempo de
+importación de cada comando con `python -X importtime` y lo compara con un presupuesto.
+"""
+
+# comando -> (módulo, descripción)
+COMMANDS = {
+    "extract": ("extract", "Extrae la programación web de TVMaze a JSON"),
+    "transform": ("dfs_creation", "Crea los DataFrames de episodios y shows y los perfila"),
+    "validate": ("validate", "Valida los DataFrames y aparta las filas inválidas"),
+    "clean": ("clean", "Limpia los datos y los guarda en Parquet"),
+    "load": ("load", "Carga los Parquet limpios en SQLite"),
+    "read": ("read", "Responde las preguntas de la prueba"),
+    "query": ("query_service", "Consultas con pool y caché, o el endpoint HTTP"),
+    "pipeline": ("pipeline", "Ejecuta el proceso completo en un solo proceso"),
+    "raw": ("raw_store", "Migra los archivos crudos a otro formato"),
+    "schema": ("schema", "Muestra la memoria por columna con y sin los dtypes"),
+}
+
+
+def build_parser():
+    """
+    :return: argparse.ArgumentParser que solo interpreta el nombre del comando.
+    """
+    commands = "\n".join(f"  {name:<10} {desc}" for name, (_, desc) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Ejecuta una etapa del ETL de TVMaze",
+        epilog=f"comandos:\n{commands}",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "command", choices=COMMANDS, metavar="comando", help="Ver la lista de comandos abajo"
+    )
+    return parser
+
+
+def main(argv=None):
+    """
+    Ejecuta el main del script del comando con el resto de los argumentos.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS:
+        # Sin un comando válido argparse muestra la ayuda o el error y termina
+        build_parser().parse_args(argv[:1])
+    command, args = argv[0], argv[1:]
+    module = importlib.import_module(COMMANDS[command][0])
+    # argparse toma el nombre del programa de sys.argv[0] para el uso de cada script
+    sys.argv[0] = f"cli.py {command}"
+    return module.main(args)
+
+
+if __name__ == "__main__":
+    main()
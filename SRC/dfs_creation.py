@@ -1,167 +1,579 @@
 import os
-import json
+import argparse
+import itertools
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
-from ydata_profiling import ProfileReport
-
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+import http_cache
+import instrumentation
+import profile_stats
+import raw_store
+import schema
 
 # Definir la carpeta donde están los JSON para leerlos y general los DatagFrames
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_FOLDER = os.path.join(BASE_DIR, "..", "JSON")
 DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
 PROFILING_FOLDER = os.path.join(BASE_DIR, "..", "profiling")
+STATS_FOLDER = os.path.join(PROFILING_FOLDER, "stats")
+EPISODES_STATS_FOLDER = os.path.join(STATS_FOLDER, "episodes")
+
+
+def list_json_files(json_folder: str, dates=None) -> list:
+    """
+    Lista los archivos tv_shows_* de la carpeta, ordenados por fecha, en cualquiera de los
+    formatos de raw_store.py (.json, .ndjson.gz, .ndjson.zst).
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento dates: colección opcional de fechas YYYY-MM-DD a incluir (p. ej. las nuevas o
+        modificadas según http_cache.changed_dates); si es None se incluyen todas.
+    :return: LISTA de rutas de archivos.
+    """
+    return [path for _, path in raw_store.list_raw_files(json_folder, dates)]
+
+
+def iter_json_files(json_folder: str, dates=None):
+    """
+    Recorre los archivos JSON uno a uno, de modo que en memoria solo hay un archivo a la vez.
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento dates: colección opcional de fechas a incluir.
+    :return: GENERADOR de tuplas (ruta, lista de episodios del archivo).
+    """
+    for file_path in list_json_files(json_folder, dates):
+        data = raw_store.read_raw(file_path)  # Cargar el JSON
+        if instrumentation.enabled():
+            instrumentation.count(
+                "bytes_read_total", os.path.getsize(file_path), stage="read_json"
+            )
+        yield file_path, data
+
+
+def iter_episodes(json_folder: str, dates=None):
+    """
+    Genera los episodios de todos los archivos JSON sin acumularlos en una lista.
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento dates: colección opcional de fechas a incluir.
+    :return: GENERADOR de diccionarios de episodios.
+    """
+    for _, data in iter_json_files(json_folder, dates):
+        yield from data
 
 
+@instrumentation.timed(rows=len)
 def load_json_files(json_folder: str) -> list:
     """
     Carga todos los archivos JSON en una lista.
     :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
     :return: LISTA con los datos combinados de todos los archivos JSON.
     """
-    all_data = []
-    for file_name in os.listdir(json_folder):  # Recorre archivos en la carpeta
-        if file_name.endswith(".json"):  # asegurarnos de que sea un archivo JSON
-            file_path = os.path.join(json_folder, file_name)
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)  # Cargar el JSON
-                all_data.extend(data)  # Agregar los datos a la lista principal
-    return all_data
+    return list(iter_episodes(json_folder))
+
+
+# Columnas generadas: (columna, ruta dentro del JSON). Los dtypes son los de schema.py.
+EPISODE_COLUMNS = [
+    ("id", ("id",)),
+    ("name", ("name",)),
+    ("season", ("season",)),
+    ("number", ("number",)),
+    ("type", ("type",)),
+    ("airdate", ("airdate",)),
+    ("airtime", ("airtime",)),
+    ("airstamp", ("airstamp",)),
+    ("runtime", ("runtime",)),
+    ("rating", ("rating", "average")),
+]
+SHOW_COLUMNS = [
+    ("id", ("id",)),
+    ("url", ("url",)),
+    ("name", ("name",)),
+    ("type", ("type",)),
+    ("language", ("language",)),
+    ("genres", ("genres",)),
+    ("status", ("status",)),
+    ("runtime", ("runtime",)),
+    ("averageRuntime", ("averageRuntime",)),
+    ("premiered", ("premiered",)),
+    ("ended", ("ended",)),
+    ("officialSite", ("officialSite",)),
+    ("schedule_time", ("schedule", "time")),
+    ("schedule_days", ("schedule", "days")),
+    ("rating", ("rating", "average")),
+    ("weight", ("weight",)),
+    ("summary", ("summary",)),
+    ("webChannel_name", ("webChannel", "name")),
+    ("webChannel_site", ("webChannel", "officialSite")),
+    ("dvd_country", ("dvdCountry",)),
+    ("externals_tvrage", ("externals", "tvrage")),
+    ("externals_thetvdb", ("externals", "thetvdb")),
+    ("externals_imdb", ("externals", "imdb")),
+    ("updated", ("updated",)),
+]
+# Columnas de shows que contienen listas: se dejan como NA cuando vienen vacías
+LIST_COLUMNS = ["genres", "schedule_days"]
+BATCH_SIZE = 10000
+GROUPS_PER_WORKER = 4  # grupos de archivos por proceso en transform_data_parallel
+
+
+def _extract_column(records: list, path: tuple, default=pd.NA, is_list: bool = False) -> list:
+    """
+    Extrae una columna completa de una lista de diccionarios siguiendo la ruta indicada.
+    Los faltantes se dejan como `default` y las listas vacías como pd.NA.
+    """
+    if len(path) == 1:
+        key = path[0]
+        values = [r.get(key, default) for r in records]
+    else:
+        parent, key = path
+        values = [(r.get(parent) or {}).get(key, default) for r in records]
+    if is_list:
+        return [v or pd.NA for v in values]
+    return values
+
+
+def _default(dtype: str):
+    """
+    :return: valor para los faltantes de una columna: None en las numéricas (numpy lo
+        convierte a NaN sin pasar por objetos) y pd.NA en el resto.
+    """
+    return None if dtype == "float64" or dtype.startswith("Int") else pd.NA
+
+
+def _to_series(values: list, column: str, dtype: str) -> pd.Series:
+    """
+    Construye la columna directamente con su dtype de schema.py. Si un entero llega con
+    decimales se deja como Float64 en lugar de truncarlo, igual que schema.apply_dtypes.
+    """
+    try:
+        if dtype.startswith("Int"):
+            return pd.Series(pd.array(values, dtype=dtype))
+        if dtype == "float64":
+            return pd.Series(np.array(values, dtype="float64"))  # None -> NaN
+        if dtype == "category":
+            # Desde object es unas 2 veces más rápido que pasarle la lista a Categorical
+            return pd.Series(values, dtype="object").astype("category")
+        return pd.Series(values, dtype=dtype)  # textos y object (listas, diccionarios)
+    except (TypeError, ValueError):
+        logging.warning(f"La columna {column} no se pudo convertir a {dtype}, queda como Float64")
+        return pd.Series(pd.array(values, dtype="Float64"))
+
+
+def _batches(iterable, size: int):
+    """
+    Agrupa un iterable en listas de `size` elementos, para no materializar un generador completo.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
-def transform_data(json_data: list) -> tuple:
+@instrumentation.timed(rows=lambda dfs: len(dfs[0]))
+def transform_data(json_data, seen_shows: set = None) -> tuple:
     """
     Transforma los datos JSON en DataFrames normalizados para episodios y shows.
 
-    :argumento json_data: LISTA de diccionarios con los datos extraídos de los archivos JSON.
+    Las columnas se construyen directamente como listas a partir de EPISODE_COLUMNS y
+    SHOW_COLUMNS, sin armar un diccionario por fila, y cada una se convierte una sola vez al
+    dtype de schema.py.
+
+    :argumento json_data: LISTA o GENERADOR de diccionarios con los datos extraídos de los archivos JSON.
+    :argumento seen_shows: SET opcional con los ids de series ya emitidas en trozos anteriores;
+        se actualiza con las series nuevas.
     :return: TUPLA de dos DataFrames (episodes_df, shows_df).
     """
+    if seen_shows is None:
+        seen_shows = set()
+    episode_columns = {name: [] for name, _ in EPISODE_COLUMNS}
+    episode_columns["show_id"] = []
+    show_columns = {name: [] for name, _ in SHOW_COLUMNS}
 
-    episodes_list = []  # Lista para episodios
-    shows_dict = {}  # Diccionario para series (evita duplicados)
-
-    for item in json_data:
-        show_data = item.get("_embedded", {}).get(
-            "show", {}
-        )  # Extraer info del show (serie)
-
-        # Extraer ID del show
-        show_id = show_data.get("id")
-
-        # Guardar información de la serie si aún no está
-        if show_id and show_id not in shows_dict:
-            shows_dict[show_id] = {
-                "id": show_id,
-                "url": show_data.get("url", pd.NA),
-                "name": show_data.get("name", pd.NA),
-                "type": show_data.get("type", pd.NA),
-                "language": show_data.get("language", pd.NA),
-                "genres": show_data.get("genres") if show_data.get("genres") else pd.NA,
-                "status": show_data.get("status", pd.NA),
-                "runtime": show_data.get("runtime", pd.NA),
-                "averageRuntime": show_data.get("averageRuntime", pd.NA),
-                "premiered": show_data.get("premiered", pd.NA),
-                "ended": show_data.get("ended", pd.NA),
-                "officialSite": show_data.get("officialSite", pd.NA),
-                "schedule_time": show_data.get("schedule", {}).get("time", pd.NA),
-                "schedule_days": (
-                    show_data.get("schedule", {}).get("days")
-                    if show_data.get("schedule", {}).get("days")
-                    else pd.NA
-                ),
-                "rating": show_data.get("rating", {}).get("average", pd.NA),
-                "weight": show_data.get("weight", pd.NA),
-                "summary": show_data.get("summary", pd.NA),
-                "webChannel_name": (show_data.get("webChannel") or {}).get(
-                    "name", pd.NA
-                ),
-                "webChannel_site": (show_data.get("webChannel") or {}).get(
-                    "officialSite", pd.NA
-                ),
-                "dvd_country": show_data.get("dvdCountry", pd.NA),
-                "externals_tvrage": (show_data.get("externals") or {}).get(
-                    "tvrage", pd.NA
-                ),
-                "externals_thetvdb": (show_data.get("externals") or {}).get(
-                    "thetvdb", pd.NA
-                ),
-                "externals_imdb": (show_data.get("externals") or {}).get("imdb", pd.NA),
-                "updated": show_data.get("updated", pd.NA),
-            }
-
-        # Guardar episodio con referencia al show
-        episodes_list.append(
-            {
-                "id": item.get("id", pd.NA),
-                "name": item.get("name", pd.NA),
-                "season": item.get("season", pd.NA),
-                "number": item.get("number", pd.NA),
-                "type": item.get("type", pd.NA),
-                "airdate": item.get("airdate", pd.NA),
-                "airtime": item.get("airtime", pd.NA),
-                "airstamp": item.get("airstamp", pd.NA),
-                "runtime": item.get("runtime", pd.NA),
-                "rating": item.get("rating", {}).get("average", pd.NA),
-                "show_id": show_id,  # Clave foránea para relacionarlo con la serie
-            }
-        )
+    for records in _batches(json_data, BATCH_SIZE):
+        # Extraer info del show (serie) de cada episodio
+        shows = [(r.get("_embedded") or {}).get("show") or {} for r in records]
+        show_ids = [show.get("id") for show in shows]
 
-    # Convertimos datos procesados a dataframes
-    episodes_df = pd.DataFrame(episodes_list)
-    shows_df = pd.DataFrame(shows_dict.values())
+        # Series que aún no se han visto, en orden de aparición
+        new_shows = []
+        for show_id, show in zip(show_ids, shows):
+            if show_id and show_id not in seen_shows:
+                seen_shows.add(show_id)
+                new_shows.append(show)
 
+        for name, path in EPISODE_COLUMNS:
+            episode_columns[name].extend(
+                _extract_column(records, path, _default(schema.EPISODES[name]))
+            )
+        episode_columns["show_id"].extend(show_ids)  # Clave foránea hacia la serie
+        for name, path in SHOW_COLUMNS:
+            show_columns[name].extend(
+                _extract_column(
+                    new_shows, path, _default(schema.SHOWS[name]), name in LIST_COLUMNS
+                )
+            )
+
+    # Convertimos las columnas a dataframes con los dtypes de schema.py
+    episodes_df = pd.DataFrame(
+        {
+            name: _to_series(values, name, schema.EPISODES[name])
+            for name, values in episode_columns.items()
+        }
+    )
+    shows_df = pd.DataFrame(
+        {
+            name: _to_series(values, name, schema.SHOWS[name])
+            for name, values in show_columns.items()
+        }
+    )
     return episodes_df, shows_df
 
 
-def load_dfs(episodes_df, shows_df) -> None:
+def transform_data_chunks(json_folder: str, dates=None):
+    """
+    Transforma los archivos JSON uno a uno y emite DataFrames parciales, de modo que el pico
+    de memoria queda acotado por un archivo sin importar cuántos haya en la carpeta.
+    Cada serie aparece solo en el primer trozo en que se ve, igual que en transform_data.
+
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento dates: colección opcional de fechas a incluir.
+    :return: GENERADOR de tuplas (episodes_df, shows_df) por archivo.
+    """
+    seen_shows = set()
+    for _, data in iter_json_files(json_folder, dates):
+        yield transform_data(data, seen_shows)
+
+
+# Ids de las series que el proceso del pool ya devolvió (ver transform_files)
+_worker_seen_shows = set()
+
+
+def _init_worker() -> None:
+    """
+    Inicializa cada proceso del pool con el conjunto de series vacío.
+    """
+    _worker_seen_shows.clear()
+
+
+def transform_files(file_paths: list) -> tuple:
+    """
+    Lee y transforma un grupo de archivos JSON contiguos. Se ejecuta dentro de los procesos
+    del pool: cada proceso recibe los grupos en orden de fecha y solo devuelve las series que
+    no devolvió antes, así no se serializan de vuelta los shows repetidos entre días.
+    :argumento file_paths: LISTA de rutas de archivos JSON en orden de fecha.
+    :return: TUPLA de DataFrames parciales (episodes_df, shows_df) del grupo.
+    """
+    records = (item for path in file_paths for item in raw_store.read_raw(path))
+    return transform_data(records, _worker_seen_shows)
+
+
+def merge_partials(partials) -> tuple:
     """
-    Guarda los DataFrames en archivos CSV dentro de la carpeta DATA especificada.
+    Une los DataFrames parciales en el orden recibido. Las series repetidas entre grupos de
+    distintos procesos se quedan con la primera aparición, igual que en transform_data.
+    :argumento partials: LISTA de tuplas (episodes_df, shows_df) en orden de fecha.
+    :return: TUPLA de dos DataFrames (episodes_df, shows_df).
+    """
+    episodes_df = pd.concat([p[0] for p in partials], ignore_index=True)
+    # Los grupos cuyas series ya había devuelto su proceso no traen shows
+    shows = [p[1] for p in partials if not p[1].empty] or [partials[0][1]]
+    shows_df = (
+        pd.concat(shows, ignore_index=True)
+        .drop_duplicates(subset="id", keep="first")
+        .reset_index(drop=True)
+    )
+    # Las categorías de cada grupo son distintas, así que concat las deja como object y
+    # hay que volver a convertir esas columnas (apply_dtypes salta las que ya tienen su dtype)
+    return (
+        schema.apply_dtypes(episodes_df, schema.EPISODES),
+        schema.apply_dtypes(shows_df, schema.SHOWS),
+    )
+
+
+@instrumentation.timed(rows=lambda dfs: len(dfs[0]))
+def transform_data_parallel(json_folder: str, workers: int, dates=None) -> tuple:
+    """
+    Reparte los archivos JSON en grupos contiguos entre varios procesos y une los resultados
+    en orden de fecha, de modo que el resultado es el mismo que con transform_data en serie.
+    Cada proceso toma los grupos en orden, así que la primera aparición de una serie en un
+    proceso es la más antigua de las que vio y merge_partials se queda con la más antigua de
+    todas.
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento workers: INT con el número de procesos.
+    :argumento dates: colección opcional de fechas a incluir.
+    :return: TUPLA de dos DataFrames (episodes_df, shows_df).
+    """
+    # Import diferido: multiprocessing solo se necesita con más de un proceso
+    from concurrent.futures import ProcessPoolExecutor
+
+    files = list_json_files(json_folder, dates)
+    if not files:
+        return transform_data([])
+    # Unos pocos grupos por proceso: suficientes para repartir la carga sin pagar la
+    # conversión de dtypes y la serialización por cada archivo
+    size = -(-len(files) // (workers * GROUPS_PER_WORKER))
+    groups = [files[i : i + size] for i in range(0, len(files), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        partials = list(executor.map(transform_files, groups))
+    logging.info(f"{len(files)} archivos transformados con {workers} procesos")
+    return merge_partials(partials)
+
+
+EPISODES_SCHEMA = schema.arrow_schema(schema.EPISODES)
+SHOWS_SCHEMA = schema.arrow_schema(
+    schema.SHOWS, [column for column in schema.SHOWS if column not in schema.DOMAIN_COLUMNS]
+)
+EPISODES_PARQUET = "episodes.parquet"
+SHOWS_PARQUET = "shows.parquet"
+
+
+@instrumentation.timed()
+def load_dfs(
+    episodes_df, shows_df, csv: bool = False, data_folder: str = DATA_FOLDER
+) -> None:
+    """
+    Guarda los DataFrames como Parquet tipado dentro de la carpeta DATA, para que clean.py
+    los lea sin volver a interpretar textos. Opcionalmente exporta también los CSV.
     :argumento episodes_df: DATAFRAME con la información de los episodios.
     :param shows_df: DATAFRAME con la información de las shows.
-    :argumento DATA_FOLDER: STRING con la ruta de la carpeta donde se guardarán los CSV.
+    :argumento csv: BOOL, si es True también se guardan episodes.csv y shows.csv.
+    :argumento data_folder: STRING con la ruta de la carpeta donde se guardarán los archivos.
+    :return: None
+    """
+    os.makedirs(data_folder, exist_ok=True)
+    for df, table_schema, file_name in (
+        (episodes_df, EPISODES_SCHEMA, EPISODES_PARQUET),
+        (shows_df, SHOWS_SCHEMA, SHOWS_PARQUET),
+    ):
+        table = pa.Table.from_pandas(df, schema=table_schema, preserve_index=False)
+        file_path = os.path.join(data_folder, file_name)
+        pq.write_table(table, file_path, compression="snappy")
+        if instrumentation.enabled():
+            instrumentation.count(
+                "bytes_written_total", os.path.getsize(file_path), stage="load_dfs"
+            )
+    if csv:
+        episodes_df.to_csv(os.path.join(data_folder, "episodes.csv"), index=False)
+        shows_df.to_csv(os.path.join(data_folder, "shows.csv"), index=False)
+
+
+def load_dfs_chunks(chunks, csv: bool = False, data_folder: str = DATA_FOLDER) -> None:
+    """
+    Guarda los DataFrames parciales de transform_data_chunks a medida que se generan,
+    como grupos de filas de un mismo archivo Parquet por tabla.
+    :argumento chunks: ITERABLE de tuplas (episodes_df, shows_df).
+    :argumento csv: BOOL, si es True también se exportan los CSV.
+    :argumento data_folder: STRING con la ruta de la carpeta donde se guardarán los archivos.
     :return: None
     """
-    os.makedirs(DATA_FOLDER, exist_ok=True)
-    episodes_df.to_csv(os.path.join(DATA_FOLDER, "episodes.csv"), index=False)
-    shows_df.to_csv(os.path.join(DATA_FOLDER, "shows.csv"), index=False)
+    os.makedirs(data_folder, exist_ok=True)
+    pending_header = {"episodes.csv": True, "shows.csv": True}
+    with pq.ParquetWriter(
+        os.path.join(data_folder, EPISODES_PARQUET), EPISODES_SCHEMA, compression="snappy"
+    ) as episodes_writer, pq.ParquetWriter(
+        os.path.join(data_folder, SHOWS_PARQUET), SHOWS_SCHEMA, compression="snappy"
+    ) as shows_writer:
+        for episodes_df, shows_df in chunks:
+            for df, table_schema, writer, file_name in (
+                (episodes_df, EPISODES_SCHEMA, episodes_writer, "episodes.csv"),
+                (shows_df, SHOWS_SCHEMA, shows_writer, "shows.csv"),
+            ):
+                if df.empty:
+                    continue
+                writer.write_table(
+                    pa.Table.from_pandas(df, schema=table_schema, preserve_index=False)
+                )
+                if csv:
+                    header = pending_header[file_name]
+                    df.to_csv(
+                        os.path.join(data_folder, file_name),
+                        index=False,
+                        mode="w" if header else "a",
+                        header=header,
+                    )
+                    pending_header[file_name] = False
 
 
-def profiling(episodes_df, shows_df) -> None:
+@instrumentation.timed(rows=lambda rows: rows)
+def transform_stream(
+    json_folder: str = JSON_FOLDER,
+    csv: bool = False,
+    data_folder: str = DATA_FOLDER,
+    profile: bool = True,
+    refresh=(),
+    dates=None,
+) -> int:
+    """
+    Transforma y guarda los JSON archivo por archivo (transform_data_chunks y load_dfs_chunks),
+    sin tener todos los DataFrames en memoria. Si `profile` es True, cada trozo se perfila al
+    pasar: los episodios por airdate, igual que en profiling, y los shows por trozo (cada serie
+    está en un solo trozo); al final se unen los perfiles.
+    :argumento json_folder: STRING con la ruta de la carpeta que contiene los archivos JSON.
+    :argumento csv: BOOL, si es True también se exportan los CSV.
+    :argumento data_folder: STRING con la ruta de la carpeta donde se guardarán los archivos.
+    :argumento profile: BOOL, si es True se calcula el perfil liviano de los DataFrames.
+    :argumento refresh: colección de fechas (YYYY-MM-DD) cuyo perfil se debe recalcular.
+    :argumento dates: colección opcional de fechas a incluir.
+    :return: INT con el número de episodios transformados.
     """
-    Genera reportes de profiling en formato HTML para los DataFrames de episodios y shows.
+    episodes_profiles = {}
+    shows_profiles = []
+    rows = 0
+
+    def chunks():
+        nonlocal rows
+        for episodes_df, shows_df in transform_data_chunks(json_folder, dates):
+            rows += len(episodes_df)
+            if profile:
+                # Un airdate puede estar en varios archivos: los perfiles se unen por día y se
+                # guardan al final
+                profile_stats.merge_partition_profiles(
+                    episodes_profiles,
+                    profile_stats.profile_by_partition(
+                        episodes_df, "airdate", EPISODES_STATS_FOLDER, refresh
+                    ),
+                )
+                shows_profiles.append(
+                    profile_stats.profile_dataframe(shows_df, list_columns=LIST_COLUMNS)
+                )
+            yield episodes_df, shows_df
+
+    load_dfs_chunks(chunks(), csv=csv, data_folder=data_folder)
+    if profile and rows:
+        profile_stats.save_partition_profiles(episodes_profiles, EPISODES_STATS_FOLDER)
+        save_profiles(
+            profile_stats.load_partition_profiles(EPISODES_STATS_FOLDER),
+            profile_stats.merge_profiles(shows_profiles),
+            os.path.join(PROFILING_FOLDER, "episodes_profile.json"),
+        )
+    logging.info(f"{rows} episodios transformados y guardados archivo por archivo")
+    return rows
+
+
+def save_profiles(episodes_profile: dict, shows_profile: dict, episodes_path: str) -> None:
+    """
+    Guarda los perfiles de episodios y shows en la carpeta 'profiling' y los muestra en el log.
+    :argumento episodes_profile: DICCIONARIO con el perfil de los episodios.
+    :argumento shows_profile: DICCIONARIO con el perfil de los shows.
+    :argumento episodes_path: STRING con la ruta del perfil de episodios.
+    :return: None
+    """
+    profile_stats.save_profile(episodes_profile, episodes_path)
+    profile_stats.save_profile(
+        shows_profile, os.path.join(PROFILING_FOLDER, "shows_profile.json")
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        logging.info(f"Perfil de episodios:\n{profile_stats.summarize(episodes_profile)}")
+        logging.info(f"Perfil de shows:\n{profile_stats.summarize(shows_profile)}")
+
+
+@instrumentation.timed()
+def profiling(
+    episodes_df, shows_df, sample: int = None, refresh=(), ydata: bool = False
+) -> None:
+    """
+    Calcula el perfil liviano de los DataFrames de episodios y shows y lo guarda como JSON en
+    la carpeta 'profiling'. Los episodios se perfilan por airdate y solo se recalculan los días
+    sin perfil guardado o indicados en `refresh`; los shows se perfilan completos.
 
     :argumento episodes_df: DATAFRAME con la información de los episodios.
     :argumento shows_df: DATAFRAME con la información de las shows.
+    :argumento sample: INT, si se indica se perfila una muestra aleatoria de ese tamaño de los
+        episodios en lugar de las particiones.
+    :argumento refresh: colección de fechas (YYYY-MM-DD) cuyo perfil se debe recalcular.
+    :argumento ydata: BOOL, si es True se generan además los reportes HTML de ydata-profiling.
     :return: None
     """
+    if sample:
+        episodes_profile = profile_stats.profile_dataframe(
+            profile_stats.reservoir_sample([episodes_df], sample)
+        )
+        episodes_path = os.path.join(PROFILING_FOLDER, "episodes_profile_sample.json")
+    else:
+        episodes_profile = profile_stats.profile_partitions(
+            episodes_df, "airdate", EPISODES_STATS_FOLDER, refresh=refresh
+        )
+        episodes_path = os.path.join(PROFILING_FOLDER, "episodes_profile.json")
+    shows_profile = profile_stats.profile_dataframe(shows_df, list_columns=LIST_COLUMNS)
+    save_profiles(episodes_profile, shows_profile, episodes_path)
 
-    episodes_profile = ProfileReport(
-        episodes_df, title="Episodes Data Profiling", explorative=True
-    )
-    shows_profile = ProfileReport(
-        shows_df, title="Shows Data Profiling", explorative=True
-    )
-
-    # Crear carpeta 'profiling' si no existe
-    os.makedirs(PROFILING_FOLDER, exist_ok=True)
+    if ydata:
+        # Import diferido: ydata-profiling es pesado y solo se usa para los reportes completos
+        from ydata_profiling import ProfileReport
 
-    # Guardar los reportes en archivos HTML
-    episodes_report_path = os.path.join(PROFILING_FOLDER, "episodes_report.html")
-    shows_report_path = os.path.join(PROFILING_FOLDER, "shows_report.html")
+        episodes_report = ProfileReport(
+            episodes_df, title="Episodes Data Profiling", explorative=True
+        )
+        shows_report = ProfileReport(
+            shows_df, title="Shows Data Profiling", explorative=True
+        )
+        episodes_report.to_file(os.path.join(PROFILING_FOLDER, "episodes_report.html"))
+        shows_report.to_file(os.path.join(PROFILING_FOLDER, "shows_report.html"))
 
-    episodes_profile.to_file(episodes_report_path)
-    shows_profile.to_file(shows_report_path)
     logging.info("Profiling completado. Revisa los archivos en la carpeta 'profiling'.")
 
 
-if __name__ == "__main__":
-    json_data = load_json_files(JSON_FOLDER)  # Cargar JSONs
-    episodes_df, shows_df = transform_data(json_data)  # Transformar datos
+def main(argv=None):
+    """
+    Crea los DataFrames a partir de los JSON, los guarda y los perfila.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(description="Crea los DataFrames a partir de los JSON")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos para transformar los archivos en paralelo",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Transforma, guarda y perfila archivo por archivo, con memoria acotada por un archivo",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Transforma solo los días nuevos o modificados desde la última transformación "
+        "(http_cache.changed_dates)",
+    )
+    parser.add_argument(
+        "--csv", action="store_true", help="Exporta también episodes.csv y shows.csv"
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        help="Perfila una muestra aleatoria de N episodios en lugar de todos los días",
+    )
+    parser.add_argument(
+        "--ydata",
+        action="store_true",
+        help="Genera además los reportes HTML completos de ydata-profiling (lento)",
+    )
+    args = parser.parse_args(argv)
+    if args.stream and (args.workers > 1 or args.sample or args.ydata):
+        parser.error("--stream no se puede combinar con --workers, --sample ni --ydata")
 
-    load_dfs(episodes_df, shows_df)
+    # Días nuevos o modificados desde la última transformación: se vuelven a perfilar y, con
+    # --changed-only, son los únicos que se transforman
+    changed = http_cache.changed_dates(JSON_FOLDER)
+    dates = changed if args.changed_only else None
+    if args.stream:
+        transform_stream(JSON_FOLDER, csv=args.csv, refresh=changed, dates=dates)
+        http_cache.mark_consumed(JSON_FOLDER, changed)
+        return
 
-    profiling(episodes_df, shows_df)
+    if args.workers > 1:
+        episodes_df, shows_df = transform_data_parallel(JSON_FOLDER, args.workers, dates)
+    else:
+        # Los JSON se leen archivo por archivo, sin construir una lista con todos los episodios
+        episodes_df, shows_df = transform_data(iter_episodes(JSON_FOLDER, dates))
 
+    load_dfs(episodes_df, shows_df, csv=args.csv)
+    profiling(episodes_df, shows_df, sample=args.sample, refresh=changed, ydata=args.ydata)
+    http_cache.mark_consumed(JSON_FOLDER, changed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+"""
+Extracción vectorizada de dominios de URLs, con las funciones de texto de pyarrow sobre la
+columna completa en lugar de urlparse fila a fila.
+
+Se obtiene el dominio registrable (p. ej. bbc.co.uk para https://www.bbc.co.uk/iplayer y
+qq.com para https://v.qq.com/), en minúsculas y sin esquema, usuario, puerto, ruta ni www.
+No se usa la lista completa de sufijos públicos: los sufijos de dos niveles más comunes están
+en MULTI_LEVEL_SUFFIXES. Las URLs sin un host válido quedan como nulo, y las IPs se dejan tal cual.
+"""
+
+# Columnas de shows con URLs y nombre de la fuente en show_domains
+URL_COLUMNS = {
+    "officialSite": "officialSite",
+    "url": "url",
+    "webChannel_site": "webChannel",
+}
+
+# Sufijos públicos de dos niveles, bajo los que el dominio registrable tiene tres etiquetas
+MULTI_LEVEL_SUFFIXES = [
+    f"{second}.{top}"
+    for top, seconds in {
+        "uk": ["co", "org", "ac", "gov", "me", "ltd", "plc", "net", "sch", "nhs"],
+        "au": ["com", "net", "org", "edu", "gov", "asn", "id"],
+        "nz": ["co", "org", "net", "ac", "govt", "geek"],
+        "jp": ["co", "ne", "or", "ac", "go", "ed", "gr", "lg"],
+        "kr": ["co", "or", "ne", "ac", "go", "re"],
+        "br": ["com", "net", "org", "gov", "edu", "art", "tv"],
+        "cn": ["com", "net", "org", "gov", "edu"],
+        "tw": ["com", "org", "net", "edu", "gov", "idv"],
+        "hk": ["com", "org", "net", "edu", "gov", "idv"],
+        "mx": ["com", "org", "gob", "net", "edu"],
+        "ar": ["com", "org", "gob", "net", "edu", "tur"],
+        "co": ["com", "org", "net", "gov", "edu"],
+        "in": ["co", "net", "org", "gov", "ac", "edu", "firm", "gen", "ind"],
+        "za": ["co", "org", "gov", "ac", "net", "web"],
+        "il": ["co", "org", "ac", "gov", "net", "muni"],
+        "tr": ["com", "org", "net", "gov", "edu", "gen", "web"],
+        "sg": ["com", "org", "net", "gov", "edu"],
+        "my": ["com", "org", "net", "gov", "edu"],
+        "id": ["co", "or", "ac", "go", "web", "net"],
+        "th": ["co", "in", "or", "ac", "go", "net"],
+        "ph": ["com", "org", "net", "gov", "edu"],
+        "vn": ["com", "org", "net", "gov", "edu"],
+        "ua": ["com", "org", "net", "gov", "edu", "in"],
+        "pl": ["com", "org", "net", "gov", "edu", "waw"],
+        "es": ["com", "org", "nom", "gob", "edu"],
+        "pe": ["com", "org", "net", "gob", "edu", "nom"],
+        "eg": ["com", "org", "net", "gov", "edu"],
+        "sa": ["com", "org", "net", "gov", "edu"],
+        "ru": ["com", "net", "org", "msk", "spb"],
+    }.items()
+    for second in seconds
+]
+
+# Esquema, usuario y host; el host termina en el primer /, ?, # o :
+HOST_PATTERN = r"^(?:(?:[a-z][a-z0-9+.\-]*:)?//)?(?:[^@/?#]*@)?(?P<host>[^/?#:]*)"
+VALID_HOST_PATTERN = r"^[^\s.]+(\.[^\s.]+)+$"
+IP_PATTERN = r"^\d{1,3}(\.\d{1,3}){3}$"
+
+
+def _last_labels(hosts: pa.Array, count: int) -> pa.Array:
+    """
+    :return: pa.Array con las últimas `count` etiquetas de cada host (nulo si tiene menos).
+    """
+    pattern = r"(?P<labels>[^.]+" + r"\.[^.]+" * (count - 1) + r")$"
+    return pc.struct_field(pc.extract_regex(hosts, pattern), [0])
+
+
+def extract_hosts(urls) -> pa.Array:
+    """
+    Obtiene el host de cada URL, en minúsculas y sin punto final.
+    :argumento urls: SERIE de pandas o pa.Array de textos (admite nulos y URLs sin esquema).
+    :return: pa.Array de textos, nulo si la URL no tiene un host válido.
+    """
+    urls = pa.array(urls, type=pa.string(), from_pandas=True)
+    text = pc.utf8_lower(pc.utf8_trim_whitespace(urls))
+    hosts = pc.struct_field(pc.extract_regex(text, HOST_PATTERN), [0])
+    hosts = pc.utf8_rtrim(hosts, characters=".")
+    valid = pc.match_substring_regex(hosts, VALID_HOST_PATTERN)
+    return pc.if_else(valid, hosts, pa.scalar(None, pa.string()))
+
+
+def registrable_domains(urls) -> pa.Array:
+    """
+    Obtiene el dominio registrable de cada URL (la etiqueta anterior al sufijo público más el
+    sufijo), p. ej. https://iview.abc.net.au/show -> abc.net.au.
+    :argumento urls: SERIE de pandas o pa.Array de textos.
+    :return: pa.Array de textos, nulo si la URL no tiene un host válido.
+    """
+    hosts = extract_hosts(urls)
+    two, three = _last_labels(hosts, 2), _last_labels(hosts, 3)
+    multi_level = pc.fill_null(pc.is_in(two, value_set=pa.array(MULTI_LEVEL_SUFFIXES)), False)
+    domains = pc.if_else(multi_level, three, two)
+    is_ip = pc.fill_null(pc.match_substring_regex(hosts, IP_PATTERN), False)
+    return pc.if_else(is_ip, hosts, domains)
+
+
+def add_domain_columns(shows_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega a shows una columna <fuente>_domain con el dominio registrable de cada columna de
+    URL_COLUMNS presente.
+    :argumento shows_df: DATAFRAME de shows.
+    :return: DATAFRAME de shows con las columnas de dominio.
+    """
+    columns = {}
+    for column, source in URL_COLUMNS.items():
+        if column in shows_df.columns:
+            domains = registrable_domains(shows_df[column]).to_numpy(zero_copy_only=False)
+            # Posicional: shows_df puede traer un índice con huecos (p. ej. tras validate)
+            columns[f"{source}_domain"] = pd.Series(domains, index=shows_df.index).astype(
+                "category"
+            )
+    return shows_df.assign(**columns)
+
+
+def show_domain_links(shows_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pasa las columnas de dominio de shows a formato largo, una fila por show y fuente.
+    Si faltan las columnas (p. ej. Parquet de una versión anterior) se calculan.
+    :argumento shows_df: DATAFRAME de shows con id y las columnas de URL o de dominio.
+    :return: DATAFRAME con show_id, source y domain, sin nulos.
+    """
+    domain_columns = [f"{source}_domain" for source in URL_COLUMNS.values()]
+    if not set(domain_columns) <= set(shows_df.columns):
+        shows_df = add_domain_columns(shows_df)
+    present = [column for column in domain_columns if column in shows_df.columns]
+    links = shows_df[["id", *present]].melt(
+        id_vars="id", var_name="source", value_name="domain"
+    )
+    links["source"] = links["source"].str[: -len("_domain")]
+    links = links.dropna(subset=["domain"]).rename(columns={"id": "show_id"})
+    return links.astype({"domain": str}).reset_index(drop=True)
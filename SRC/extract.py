@@ -1,52 +1,344 @@
 import os
+import argparse
+import random
+import threading
+import time
 import requests
-import json
+import itertools
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from http_cache import HttpCache, content_hash
+import instrumentation
+import raw_store
 import logging
 
-# Configuración de los logs
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 # URL de la API (solo la base) y dirección de donde se guardarán los archivos .json correspondientes a cada día
 BASE_URL = "http://api.tvmaze.com/schedule/web"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_FOLDER = os.path.join(BASE_DIR, "..", "JSON")
 
+# Límites de la extracción concurrente. TVMaze permite 20 llamadas cada 10 segundos por IP.
+# En cualquier ventana de 10 s el token bucket deja pasar a lo sumo su capacidad más lo que
+# recarga en la ventana, así que se cumple RATE_LIMIT_BURST + RATE * RATE_LIMIT_PERIOD <= 20.
+MAX_WORKERS = 8
+RATE_LIMIT_CALLS = 20
+RATE_LIMIT_PERIOD = 10
+RATE_LIMIT_BURST = 2
+RATE = (RATE_LIMIT_CALLS - RATE_LIMIT_BURST) / RATE_LIMIT_PERIOD
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Limitador de peticiones tipo token bucket, compartido entre hilos.
+    Se recargan `rate` tokens por segundo hasta un máximo de `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Bloquea el hilo hasta que haya un token disponible y lo consume.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """
+    Crea una sesión HTTP con conexiones keep-alive reutilizables entre hilos.
+
+    :argumento pool_size: INT con el número máximo de conexiones abiertas hacia el host.
+    :return: requests.Session configurada.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_with_retries(
+    url: str,
+    session=None,
+    bucket: TokenBucket = None,
+    headers: dict = None,
+    max_retries: int = MAX_RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+) -> requests.Response:
+    """
+    Hace un GET reintentando los errores 429/5xx y de conexión con backoff exponencial.
+    Lanza la excepción si se agotan los reintentos.
+
+    :argumento url: STRING con la URL a consultar.
+    :argumento session: requests.Session compartida (si es None se usa requests directamente).
+    :argumento bucket: TokenBucket para respetar el límite de la API (opcional).
+    :argumento headers: DICCIONARIO de cabeceras adicionales (opcional).
+    :argumento max_retries: INT con el número máximo de reintentos.
+    :argumento backoff_factor: FLOAT con los segundos base del backoff exponencial.
+    :return: requests.Response con un estado que no requiere reintento.
+    """
+    client = session or requests
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        started = time.perf_counter()
+        try:
+            response = client.get(url, headers=headers, timeout=10)  # petición GET a la API
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            instrumentation.observe(
+                "http_request_seconds", time.perf_counter() - started, status=type(e).__name__
+            )
+            if attempt == max_retries:
+                raise
+            delay = backoff_factor * 2**attempt
+        else:
+            instrumentation.observe(
+                "http_request_seconds",
+                time.perf_counter() - started,
+                status=str(response.status_code),
+            )
+            instrumentation.count("http_response_bytes_total", len(response.content))
+            if response.status_code not in RETRY_STATUS or attempt == max_retries:
+                response.raise_for_status()
+                return response
+            # Si la API indica cuánto esperar (Retry-After) se respeta ese valor
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = backoff_factor * 2**attempt
+        delay += random.uniform(0, backoff_factor)
+        logging.warning(f"Reintento {attempt + 1}/{max_retries} para {url} en {delay:.2f}s")
+        instrumentation.count("http_retries_total")
+        time.sleep(delay)
+
+
+def request_schedule(
+    date: str, session=None, bucket: TokenBucket = None, base_url: str = BASE_URL
+) -> list:
+    """
+    Pide la programación de una fecha con reintentos. A diferencia de fetch_tv_shows,
+    lanza la excepción si se agotan los reintentos para que el llamador pueda distinguir
+    un día vacío de un fallo.
+
+    :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+    :argumento session: requests.Session compartida (opcional).
+    :argumento bucket: TokenBucket para respetar el límite de la API (opcional).
+    :argumento base_url: STRING con la URL del endpoint, permite apuntar a un servidor local.
+    :return: Lista de diccionarios con la información de las series.
+    """
+    response = get_with_retries(f"{base_url}?date={date}", session, bucket)
+    return response.json()
+
+
+def request_schedule_cached(
+    date: str,
+    cache: HttpCache,
+    session=None,
+    bucket: TokenBucket = None,
+    base_url: str = BASE_URL,
+) -> tuple:
+    """
+    Pide la programación de una fecha con una petición condicional (ETag/Last-Modified)
+    y compara el hash del contenido con el guardado en la caché. Las fechas nuevas o
+    modificadas no se registran aquí: el llamador registra la fecha con `commit` después de
+    guardar el archivo, así un fallo al escribir no deja la caché adelantada al disco.
+
+    :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+    :argumento cache: HttpCache con los metadatos de las descargas anteriores.
+    :argumento session: requests.Session compartida (opcional).
+    :argumento bucket: TokenBucket para respetar el límite de la API (opcional).
+    :argumento base_url: STRING con la URL del endpoint.
+    :return: TUPLA (datos, estado, commit). Los datos son None si no hay que reescribir el
+        archivo; el estado es new, changed, unchanged o not_modified; commit es una función
+        sin argumentos que registra la fecha en la caché, o None si ya quedó registrada.
+    """
+    response = get_with_retries(
+        f"{base_url}?date={date}", session, bucket, cache.conditional_headers(date)
+    )
+    if response.status_code == 304:
+        cache.record(date, response.headers, status="not_modified")
+        return None, "not_modified", None
+    digest = content_hash(response.content)
+    if cache.is_unchanged(date, digest):
+        cache.record(date, response.headers, digest, "unchanged")
+        return None, "unchanged", None
+    data = response.json()
+    status = "changed" if date in cache.entries else "new"
+    commit = partial(cache.record, date, response.headers, digest, status, empty=not data)
+    return data, status, commit
+
 
-def fetch_tv_shows(date: str) -> list:
+def fetch_tv_shows(date: str, session=None, base_url: str = BASE_URL) -> list:
     """
     Obtiene todas las series emitidas en una fecha específica desde la API de TVMaze.
 
     :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+    :argumento session: requests.Session compartida (opcional).
+    :argumento base_url: STRING con la URL del endpoint.
     :return: Lista de diccionarios con la información de las series.
     """
-    url = f"{BASE_URL}?date={date}"
     try:
-        response = requests.get(url, timeout=10)  # petición GET a la API
-        response.raise_for_status()
+        data = request_schedule(date, session=session, base_url=base_url)
         logging.info(f"Datos obtenidos correctamente para la fecha {date}")
-        return response.json()
+        return data
     except requests.exceptions.RequestException as e:
         logging.error(f"Error al obtener datos de la API: {e}")
         return []
 
 
-def save_json(data: list, date: str, JSON_FOLDER: str) -> str:
+def date_range(start_date: str, end_date: str) -> list:
+    """
+    Genera la lista de fechas entre dos fechas, ambas incluidas.
+
+    :argumento start_date: STRING de Fecha inicial en formato YYYY-MM-DD.
+    :argumento end_date: STRING de Fecha final en formato YYYY-MM-DD.
+    :return: LISTA de fechas en formato YYYY-MM-DD.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [
+        (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range((end - start).days + 1)
+    ]
+
+
+@instrumentation.timed("fetch_tv_shows", rows=lambda result: len(result["latencies"]))
+def fetch_date_range(
+    start_date: str,
+    end_date: str,
+    max_workers: int = MAX_WORKERS,
+    rate_limit: float = RATE,
+    burst: int = RATE_LIMIT_BURST,
+    base_url: str = BASE_URL,
+    on_result=None,
+    cache: HttpCache = None,
+) -> dict:
+    """
+    Extrae concurrentemente la programación de un rango de fechas usando un pool de hilos
+    acotado sobre una sesión keep-alive compartida y un token bucket para el límite de la API.
+
+    :argumento start_date: STRING de Fecha inicial en formato YYYY-MM-DD.
+    :argumento end_date: STRING de Fecha final en formato YYYY-MM-DD.
+    :argumento max_workers: INT con el máximo de peticiones simultáneas.
+    :argumento rate_limit: FLOAT con las peticiones por segundo permitidas.
+    :argumento burst: INT con la capacidad del token bucket.
+    :argumento base_url: STRING con la URL del endpoint.
+    :argumento on_result: función opcional on_result(date, data) llamada al terminar cada fecha
+        (p. ej. save_day); debe devolver un valor verdadero si guardó los datos, si no la fecha
+        queda como fallida y no se registra en la caché. Si se indica, los datos no se
+        acumulan en el resultado.
+    :argumento cache: HttpCache opcional; con ella se hacen peticiones condicionales y solo
+        se entregan las fechas nuevas o modificadas.
+    :return: DICCIONARIO con `data` (fecha -> datos), `failed` (fecha -> error),
+        `latencies` (fecha -> segundos), `status` (fecha -> estado de la caché),
+        `elapsed` y `throughput` (fechas por segundo).
+    """
+    dates = date_range(start_date, end_date)
+    bucket = TokenBucket(rate_limit, burst)
+    result = {"data": {}, "failed": {}, "latencies": {}, "status": {}}
+
+    def fetch_one(date):
+        start = time.perf_counter()
+        if cache is None:
+            data = request_schedule(date, session, bucket, base_url)
+            status, commit = None, None
+        else:
+            data, status, commit = request_schedule_cached(
+                date, cache, session, bucket, base_url
+            )
+        return data, status, commit, time.perf_counter() - start
+
+    started = time.perf_counter()
+    with create_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Se mantienen a lo sumo `window` fechas en curso o esperando a ser procesadas;
+            # si on_result es más lento que la descarga, las respuestas no se acumulan en memoria
+            window = max_workers * 2
+            pending_dates = iter(dates)
+            futures = {}
+            while True:
+                for date in itertools.islice(pending_dates, window - len(futures)):
+                    futures[executor.submit(fetch_one, date)] = date
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    date = futures.pop(future)
+                    try:
+                        data, status, commit, latency = future.result()
+                    except requests.exceptions.RequestException as e:
+                        logging.error(f"Error al obtener datos para la fecha {date}: {e}")
+                        result["failed"][date] = str(e)
+                        continue
+                    result["latencies"][date] = latency
+                    if status is not None:
+                        result["status"][date] = status
+                    if data is None:
+                        logging.info(f"Sin cambios para la fecha {date} ({status}) en {latency:.3f}s")
+                        continue
+                    logging.info(
+                        f"Datos obtenidos para la fecha {date}: {len(data)} registros en {latency:.3f}s"
+                    )
+                    if on_result is not None and not on_result(date, data):
+                        logging.error(f"No se pudo guardar la fecha {date}")
+                        result["failed"][date] = "no se pudo guardar"
+                        result["status"].pop(date, None)
+                        continue
+                    if commit is not None:
+                        commit()
+                    if on_result is None:
+                        result["data"][date] = data
+
+    if cache is not None:
+        cache.save()
+    result["elapsed"] = time.perf_counter() - started
+    result["throughput"] = len(result["latencies"]) / result["elapsed"]
+    logging.info(
+        f"Extracción finalizada: {len(result['latencies'])}/{len(dates)} fechas en "
+        f"{result['elapsed']:.2f}s ({result['throughput']:.2f} fechas/s)"
+    )
+    return result
+
+
+def save_json(
+    data: list, date: str, JSON_FOLDER: str, raw_format: str = raw_store.RAW_FORMAT
+) -> str:
     """
-    Guarda los datos en un archivo JSON.
+    Guarda los datos en un archivo JSON, en el formato crudo indicado (ver raw_store.py).
 
     :argumento data: Datos a guardar, respuesta JSON de la API.
     :argumento date: Fecha para nombrar el archivo.
     :argumento folder: Ruta donde se guardará el archivo.
+    :argumento raw_format: STRING con el formato: ndjson.gz (por defecto), ndjson.zst o json.
     :return: Ruta del archivo guardado, o string vacío en caso de que no se guarde satisfactoriamente.
     """
-    os.makedirs(JSON_FOLDER, exist_ok=True)
-    file_path = os.path.join(JSON_FOLDER, f"tv_shows_{date}.json")
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        file_path = raw_store.write_raw(data, JSON_FOLDER, date, raw_format)
+        if instrumentation.enabled():
+            instrumentation.count(
+                "bytes_written_total", os.path.getsize(file_path), stage="save_json"
+            )
         logging.info(f"Archivo guardado: {file_path}")
         return file_path
     except Exception as e:
@@ -54,11 +346,78 @@ def save_json(data: list, date: str, JSON_FOLDER: str) -> str:
         return ""
 
 
+def save_day(
+    data: list, date: str, JSON_FOLDER: str, raw_format: str = raw_store.RAW_FORMAT
+) -> bool:
+    """
+    Guarda los datos de una fecha, para usar como on_result de fetch_date_range. Los días
+    vacíos no se guardan, y si quedó un archivo de una extracción anterior se borra.
+
+    :argumento data: Datos a guardar, respuesta JSON de la API.
+    :argumento date: Fecha para nombrar el archivo.
+    :argumento JSON_FOLDER: Ruta donde se guardará el archivo.
+    :argumento raw_format: STRING con el formato (ver raw_store.py).
+    :return: BOOL, True si la carpeta quedó al día para esa fecha.
+    """
+    if data:
+        return bool(save_json(data, date, JSON_FOLDER, raw_format))
+    try:
+        for fmt in raw_store.FORMATS:
+            path = raw_store.raw_path(JSON_FOLDER, date, fmt)
+            if os.path.exists(path):
+                os.remove(path)
+                logging.info(f"Archivo borrado, la fecha {date} ya no tiene episodios: {path}")
+        return True
+    except OSError as e:
+        logging.error(f"Error al borrar el archivo de la fecha {date}: {e}")
+        return False
+
+
+def main(argv=None):
+    """
+    Extrae la programación del rango de fechas y guarda los JSON.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(description="Extrae la programación web de TVMaze")
+    parser.add_argument("--start", default="2024-01-01", help="Fecha inicial YYYY-MM-DD")
+    parser.add_argument("--end", default="2024-01-31", help="Fecha final YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=RATE,
+        help=f"Peticiones por segundo permitidas, con ráfagas de hasta {RATE_LIMIT_BURST}",
+    )
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Descarga y reescribe todas las fechas sin peticiones condicionales",
+    )
+    parser.add_argument(
+        "--raw-format",
+        choices=raw_store.available_formats(),
+        default=raw_store.RAW_FORMAT,
+        help="Formato de los archivos guardados (json es el formato legible original)",
+    )
+    args = parser.parse_args(argv)
+
+    def save_result(date, shows):
+        return save_day(shows, date, JSON_FOLDER, args.raw_format)
+
+    summary = fetch_date_range(
+        args.start,
+        args.end,
+        max_workers=args.workers,
+        rate_limit=args.rate,
+        base_url=args.base_url,
+        on_result=save_result,
+        cache=None if args.no_cache else HttpCache(JSON_FOLDER),
+    )
+    if summary["failed"]:
+        logging.error(f"Fechas sin extraer: {sorted(summary['failed'])}")
+
+
 if __name__ == "__main__":
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime(2024, 1, 31)
-    for i in range((end_date - start_date).days + 1):
-        date_str = (start_date.replace(day=1) + timedelta(days=i)).strftime("%Y-%m-%d")
-        shows = fetch_tv_shows(date_str)
-        if shows:
-            save_json(shows, date_str, JSON_FOLDER)
+    main()
@@ -0,0 +1,198 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+
+import raw_store
+
+"""
+Caché HTTP en disco para la extracción de la programación de TVMaze.
+
+Por cada fecha se guarda el ETag, el Last-Modified y el hash del contenido descargado,
+de modo que las siguientes ejecuciones envían peticiones condicionales y no reescriben los
+archivos que no cambiaron. Una fecha se registra recién cuando su archivo quedó guardado; los
+días vacíos no se guardan, pero se registran con su hash para no volver a darlos por cambiados.
+
+El manifiesto también acumula en `pending` las fechas nuevas o modificadas hasta que los pasos
+siguientes las procesan (changed_dates y mark_consumed), aunque la extracción corra varias
+veces antes que ellos.
+"""
+
+CACHE_FOLDER_NAME = ".cache"
+MANIFEST_NAME = "manifest.json"
+CHANGED = ("new", "changed")
+
+
+def manifest_path(json_folder: str) -> str:
+    """
+    :argumento json_folder: STRING con la carpeta de los archivos JSON.
+    :return: STRING con la ruta del manifiesto de la caché.
+    """
+    return os.path.join(json_folder, CACHE_FOLDER_NAME, MANIFEST_NAME)
+
+
+def content_hash(content: bytes) -> str:
+    """
+    :argumento content: BYTES con el cuerpo de la respuesta.
+    :return: STRING con el hash sha256 del contenido.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def read_manifest(json_folder: str) -> dict:
+    """
+    Lee el manifiesto de la caché.
+    :argumento json_folder: STRING con la carpeta de los archivos JSON.
+    :return: DICCIONARIO con `dates` (fecha -> metadatos), `last_run` (estado por fecha en la
+        última ejecución) y `pending` (fechas nuevas o modificadas aún no procesadas).
+    """
+    path = manifest_path(json_folder)
+    manifest = {"dates": {}, "last_run": {}}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Manifiesto de caché ilegible, se ignora: {e}")
+    if "pending" not in manifest:
+        # Manifiestos anteriores: las pendientes son las nuevas o modificadas de la última ejecución
+        last_run = manifest.get("last_run", {})
+        manifest["pending"] = sorted(d for d, s in last_run.items() if s in CHANGED)
+    return manifest
+
+
+def write_manifest(json_folder: str, manifest: dict) -> None:
+    """
+    Escribe el manifiesto de forma atómica.
+    :argumento json_folder: STRING con la carpeta de los archivos JSON.
+    :argumento manifest: DICCIONARIO con dates, last_run y pending.
+    """
+    path = manifest_path(json_folder)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def changed_dates(json_folder: str) -> list:
+    """
+    Fechas nuevas o modificadas que los pasos siguientes todavía no procesaron.
+    :argumento json_folder: STRING con la carpeta de los archivos JSON.
+    :return: LISTA ordenada de fechas en formato YYYY-MM-DD.
+    """
+    return sorted(read_manifest(json_folder)["pending"])
+
+
+def mark_consumed(json_folder: str, dates) -> None:
+    """
+    Quita del manifiesto las fechas pendientes ya procesadas. Las que se agregaron después de
+    leer changed_dates siguen pendientes.
+    :argumento json_folder: STRING con la carpeta de los archivos JSON.
+    :argumento dates: colección de fechas YYYY-MM-DD procesadas.
+    """
+    if not dates:
+        return
+    manifest = read_manifest(json_folder)
+    manifest["pending"] = sorted(set(manifest["pending"]) - set(dates))
+    write_manifest(json_folder, manifest)
+
+
+class HttpCache:
+    """
+    Caché de metadatos HTTP por fecha, segura para usarse desde varios hilos.
+    """
+
+    def __init__(self, json_folder: str):
+        self.json_folder = json_folder
+        manifest = read_manifest(json_folder)
+        self.entries = manifest.get("dates", {})
+        self.last_run = {}
+        self.lock = threading.Lock()
+
+    def file_path(self, date: str):
+        """
+        :return: STRING con la ruta del archivo guardado de esa fecha, en cualquiera de los
+            formatos de raw_store, o None si no existe.
+        """
+        return raw_store.find_raw(self.json_folder, date)
+
+    def is_saved(self, date: str, entry: dict) -> bool:
+        """
+        :return: BOOL, True si el archivo local de la fecha existe o si la fecha estaba vacía
+            (los días vacíos no se guardan).
+        """
+        return bool(entry.get("empty")) or self.file_path(date) is not None
+
+    def conditional_headers(self, date: str) -> dict:
+        """
+        Cabeceras para una petición condicional, solo si el archivo local sigue existiendo.
+        :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+        :return: DICCIONARIO de cabeceras HTTP (puede estar vacío).
+        """
+        with self.lock:
+            entry = self.entries.get(date)
+        if not entry or not self.is_saved(date, entry):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, date: str, digest: str) -> bool:
+        """
+        Indica si el contenido descargado es igual al del archivo ya guardado.
+        """
+        with self.lock:
+            entry = self.entries.get(date)
+        return (
+            entry is not None
+            and entry.get("sha256") == digest
+            and self.is_saved(date, entry)
+        )
+
+    def record(
+        self, date: str, headers, digest: str = None, status: str = None, empty: bool = False
+    ):
+        """
+        Registra el resultado de una fecha. Las fechas nuevas o modificadas se registran solo
+        después de guardar su archivo.
+        :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+        :argumento headers: cabeceras de la respuesta HTTP.
+        :argumento digest: STRING con el hash del contenido (None si la respuesta fue 304).
+        :argumento status: STRING con el estado: new, changed, unchanged o not_modified.
+        :argumento empty: BOOL, True si la fecha no tiene episodios (no se guarda archivo).
+        """
+        with self.lock:
+            entry = self.entries.setdefault(date, {})
+            if headers.get("ETag"):
+                entry["etag"] = headers["ETag"]
+            if headers.get("Last-Modified"):
+                entry["last_modified"] = headers["Last-Modified"]
+            if digest is not None:
+                entry["sha256"] = digest
+                entry["empty"] = empty
+            self.last_run[date] = status
+
+    def save(self) -> None:
+        """
+        Escribe el manifiesto de forma atómica. Las fechas nuevas o modificadas se suman a las
+        pendientes de ejecuciones anteriores.
+        """
+        with self.lock:
+            changed = {d for d, s in self.last_run.items() if s in CHANGED}
+            manifest = {
+                "dates": dict(sorted(self.entries.items())),
+                "last_run": dict(sorted(self.last_run.items())),
+            }
+        # Se relee el manifiesto por si otro paso consumió fechas mientras se extraía
+        pending = set(read_manifest(self.json_folder)["pending"])
+        manifest["pending"] = sorted(pending | changed)
+        write_manifest(self.json_folder, manifest)
+        counts = {}
+        for status in manifest["last_run"].values():
+            counts[status] = counts.get(status, 0) + 1
+        logging.info(f"Manifiesto de caché actualizado: {counts}")
@@ -0,0 +1,361 @@
+import os
+import atexit
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+"""
+Instrumentación compartida por los scripts del ETL: tiempos por etapa (context manager o
+decorador), contadores de filas y bytes, histogramas (latencia HTTP, consultas SQLite) y
+eventos JSON, con exportación opcional en formato de texto de Prometheus.
+
+Está desactivada por defecto y en ese caso cada llamada termina en una sola comprobación, sin
+medir ni reservar nada. Se activa con configure() (p. ej. desde pipeline.py) o, al ejecutar un
+script, con la variable de entorno ETL_METRICS_DIR, que indica la carpeta donde se escriben:
+
+- events.jsonl: un evento JSON por línea (etapas, peticiones HTTP, consultas),
+- metrics.prom: contadores e histogramas en formato Prometheus, al terminar el proceso o al
+  llamar a write_prometheus,
+- profile_<etapa>.prof: perfiles de cProfile por etapa, si se activa ETL_PROFILE=1.
+
+Con ETL_TRACEMALLOC=1 los eventos de etapa incluyen además el pico de memoria de Python.
+"""
+
+# Límites (en segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.folder = None
+        self.profile = False
+        self.tracemalloc = False
+        self.lock = threading.Lock()
+        self.events_file = None
+        self.counters = {}
+        self.histograms = {}
+        self.depth = 0  # etapas anidadas; cProfile y tracemalloc solo miden la más externa
+        self.exit_hook = False
+
+
+_state = _State()
+
+
+def configure(folder=None, profile=False, tracemalloc=False):
+    """
+    Activa la instrumentación.
+    :argumento folder: STRING con la carpeta de events.jsonl, metrics.prom y los perfiles.
+        Si es None se desactiva todo.
+    :argumento profile: BOOL, genera un perfil de cProfile por etapa.
+    :argumento tracemalloc: BOOL, mide el pico de memoria de Python por etapa.
+    """
+    close()
+    _state.enabled = folder is not None
+    _state.folder = folder
+    _state.profile = profile
+    _state.tracemalloc = tracemalloc
+    if folder is not None:
+        os.makedirs(folder, exist_ok=True)
+        if not _state.exit_hook:
+            atexit.register(_flush_at_exit)
+            _state.exit_hook = True
+
+
+def _flush_at_exit():
+    if _state.enabled:
+        write_prometheus()
+        close()
+
+
+def configure_from_env():
+    """
+    Activa la instrumentación si está definida la variable ETL_METRICS_DIR.
+    """
+    folder = os.environ.get("ETL_METRICS_DIR")
+    if folder:
+        configure(
+            folder,
+            profile=os.environ.get("ETL_PROFILE") == "1",
+            tracemalloc=os.environ.get("ETL_TRACEMALLOC") == "1",
+        )
+
+
+def configure_script():
+    """
+    Configura el proceso al ejecutar un script (su main): el formato de los logs y la
+    instrumentación según ETL_METRICS_DIR. No se hace al importar los módulos, para que
+    importarlos no cree carpetas ni cambie la configuración de logging de quien los usa.
+    """
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    configure_from_env()
+
+
+def enabled():
+    return _state.enabled
+
+
+def close():
+    """
+    Cierra el archivo de eventos y descarta las métricas acumuladas.
+    """
+    with _state.lock:
+        if _state.events_file is not None:
+            _state.events_file.close()
+            _state.events_file = None
+        _state.counters = {}
+        _state.histograms = {}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def emit(event, **fields):
+    """
+    Escribe un evento JSON en events.jsonl.
+    :argumento event: STRING con el tipo de evento.
+    :argumento fields: campos adicionales del evento.
+    """
+    if not _state.enabled:
+        return
+    record = {"ts": round(time.time(), 6), "event": event, **fields}
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _state.lock:
+        if _state.events_file is None:
+            _state.events_file = open(
+                os.path.join(_state.folder, "events.jsonl"), "a", encoding="utf-8"
+            )
+        _state.events_file.write(line + "\n")
+        _state.events_file.flush()
+
+
+def count(name, value=1, **labels):
+    """
+    Suma value al contador name con las etiquetas indicadas.
+    """
+    if not _state.enabled:
+        return
+    key = _key(name, labels)
+    with _state.lock:
+        _state.counters[key] = _state.counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """
+    Registra una observación en el histograma name.
+    :argumento name: STRING con el nombre del histograma.
+    :argumento value: FLOAT con el valor observado (p. ej. segundos).
+    :argumento buckets: TUPLA ordenada con los límites superiores de los buckets.
+    """
+    if not _state.enabled:
+        return
+    key = _key(name, labels)
+    with _state.lock:
+        histogram = _state.histograms.get(key)
+        if histogram is None:
+            histogram = _state.histograms[key] = {
+                "buckets": buckets,
+                "counts": [0] * (len(buckets) + 1),
+                "sum": 0.0,
+            }
+        histogram["counts"][bisect_left(histogram["buckets"], value)] += 1
+        histogram["sum"] += value
+
+
+class _NoopSpan:
+    """
+    Span que no hace nada, devuelto por timer() cuando la instrumentación está desactivada.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_rows(self, rows):
+        pass
+
+    def add_bytes_read(self, size):
+        pass
+
+    def add_bytes_written(self, size):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span(_NoopSpan):
+    """
+    Mide una etapa: tiempo, filas y bytes, y opcionalmente cProfile y tracemalloc.
+    """
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.fields = {}
+        self.profiler = None
+        self.tracing = False
+
+    def add_rows(self, rows):
+        self.fields["rows"] = self.fields.get("rows", 0) + int(rows)
+
+    def add_bytes_read(self, size):
+        self.fields["bytes_read"] = self.fields.get("bytes_read", 0) + int(size)
+
+    def add_bytes_written(self, size):
+        self.fields["bytes_written"] = self.fields.get("bytes_written", 0) + int(size)
+
+    def __enter__(self):
+        _state.depth += 1
+        if _state.depth == 1:
+            if _state.tracemalloc:
+                import tracemalloc
+
+                self.tracing = not tracemalloc.is_tracing()
+                if self.tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+            if _state.profile:
+                import cProfile
+
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        _state.depth -= 1
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(os.path.join(_state.folder, f"profile_{self.stage}.prof"))
+        if _state.tracemalloc and _state.depth == 0:
+            import tracemalloc
+
+            self.fields["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+            if self.tracing:
+                tracemalloc.stop()
+
+        status = "error" if exc_type else "ok"
+        observe("stage_duration_seconds", seconds, stage=self.stage, **self.labels)
+        count("stage_runs_total", stage=self.stage, status=status, **self.labels)
+        for field in ("rows", "bytes_read", "bytes_written"):
+            if field in self.fields:
+                count(f"{field}_total", self.fields[field], stage=self.stage, **self.labels)
+        emit(
+            "stage",
+            stage=self.stage,
+            status=status,
+            seconds=round(seconds, 6),
+            **self.labels,
+            **self.fields,
+        )
+        return False
+
+
+def timer(stage, **labels):
+    """
+    Context manager que mide una etapa y emite un evento al terminar:
+
+        with instrumentation.timer("transform_data") as span:
+            ...
+            span.add_rows(len(df))
+
+    :argumento stage: STRING con el nombre de la etapa.
+    :argumento labels: etiquetas adicionales del evento y las métricas.
+    :return: Span (sin efecto si la instrumentación está desactivada).
+    """
+    if not _state.enabled:
+        return _NOOP
+    return _Span(stage, labels)
+
+
+def timed(stage=None, rows=None):
+    """
+    Decorador equivalente a envolver la función en timer(stage).
+    :argumento stage: STRING con el nombre de la etapa (por defecto, el de la función).
+    :argumento rows: función opcional que recibe el resultado y devuelve las filas procesadas.
+    """
+
+    def decorator(func):
+        name = stage or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with _Span(name, {}) as span:
+                value = func(*args, **kwargs)
+                if rows is not None and value is not None:
+                    span.add_rows(rows(value))
+                return value
+
+        return wrapper
+
+    return decorator
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def prometheus_text():
+    """
+    :return: STRING con los contadores e histogramas en formato de texto de Prometheus.
+    """
+    lines = []
+    with _state.lock:
+        counters = dict(_state.counters)
+        histograms = {k: dict(v, counts=list(v["counts"])) for k, v in _state.histograms.items()}
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE etl_{name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"etl_{name}{_format_labels(labels)} {value}")
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE etl_{name} histogram")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            bounds = [str(b) for b in histogram["buckets"]] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, histogram["counts"]):
+                cumulative += bucket_count
+                lines.append(
+                    f"etl_{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}"
+                )
+            lines.append(f"etl_{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"etl_{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """
+    Escribe las métricas acumuladas en formato Prometheus (por defecto en metrics.prom).
+    :argumento path: STRING con la ruta del archivo (opcional).
+    :return: STRING con la ruta escrita o None si la instrumentación está desactivada.
+    """
+    if not _state.enabled:
+        return None
+    path = path or os.path.join(_state.folder, "metrics.prom")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return path
+
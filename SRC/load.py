@@ -1,102 +1,297 @@
 import os
+import argparse
+import json
+import operator
 import pandas as pd
+import pyarrow.dataset as ds
 import logging
 import sqlite3
 
+import aggregates
+import domains
+import instrumentation
+import schema
+
 """
 Script para crear una base de datos SQLite con los datos de los episodios, shows y géneros, así como 
 agregaciones para visualizar alguna información requerida"""
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
 DB_FOLDER = os.path.join(BASE_DIR, "..", "db")
-os.makedirs(DB_FOLDER, exist_ok=True)
 DB_PATH = os.path.join(DB_FOLDER, "entretenimiento.db")
-episodes_path = os.path.join(DATA_FOLDER, "episodes_cleaned.parquet")
+episodes_path = os.path.join(DATA_FOLDER, "episodes_cleaned")  # dataset particionado
 shows_path = os.path.join(DATA_FOLDER, "shows_cleaned.parquet")
 genres_path = os.path.join(DATA_FOLDER, "genres_cleaned.parquet")
 
 
-def load_data(episodes_path, shows_path, genres_path):
+def date_filter(start_date=None, end_date=None):
+    """
+    Construye el filtro de un rango de fechas sobre las particiones year/month/day, para que
+    pyarrow descarte las particiones fuera del rango sin abrir sus archivos.
+    :argumento start_date: STRING con la fecha inicial YYYY-MM-DD (incluida) o None.
+    :argumento end_date: STRING con la fecha final YYYY-MM-DD (incluida) o None.
+    :return: pyarrow.dataset.Expression o None si no hay rango.
+    """
+    year, month, day = ds.field("year"), ds.field("month"), ds.field("day")
+    expression = None
+    bounds = ((start_date, operator.gt, operator.ge), (end_date, operator.lt, operator.le))
+    for date, strict, inclusive in bounds:
+        if not date:
+            continue
+        y, m, d = (int(part) for part in date.split("-"))
+        # Compara (year, month, day) contra (y, m, d) como una tupla
+        bound = strict(year, y) | (
+            (year == y) & (strict(month, m) | ((month == m) & inclusive(day, d)))
+        )
+        expression = bound if expression is None else expression & bound
+    return expression
+
+
+def load_episodes(episodes_path, start_date=None, end_date=None, filters=None):
+    """
+    Lee el dataset de episodios usando poda de particiones por fecha y filtros adicionales
+    que se empujan a las estadísticas de los grupos de filas.
+    :argumento episodes_path: STRING con la carpeta del dataset particionado.
+    :argumento start_date: STRING con la fecha inicial YYYY-MM-DD o None.
+    :argumento end_date: STRING con la fecha final YYYY-MM-DD o None.
+    :argumento filters: pyarrow.dataset.Expression opcional (p. ej. ds.field("show_id") == 1).
+    :return: DATAFRAME de episodios sin las columnas de partición.
+    """
+    dataset = ds.dataset(episodes_path, format="parquet", partitioning="hive")
+    expression = date_filter(start_date, end_date)
+    if filters is not None:
+        expression = filters if expression is None else expression & filters
+    table = dataset.to_table(filter=expression)
+    episodes_df = table.to_pandas().drop(columns=list(schema.PARTITIONS), errors="ignore")
+    return schema.apply_dtypes(episodes_df, schema.EPISODES)
+
+
+def load_data(episodes_path, shows_path, genres_path, start_date=None, end_date=None):
     """
     Carga los dataframes de los archivos parquet en la carpeta DATA.
-    :argumento episodes_path: STRING con la ruta del archivo de episodio.
+    :argumento episodes_path: STRING con la ruta del dataset de episodios.
     :argumento shows_path: STRING con la ruta del archivo de shows.
     :argumento genres_path: STRING con la ruta del archivo de genres.
+    :argumento start_date: STRING con la fecha inicial YYYY-MM-DD de los episodios a cargar (opcional).
+    :argumento end_date: STRING con la fecha final YYYY-MM-DD de los episodios a cargar (opcional).
     :return: DATAFRAMES de episodios, shows y genres editados o None en caso de error.
     """
     try:
-        episodes_df = pd.read_parquet(episodes_path)
-        shows_df = pd.read_parquet(shows_path)
-        genres_df = pd.read_parquet(genres_path)
+        episodes_df = load_episodes(episodes_path, start_date, end_date)
+        shows_df = schema.apply_dtypes(pd.read_parquet(shows_path), schema.SHOWS)
+        genres_df = schema.apply_dtypes(pd.read_parquet(genres_path), schema.GENRES)
         return episodes_df, shows_df, genres_df
     except Exception as e:
         logging.error(f"Error cargando los datos: {e}")
         return None
 
 
-def create_tables():
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shows (
+    id INTEGER PRIMARY KEY,
+    url TEXT,
+    name TEXT,
+    type TEXT,
+    language TEXT,
+    status TEXT,
+    averageRuntime REAL,
+    premiered DATE,
+    ended DATE,
+    officialSite TEXT,
+    schedule_time TIME,
+    schedule_days TEXT,
+    weight REAL,
+    summary TEXT,
+    webChannel_name TEXT,
+    webChannel_site TEXT,
+    externals_thetvdb TEXT,
+    externals_imdb TEXT,
+    updated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    season INTEGER,
+    number INTEGER,
+    type TEXT,
+    airdate DATE,
+    airtime TIME,
+    airstamp TIMESTAMP,
+    runtime REAL,
+    show_id INTEGER,
+    FOREIGN KEY (show_id) REFERENCES shows (id) ON DELETE CASCADE
+);
+
+-- Dimensión de géneros con claves enteras
+CREATE TABLE IF NOT EXISTS genre_dim (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS genres (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    show_id INTEGER,
+    genres TEXT,
+    genre_id INTEGER,
+    UNIQUE (show_id, genres),
+    FOREIGN KEY (show_id) REFERENCES shows (id) ON DELETE CASCADE,
+    FOREIGN KEY (genre_id) REFERENCES genre_dim (id)
+);
+
+-- Dimensión de dominios registrables y dominio de cada show por fuente (officialSite, url,
+-- webChannel), calculados en clean.domains_creation
+CREATE TABLE IF NOT EXISTS domain_dim (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS show_domains (
+    show_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    domain_id INTEGER NOT NULL,
+    PRIMARY KEY (show_id, source),
+    FOREIGN KEY (show_id) REFERENCES shows (id) ON DELETE CASCADE,
+    FOREIGN KEY (domain_id) REFERENCES domain_dim (id)
+);
+
+-- Índices de texto completo (FTS5) sobre los nombres de shows y episodios y los resúmenes de
+-- los shows (sin HTML, ver clean.strip_html). El texto queda solo en shows y episodes
+-- (content=...); los mantienen los triggers de SEARCH_TRIGGERS.
+CREATE VIRTUAL TABLE IF NOT EXISTS search_shows USING fts5(
+    name, summary, content='shows', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+-- El nombre del show pesa más que el resumen en el ranking bm25
+INSERT INTO search_shows (search_shows, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_episodes USING fts5(
+    name, content='episodes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Versión de los datos cargados: se incrementa en cada carga para que los lectores
+-- (query_service.py) invaliden sus cachés
+CREATE TABLE IF NOT EXISTS load_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    loaded_at TIMESTAMP
+);
+INSERT OR IGNORE INTO load_meta (id, version) VALUES (1, 0);
+"""
+
+# Los índices secundarios se crean después de la carga masiva
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_episodes_show_airdate ON episodes (show_id, airdate);
+CREATE INDEX IF NOT EXISTS idx_episodes_airdate ON episodes (airdate);
+CREATE INDEX IF NOT EXISTS idx_genres_genre_show ON genres (genres, show_id);
+CREATE INDEX IF NOT EXISTS idx_genres_genre_id_show ON genres (genre_id, show_id);
+CREATE INDEX IF NOT EXISTS idx_show_domains_source_domain ON show_domains (source, domain_id, show_id);
+PRAGMA optimize;
+"""
+
+# Migraciones de las bases creadas con versiones anteriores, en orden. Cada una se aplica una
+# sola vez: PRAGMA user_version guarda cuántas tiene la base.
+MIGRATIONS = (
+    # idx_episodes_show_airdate (show_id, airdate) reemplaza al índice solo por show_id
+    "DROP INDEX IF EXISTS idx_episodes_show_id;",
+)
+
+SEARCH_TABLES = ("search_shows", "search_episodes")
+# Triggers que actualizan los índices de búsqueda con cada insert, upsert que cambia el texto
+# o borrado, así las cargas incrementales solo reindexan las filas que cambiaron. Se crean
+# después de la primera carga: en una carga masiva reconstruir el índice de una vez es ~3 veces
+# más rápido que llenarlo fila a fila con los triggers.
+SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS shows_search_insert AFTER INSERT ON shows BEGIN
+        INSERT INTO search_shows (rowid, name, summary) VALUES (new.id, new.name, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS shows_search_delete AFTER DELETE ON shows BEGIN
+        INSERT INTO search_shows (search_shows, rowid, name, summary)
+        VALUES ('delete', old.id, old.name, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS shows_search_update AFTER UPDATE OF name, summary ON shows
+    WHEN old.name IS NOT new.name OR old.summary IS NOT new.summary BEGIN
+        INSERT INTO search_shows (search_shows, rowid, name, summary)
+        VALUES ('delete', old.id, old.name, old.summary);
+        INSERT INTO search_shows (rowid, name, summary) VALUES (new.id, new.name, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS episodes_search_insert AFTER INSERT ON episodes BEGIN
+        INSERT INTO search_episodes (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
     """
-    Crea las tablas en la base de datos SQLite.
+    CREATE TRIGGER IF NOT EXISTS episodes_search_delete AFTER DELETE ON episodes BEGIN
+        INSERT INTO search_episodes (search_episodes, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS episodes_search_update AFTER UPDATE OF name ON episodes
+    WHEN old.name IS NOT new.name BEGIN
+        INSERT INTO search_episodes (search_episodes, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO search_episodes (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+)
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",  # 64 MB
+    "PRAGMA temp_store = MEMORY",
+)
+BATCH_SIZE = 50000
+
+
+def connect(db_path=DB_PATH):
+    """
+    Abre la base de datos aplicando los PRAGMAs de carga (WAL, synchronous, cache_size).
+    :argumento db_path: STRING con la ruta de la base de datos.
+    :return: sqlite3.Connection
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def create_tables(rebuild=False, db_path=DB_PATH):
+    """
+    Crea las tablas en la base de datos SQLite si no existen.
+    :argumento rebuild: BOOL, si es True borra las tablas antes de crearlas.
+    :argumento db_path: STRING con la ruta de la base de datos.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.executescript(
-            """
-            DROP TABLE IF EXISTS episodes;
-            DROP TABLE IF EXISTS shows;
-            DROP TABLE IF EXISTS genres;
-
-            CREATE TABLE shows (
-                id INTEGER PRIMARY KEY,
-                url TEXT,
-                name TEXT,
-                type TEXT,
-                language TEXT,
-                status TEXT,
-                averageRuntime REAL,
-                premiered DATE,
-                ended DATE,
-                officialSite TEXT,
-                schedule_time TIME,
-                schedule_days TEXT,
-                weight REAL,
-                summary TEXT,
-                webChannel_name TEXT,
-                webChannel_site TEXT,
-                externals_thetvdb TEXT,
-                externals_imdb TEXT,                                 
-                updated TEXT
-            );
-
-            CREATE TABLE episodes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                season INTEGER,
-                number INTEGER,
-                type TEXT,
-                airdate DATE, 
-                airtime TIME,
-                airstamp TIMESTAMP,
-                runtime REAL,                
-                show_id INTEGER,
-                FOREIGN KEY (show_id) REFERENCES shows (id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE genres (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                show_id INTEGER,
-                genres TEXT,
-                FOREIGN KEY (show_id) REFERENCES shows (id) ON DELETE CASCADE
-            );
-            """
-        )
+        conn = connect(db_path)
+        if not rebuild and not schema_is_current(conn):
+            logging.warning("Las tablas existentes no tienen las claves del modelo, se recrean.")
+            rebuild = True
+        if rebuild:
+            conn.executescript(
+                """
+                DROP TABLE IF EXISTS episodes;
+                DROP TABLE IF EXISTS genres;
+                DROP TABLE IF EXISTS shows;
+                DROP TABLE IF EXISTS genre_dim;
+                DROP TABLE IF EXISTS show_domains;
+                DROP TABLE IF EXISTS domain_dim;
+                """
+            )
+            for table in aggregates.TABLES + SEARCH_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.executescript(SCHEMA)
+        conn.executescript(aggregates.SCHEMA)
+        migrate(conn)
+        if rebuild:
+            bump_load_version(conn)
         conn.commit()
         conn.close()
         logging.info("Tablas creadas en la base de datos.")
@@ -106,31 +301,389 @@ def create_tables():
         return False
 
 
-def load_dfs_to_tables(episodes, shows, genres):
+def migrate(conn):
+    """
+    Aplica las migraciones de MIGRATIONS que la base todavía no tiene.
+    :argumento conn: sqlite3.Connection
+    :return: INT con el número de migraciones aplicadas.
+    """
+    applied = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, script in enumerate(MIGRATIONS[applied:], start=applied + 1):
+        conn.executescript(script)
+        conn.execute(f"PRAGMA user_version = {version}")
+        logging.info(f"Migración {version} aplicada.")
+    return max(len(MIGRATIONS) - applied, 0)
+
+
+def schema_is_current(conn):
+    """
+    Verifica que las tablas existentes tengan las claves necesarias para los upserts. Las bases
+    creadas con to_sql(if_exists="replace") no tienen claves primarias ni restricciones UNIQUE.
+    :argumento conn: sqlite3.Connection
+    :return: BOOL
+    """
+    tables = dict(
+        conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall()
+    )
+    required = {
+        "shows": ["PRIMARY KEY"],
+        "episodes": ["PRIMARY KEY"],
+        "genres": ["UNIQUE", "GENRE_ID"],
+        "show_domains": ["DOMAIN_ID"],
+    }
+    return all(
+        name not in tables or marker in (tables[name] or "").upper()
+        for name, markers in required.items()
+        for marker in markers
+    )
+
+
+def search_index_maintained(conn):
+    """
+    :argumento conn: sqlite3.Connection
+    :return: BOOL, True si existen los triggers que mantienen los índices de búsqueda.
+    """
+    names = [statement.split()[5] for statement in SEARCH_TRIGGERS]
+    placeholders = ", ".join("?" for _ in names)
+    (count,) = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        names,
+    ).fetchone()
+    return count == len(names)
+
+
+def rebuild_search_index(conn):
+    """
+    Vuelve a construir los índices de búsqueda desde las tablas shows y episodes y crea los
+    triggers que los mantienen en las cargas siguientes.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    """
+    for table in SEARCH_TABLES:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    for statement in SEARCH_TRIGGERS:
+        conn.execute(statement)
+
+
+def check_search_index(conn):
+    """
+    Verifica que los índices de búsqueda coincidan con el texto de shows y episodes.
+    :argumento conn: sqlite3.Connection
+    :return: DICCIONARIO tabla -> STRING con el error, o None si es consistente.
     """
-    Carga los dataframes en las tablas de la base de datos.
+    errors = {}
+    for table in SEARCH_TABLES:
+        try:
+            conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('integrity-check', 1)")
+            errors[table] = None
+        except sqlite3.DatabaseError as e:
+            errors[table] = str(e)
+    return errors
+
+
+def bump_load_version(conn):
+    """
+    Incrementa la versión de los datos en load_meta (dentro de la transacción del llamador).
+    :argumento conn: sqlite3.Connection
+    :return: INT con la nueva versión.
+    """
+    conn.execute(
+        "UPDATE load_meta SET version = version + 1, loaded_at = CURRENT_TIMESTAMP WHERE id = 1"
+    )
+    return conn.execute("SELECT version FROM load_meta WHERE id = 1").fetchone()[0]
+
+
+def create_indexes(conn):
+    """
+    Crea los índices secundarios. Se llama después de la carga masiva para no mantenerlos
+    fila a fila durante los inserts.
+    :argumento conn: sqlite3.Connection
+    """
+    conn.executescript(INDEXES)
+
+
+def serialize_lists(df, columns=("schedule_days",)):
+    """
+    Convierte las columnas de listas a texto JSON, ya que SQLite no tiene un tipo lista.
+    :argumento df: DATAFRAME a cargar.
+    :argumento columns: columnas que contienen listas.
+    :return: DATAFRAME con las listas serializadas.
+    """
+    df = df.copy()
+    for column in columns:
+        if column in df.columns:
+            # Las listas llegan como list (en memoria) o ndarray (desde Parquet), y los nulos
+            # como None o pd.NA
+            df[column] = df[column].map(
+                lambda x: json.dumps(list(x))
+                if pd.api.types.is_list_like(x)
+                else (None if pd.isna(x) else x)
+            )
+    return df
+
+
+def table_columns(conn, table):
+    """
+    :argumento conn: sqlite3.Connection
+    :argumento table: STRING con el nombre de la tabla.
+    :return: LISTA con las columnas declaradas de la tabla.
+    """
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def dataframe_rows(df, columns):
+    """
+    Convierte las columnas indicadas del DataFrame en tuplas de tipos nativos de Python
+    (None para los nulos), listas para executemany. Los float que solo contienen enteros
+    (p. ej. ids externos) se pasan como int.
+    :argumento df: DATAFRAME de origen.
+    :argumento columns: LISTA de columnas a extraer.
+    :return: LISTA de tuplas.
+    """
+    data = {}
+    for column in columns:
+        series = df[column]
+        if series.dtype.kind == "f" and (series.dropna() % 1 == 0).all():
+            series = series.astype("Int64")
+        data[column] = series.astype(object).where(series.notna(), None)
+    return list(zip(*(data[column] for column in columns)))
+
+
+def upsert_rows(conn, table, df, key, batch_size=BATCH_SIZE):
+    """
+    Inserta o actualiza filas con INSERT ... ON CONFLICT DO UPDATE en lotes de executemany.
+    Las filas existentes solo se reescriben si alguna columna cambió.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    :argumento table: STRING con el nombre de la tabla.
+    :argumento df: DATAFRAME con las filas a cargar.
+    :argumento key: TUPLA con las columnas de la clave de conflicto.
+    :argumento batch_size: INT con el número de filas por executemany.
+    :return: INT con el número de filas insertadas o modificadas.
+    """
+    columns = [c for c in table_columns(conn, table) if c in df.columns]
+    updates = [c for c in columns if c not in key]
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    sql += f" ON CONFLICT ({', '.join(key)}) DO "
+    if updates:
+        sql += "UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in updates)
+        sql += " WHERE " + " OR ".join(f"{table}.{c} IS NOT excluded.{c}" for c in updates)
+    else:
+        sql += "NOTHING"
+
+    with instrumentation.timer("upsert_rows", table=table) as span:
+        rows = dataframe_rows(df, columns)
+        before = conn.total_changes
+        for start in range(0, len(rows), batch_size):
+            conn.executemany(sql, rows[start : start + batch_size])
+        span.add_rows(len(rows))
+    return conn.total_changes - before
+
+
+def stage_shows(conn, shows):
+    """
+    Guarda los ids de los shows de la carga en la tabla temporal stage_shows, usada para
+    sincronizar sus géneros y refrescar los agregados que los involucran.
+    :argumento conn: sqlite3.Connection
+    :argumento shows: DATAFRAME de shows cargados.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS stage_shows (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM stage_shows")
+    conn.executemany(
+        "INSERT OR IGNORE INTO stage_shows (id) VALUES (?)", dataframe_rows(shows, ["id"])
+    )
+
+
+def replace_genres(conn, genres, batch_size=BATCH_SIZE):
+    """
+    Sincroniza los géneros de las series de stage_shows: inserta los pares (show_id, género)
+    nuevos con su clave en genre_dim y borra los que ya no aparecen para esas series.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    :argumento genres: DATAFRAME de géneros (show_id, genres).
+    :argumento batch_size: INT con el número de filas por executemany.
+    :return: INT con el número de filas insertadas o borradas.
+    """
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS stage_genres (show_id INTEGER, genres TEXT)"
+    )
+    conn.execute("DELETE FROM stage_genres")
+    rows = dataframe_rows(genres, ["show_id", "genres"])
+    for start in range(0, len(rows), batch_size):
+        conn.executemany(
+            "INSERT INTO stage_genres (show_id, genres) VALUES (?, ?)",
+            rows[start : start + batch_size],
+        )
+
+    before = conn.total_changes
+    conn.execute(
+        """
+        DELETE FROM genres
+        WHERE show_id IN (SELECT id FROM stage_shows)
+          AND (show_id, genres) NOT IN (SELECT show_id, genres FROM stage_genres)
+        """
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO genre_dim (name) SELECT DISTINCT genres FROM stage_genres"
+    )
+    conn.execute(
+        """
+        INSERT INTO genres (show_id, genres, genre_id)
+        SELECT s.show_id, s.genres, d.id
+        FROM stage_genres s JOIN genre_dim d ON d.name = s.genres
+        WHERE true
+        ON CONFLICT (show_id, genres) DO NOTHING
+        """
+    )
+    return conn.total_changes - before
+
+
+def replace_show_domains(conn, shows, batch_size=BATCH_SIZE):
+    """
+    Sincroniza los dominios de las series de stage_shows: registra los dominios nuevos en
+    domain_dim, actualiza el dominio de cada (show, fuente) y borra los que ya no tienen URL.
+    :argumento conn: sqlite3.Connection (la transacción la maneja el llamador).
+    :argumento shows: DATAFRAME de shows con las columnas de dominio de clean.domains_creation
+        (si faltan se calculan a partir de las URLs).
+    :argumento batch_size: INT con el número de filas por executemany.
+    :return: INT con el número de filas insertadas, modificadas o borradas.
+    """
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS stage_show_domains (
+            show_id INTEGER, source TEXT, domain TEXT, PRIMARY KEY (show_id, source)
+        )
+        """
+    )
+    conn.execute("DELETE FROM stage_show_domains")
+    rows = dataframe_rows(domains.show_domain_links(shows), ["show_id", "source", "domain"])
+    for start in range(0, len(rows), batch_size):
+        conn.executemany(
+            "INSERT OR REPLACE INTO stage_show_domains (show_id, source, domain) VALUES (?, ?, ?)",
+            rows[start : start + batch_size],
+        )
+
+    before = conn.total_changes
+    conn.execute(
+        """
+        DELETE FROM show_domains
+        WHERE show_id IN (SELECT id FROM stage_shows)
+          AND (show_id, source) NOT IN (SELECT show_id, source FROM stage_show_domains)
+        """
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO domain_dim (name) SELECT DISTINCT domain FROM stage_show_domains"
+    )
+    conn.execute(
+        """
+        INSERT INTO show_domains (show_id, source, domain_id)
+        SELECT s.show_id, s.source, d.id
+        FROM stage_show_domains s JOIN domain_dim d ON d.name = s.domain
+        WHERE true
+        ON CONFLICT (show_id, source) DO UPDATE SET domain_id = excluded.domain_id
+        WHERE show_domains.domain_id IS NOT excluded.domain_id
+        """
+    )
+    return conn.total_changes - before
+
+
+@instrumentation.timed()
+def load_dfs_to_tables(episodes, shows, genres, db_path=DB_PATH, batch_size=BATCH_SIZE):
+    """
+    Carga los dataframes en las tablas de la base de datos dentro de una sola transacción,
+    con upserts por lotes sobre el esquema declarado en create_tables, y refresca los agregados
+    de los shows cargados. Los índices se crean al final de la carga. Los índices de búsqueda
+    se construyen de una vez en la primera carga y después los mantienen los triggers.
     :argumento episodes: DATAFRAME de episodios.
     :argumento shows: DATAFRAME de shows.
     :argumento genres: DATAFRAME de géneros.
+    :argumento db_path: STRING con la ruta de la base de datos.
+    :argumento batch_size: INT con el número de filas por executemany.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        episodes.to_sql("episodes", conn, if_exists="replace", index=False)
-        shows.to_sql("shows", conn, if_exists="replace", index=False)
-        genres.to_sql("genres", conn, if_exists="replace", index=False)
-        conn.commit()
+        conn = connect(db_path)
+        with conn:  # una sola transacción: commit al final o rollback si falla
+            stage_shows(conn, shows)
+            incremental = aggregates.is_initialized(conn)
+            search_maintained = search_index_maintained(conn)
+            old_runtime = aggregates.collect_keys(conn)
+            changes = {
+                "shows": upsert_rows(conn, "shows", serialize_lists(shows), ("id",), batch_size),
+                "episodes": upsert_rows(conn, "episodes", episodes, ("id",), batch_size),
+                "genres": replace_genres(conn, genres, batch_size),
+                "domains": replace_show_domains(conn, shows, batch_size),
+            }
+            if incremental:
+                changes["agregados"] = aggregates.refresh_aggregates(conn, old_runtime)
+            else:
+                changes["agregados"] = aggregates.rebuild_aggregates(conn)
+            if not search_maintained:
+                rebuild_search_index(conn)
+                logging.info("Índices de búsqueda construidos.")
+            version = bump_load_version(conn)
+        create_indexes(conn)
         conn.close()
-        logging.info("Dataframes cargados en la base de datos.")
+        for table, changed in changes.items():
+            instrumentation.count("rows_changed_total", changed, table=table)
+        logging.info(
+            f"Dataframes cargados en la base de datos (versión {version}). "
+            f"Filas modificadas: {changes}"
+        )
         return True
     except Exception as e:
         logging.error(f"Error cargando los dataframes en la base de datos: {e}")
         return False
 
 
-if __name__ == "__main__":
-    episodes, shows, genres = load_data(episodes_path, shows_path, genres_path)
+def main(argv=None):
+    """
+    Carga los Parquet limpios en entretenimiento.db o verifica los agregados.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(description="Carga los Parquet limpios en SQLite")
+    parser.add_argument("--start", help="Fecha inicial YYYY-MM-DD de los episodios a cargar")
+    parser.add_argument("--end", help="Fecha final YYYY-MM-DD de los episodios a cargar")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Borra y vuelve a crear las tablas en lugar de hacer upserts",
+    )
+    parser.add_argument(
+        "--check-aggregates",
+        action="store_true",
+        help="Recalcula los agregados desde cero y los compara con los mantenidos, y verifica "
+        "los índices de búsqueda",
+    )
+    args = parser.parse_args(argv)
+
+    if args.check_aggregates:
+        conn = connect()
+        differences = aggregates.check_aggregates(conn)
+        search_errors = check_search_index(conn)
+        conn.close()
+        for table, diff in differences.items():
+            if diff.empty:
+                logging.info(f"{table}: consistente")
+            else:
+                print(f"\n{table}:\n{diff}")
+        for table, error in search_errors.items():
+            if error is None:
+                logging.info(f"{table}: consistente")
+            else:
+                print(f"\n{table}: {error}")
+        inconsistent = any(not d.empty for d in differences.values()) or any(
+            search_errors.values()
+        )
+        raise SystemExit(1 if inconsistent else 0)
+
+    episodes, shows, genres = load_data(
+        episodes_path, shows_path, genres_path, args.start, args.end
+    )
     if episodes is None or shows is None or genres is None:
         logging.error("No se pudo cargar los archivos Parquet. Proceso detenido.")
     else:
-        if create_tables():
+        if create_tables(rebuild=args.rebuild):
             load_dfs_to_tables(episodes, shows, genres)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import instrumentation
+from load import date_filter
+
+try:
+    import duckdb
+except ImportError:  # DuckDB es opcional, el backend arrow solo necesita pyarrow
+    duckdb = None
+
+"""
+Backends de lectura de read.py que responden las mismas preguntas directamente sobre los
+Parquet limpios de clean.py (shows_cleaned.parquet, genres_cleaned.parquet y el dataset
+episodes_cleaned particionado por fecha), sin pasar por las tablas de SQLite:
+
+- arrow: agregaciones de pyarrow.compute (group_by) sobre las columnas necesarias,
+- duckdb: el SQL de cada consulta sobre read_parquet, si DuckDB está instalado.
+
+Los dos devuelven tablas Arrow (to_pandas solo al mostrarlas) con las mismas columnas que las
+consultas SQLite de read.QUERIES. Las consultas de episodios con rango de fechas solo leen las
+particiones year/month/day del rango y, como en SQLite, no cuentan los episodios sin airdate.
+
+Los Parquet tienen lo que escribió la última ejecución de clean.py, mientras que SQLite acumula
+las cargas de load.py: los resultados coinciden cuando clean.py procesó todos los JSON.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
+SHOWS_FILE = "shows_cleaned.parquet"
+GENRES_FILE = "genres_cleaned.parquet"
+EPISODES_DATASET = "episodes_cleaned"
+
+
+def available_backends():
+    """
+    :return: LISTA con los backends de este módulo que se pueden usar en este entorno.
+    """
+    return ["arrow"] + (["duckdb"] if duckdb is not None else [])
+
+
+def _sorted(table, keys):
+    return table.sort_by(keys) if table.num_rows else table
+
+
+class ArrowBackend:
+    """
+    Responde las consultas de read.QUERIES con pyarrow.compute sobre los Parquet de DATA.
+    """
+
+    name = "arrow"
+
+    def __init__(self, data_folder=DATA_FOLDER):
+        self.data_folder = data_folder
+        self.episodes = None
+
+    def _episodes_dataset(self):
+        # La lista de archivos del dataset se lee una sola vez por backend
+        if self.episodes is None:
+            path = os.path.join(self.data_folder, EPISODES_DATASET)
+            self.episodes = ds.dataset(path, format="parquet", partitioning="hive")
+        return self.episodes
+
+    def _read(self, file_name, columns):
+        return pq.read_table(os.path.join(self.data_folder, file_name), columns=columns)
+
+    def runtime(self, start=None, end=None):
+        runtime = self._read(SHOWS_FILE, ["averageRuntime"])["averageRuntime"]
+        runtime = pc.cast(runtime, pa.float64())
+        return pa.table(
+            {
+                "cantidad_shows": [pc.count(runtime).as_py()],
+                "runtime_promedio": [pc.mean(runtime).as_py()],
+                "min_runtime": [pc.min(runtime).as_py()],
+                "max_runtime": [pc.max(runtime).as_py()],
+            }
+        )
+
+    def genre_counts(self, start=None, end=None):
+        genres = self._read(GENRES_FILE, ["show_id", "genres"])
+        counts = genres.group_by("genres").aggregate([("show_id", "count_distinct")])
+        counts = counts.rename_columns(
+            {"genres": "genero", "show_id_count_distinct": "cantidad_shows"}
+        )
+        counts = counts.select(["genero", "cantidad_shows"])
+        return _sorted(counts, [("cantidad_shows", "descending")])
+
+    def domains(self, start=None, end=None):
+        shows = self._read(SHOWS_FILE, ["id", "officialSite_domain"])
+        shows = shows.filter(pc.is_valid(shows["officialSite_domain"]))
+        counts = shows.group_by("officialSite_domain").aggregate([("id", "count_distinct")])
+        counts = counts.rename_columns(
+            {"officialSite_domain": "dominio", "id_count_distinct": "cantidad_shows"}
+        )
+        counts = counts.select(["dominio", "cantidad_shows"])
+        return _sorted(counts, [("cantidad_shows", "descending")])
+
+    def episodes_by_day(self, start=None, end=None):
+        expression = ds.field("airdate").is_valid()
+        dates = date_filter(start, end)
+        episodes = self._episodes_dataset().to_table(
+            columns=["airdate", "id", "runtime"],
+            filter=expression if dates is None else dates & expression,
+        )
+        days = episodes.group_by("airdate").aggregate([("id", "count"), ("runtime", "mean")])
+        days = days.rename_columns(
+            {"airdate": "fecha", "id_count": "episodios", "runtime_mean": "runtime_promedio"}
+        )
+        return _sorted(days.select(["fecha", "episodios", "runtime_promedio"]), "fecha")
+
+    def query(self, name, start=None, end=None):
+        """
+        :argumento name: STRING con el nombre de la consulta (ver read.QUERIES).
+        :argumento start: STRING con la fecha inicial YYYY-MM-DD o None.
+        :argumento end: STRING con la fecha final YYYY-MM-DD o None.
+        :return: pa.Table con el resultado.
+        """
+        return getattr(self, name)(start, end)
+
+    def close(self):
+        pass
+
+
+def _sql_string(value):
+    """
+    :return: STRING con el literal SQL de `value` (entre comillas simples, duplicando las que
+        tenga), para rutas con apóstrofos.
+    """
+    return "'{}'".format(value.replace("'", "''"))
+
+
+# SQL de DuckDB de cada consulta de read.QUERIES, sobre las vistas de DuckDBBackend
+DUCKDB_QUERIES = {
+    "runtime": """
+        SELECT COUNT(averageRuntime) AS cantidad_shows,
+               AVG(averageRuntime)::DOUBLE AS runtime_promedio,
+               MIN(averageRuntime)::DOUBLE AS min_runtime,
+               MAX(averageRuntime)::DOUBLE AS max_runtime
+        FROM shows
+    """,
+    "genre_counts": """
+        SELECT genres AS genero, COUNT(DISTINCT show_id) AS cantidad_shows
+        FROM genres GROUP BY genres ORDER BY cantidad_shows DESC
+    """,
+    "domains": """
+        SELECT officialSite_domain AS dominio, COUNT(DISTINCT id) AS cantidad_shows
+        FROM shows WHERE officialSite_domain IS NOT NULL
+        GROUP BY officialSite_domain ORDER BY cantidad_shows DESC
+    """,
+    # El filtro solo usa las columnas de partición, así DuckDB descarta los días fuera del rango
+    "episodes_by_day": """
+        SELECT airdate AS fecha, COUNT(id) AS episodios, AVG(runtime) AS runtime_promedio
+        FROM episodes
+        WHERE airdate IS NOT NULL
+          AND ($start IS NULL OR make_date(year, month, day) >= $start::DATE)
+          AND ($end IS NULL OR make_date(year, month, day) <= $end::DATE)
+        GROUP BY airdate ORDER BY airdate
+    """,
+}
+
+
+class DuckDBBackend:
+    """
+    Responde las consultas de read.QUERIES con DuckDB (en memoria) sobre los Parquet de DATA.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, data_folder=DATA_FOLDER):
+        if duckdb is None:
+            raise ImportError("El backend duckdb requiere el paquete duckdb (pip install duckdb)")
+        self.conn = duckdb.connect()
+        episodes = os.path.join(data_folder, EPISODES_DATASET, "**", "*.parquet")
+        for view, source in (
+            ("shows", f"read_parquet({_sql_string(os.path.join(data_folder, SHOWS_FILE))})"),
+            ("genres", f"read_parquet({_sql_string(os.path.join(data_folder, GENRES_FILE))})"),
+            ("episodes", f"read_parquet({_sql_string(episodes)}, hive_partitioning = true)"),
+        ):
+            # Las vistas no aceptan parámetros preparados, así que las rutas van como literales
+            self.conn.execute(f"CREATE VIEW {view} AS SELECT * FROM {source}")
+
+    def query(self, name, start=None, end=None):
+        """
+        :argumento name: STRING con el nombre de la consulta (ver read.QUERIES).
+        :argumento start: STRING con la fecha inicial YYYY-MM-DD o None.
+        :argumento end: STRING con la fecha final YYYY-MM-DD o None.
+        :return: pa.Table con el resultado.
+        """
+        sql = DUCKDB_QUERIES[name]
+        params = {key: value for key, value in (("start", start), ("end", end)) if f"${key}" in sql}
+        return self.conn.execute(sql, params).fetch_arrow_table()
+
+    def close(self):
+        self.conn.close()
+
+
+def connect(backend, data_folder=DATA_FOLDER):
+    """
+    :argumento backend: STRING, "arrow" o "duckdb".
+    :argumento data_folder: STRING con la carpeta de los Parquet limpios.
+    :return: ArrowBackend o DuckDBBackend.
+    """
+    backends = {"arrow": ArrowBackend, "duckdb": DuckDBBackend}
+    if backend not in backends:
+        raise ValueError(f"Backend no soportado: {backend}")
+    return backends[backend](data_folder)
+
+
+def run_query(backend, name, start=None, end=None):
+    """
+    Ejecuta una consulta en un backend de Parquet y registra su tiempo en el histograma
+    parquet_query_seconds si la instrumentación está activa.
+    :return: pa.Table con el resultado.
+    """
+    started = time.perf_counter()
+    table = backend.query(name, start, end)
+    if instrumentation.enabled():
+        seconds = time.perf_counter() - started
+        instrumentation.observe(
+            "parquet_query_seconds", seconds, backend=backend.name, query=name
+        )
+        instrumentation.emit(
+            "query",
+            backend=backend.name,
+            query=name,
+            seconds=round(seconds, 6),
+            rows=table.num_rows,
+        )
+    return table
@@ -0,0 +1,338 @@
+import os
+import sys
+import argparse
+import json
+import logging
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+import dfs_creation
+import clean
+import load
+import http_cache
+import instrumentation
+import raw_store
+import validate
+
+try:
+    import resource  # no existe en Windows
+except ImportError:
+    resource = None
+
+"""
+Ejecuta las etapas del proceso (extracción, creación de DataFrames, validación, limpieza, guardado,
+carga y profiling) en un solo proceso, como un DAG. Los DataFrames pasan en memoria de una etapa a la
+siguiente; cada etapa igualmente deja su salida en disco, de modo que con --from-stage se puede
+retomar desde cualquier etapa leyendo la salida guardada de las anteriores.
+"""
+
+# Cada etapa recibe las salidas de sus dependencias y las opciones, y devuelve sus salidas.
+# `load` lee de disco la salida guardada de la etapa, para retomar el proceso desde después de ella.
+Stage = namedtuple("Stage", ["name", "deps", "run", "load"])
+
+
+def run_extract(inputs, options):
+    import extract  # import diferido: solo se necesita requests si se extrae
+
+    def save_result(date, shows):
+        return extract.save_day(shows, date, extract.JSON_FOLDER, options.raw_format)
+
+    summary = extract.fetch_date_range(
+        options.start,
+        options.end,
+        max_workers=options.workers or extract.MAX_WORKERS,
+        base_url=options.base_url or extract.BASE_URL,
+        on_result=save_result,
+        cache=None if options.no_cache else http_cache.HttpCache(extract.JSON_FOLDER),
+    )
+    if summary["failed"]:
+        logging.error(f"Fechas sin extraer: {sorted(summary['failed'])}")
+    return {"failed": sorted(summary["failed"])}
+
+
+def pending_dates(options):
+    """
+    Fechas nuevas o modificadas según el manifiesto de extract.py, leídas una vez por ejecución
+    (después de la extracción) para que transform y profile usen las mismas y main las marque
+    como procesadas al terminar.
+    """
+    if getattr(options, "pending_dates", None) is None:
+        options.pending_dates = http_cache.changed_dates(dfs_creation.JSON_FOLDER)
+    return options.pending_dates
+
+
+def run_transform(inputs, options):
+    changed = pending_dates(options)
+    dates = changed if options.changed_only else None
+    if options.stream:
+        # Se transforma y guarda archivo por archivo y luego se leen los Parquet ya tipados,
+        # así el pico de memoria no incluye los diccionarios de todos los JSON. El perfil
+        # lo sigue calculando la etapa profile.
+        dfs_creation.transform_stream(dfs_creation.JSON_FOLDER, profile=False, dates=dates)
+        return load_transform(options)
+    if options.transform_workers > 1:
+        episodes, shows = dfs_creation.transform_data_parallel(
+            dfs_creation.JSON_FOLDER, options.transform_workers, dates
+        )
+    else:
+        episodes, shows = dfs_creation.transform_data(
+            dfs_creation.iter_episodes(dfs_creation.JSON_FOLDER, dates)
+        )
+    dfs_creation.load_dfs(episodes, shows)
+    return {"episodes": episodes, "shows": shows}
+
+
+def load_transform(options):
+    episodes, shows = clean.load_data(clean.episodes_path, clean.shows_path)
+    return {"episodes": episodes, "shows": shows}
+
+
+def run_profile(inputs, options):
+    dfs_creation.profiling(
+        inputs["episodes"],
+        inputs["shows"],
+        refresh=pending_dates(options),
+        ydata=options.ydata,
+    )
+    return {}
+
+
+def run_validate(inputs, options):
+    episodes, shows, _ = validate.validate(inputs["episodes"], inputs["shows"])
+    return {"episodes": episodes, "shows": shows}
+
+
+def load_validate(options):
+    # La validación no guarda los DataFrames válidos: se repite sobre la salida de transform
+    return run_validate(load_transform(options), options)
+
+
+def run_clean(inputs, options):
+    episodes, shows = clean.delete_unnecessary_columns(inputs["episodes"], inputs["shows"])
+    genres, shows = clean.genres_creation(shows)
+    shows = clean.domains_creation(shows)
+    shows = clean.strip_html(shows)
+    return {"episodes_clean": episodes, "shows_clean": shows, "genres": genres}
+
+
+def load_clean(options):
+    data = load.load_data(load.episodes_path, load.shows_path, load.genres_path)
+    if data is None:
+        raise RuntimeError("No se pudieron leer los Parquet limpios")
+    episodes, shows, genres = data
+    return {"episodes_clean": episodes, "shows_clean": shows, "genres": genres}
+
+
+def run_save(inputs, options):
+    clean.save_as_parquet(
+        inputs["episodes_clean"],
+        inputs["shows_clean"],
+        inputs["genres"],
+        mode=options.mode,
+        row_group_size=options.row_group_size,
+        partial=options.changed_only,
+    )
+    return {}
+
+
+def run_load(inputs, options):
+    if not load.create_tables(rebuild=options.rebuild):
+        raise RuntimeError("No se pudieron crear las tablas")
+    if not load.load_dfs_to_tables(
+        inputs["episodes_clean"], inputs["shows_clean"], inputs["genres"]
+    ):
+        raise RuntimeError("No se pudieron cargar los datos en la base de datos")
+    return {}
+
+
+STAGES = [
+    Stage("extract", (), run_extract, lambda options: {}),  # la salida son los JSON en disco
+    Stage("transform", ("extract",), run_transform, load_transform),
+    Stage("profile", ("transform",), run_profile, lambda options: {}),
+    Stage("validate", ("transform",), run_validate, load_validate),
+    Stage("clean", ("validate",), run_clean, load_clean),
+    Stage("save", ("clean",), run_save, lambda options: {}),
+    Stage("load", ("clean", "save"), run_load, lambda options: {}),
+]
+
+
+def topological_order(stages):
+    """
+    Ordena las etapas de modo que cada una quede después de sus dependencias.
+    :argumento stages: LISTA de Stage.
+    :return: LISTA de Stage ordenada.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependencia circular en la etapa {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name)
+    return ordered
+
+
+def peak_rss_mb():
+    """
+    :return: FLOAT con el pico de memoria residente del proceso en MB, o None si el sistema
+        no expone el módulo resource.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_pipeline(options, stages=STAGES):
+    """
+    Ejecuta las etapas en orden, pasando en memoria las salidas de cada una a las que dependen
+    de ella. Las etapas anteriores a options.from_stage no se ejecutan: si otra etapa necesita
+    su salida, se lee de disco.
+    :argumento options: argparse.Namespace con from_stage, to_stage, skip y las opciones de
+        cada etapa.
+    :argumento stages: LISTA de Stage.
+    :return: LISTA de DICCIONARIOS con etapa, estado, segundos y pico de memoria (MB).
+    """
+    ordered = topological_order(stages)
+    names = [stage.name for stage in ordered]
+    first = names.index(options.from_stage)
+    last = names.index(options.to_stage)
+    selected = {
+        name for name in names[first : last + 1] if name not in (options.skip or [])
+    }
+    by_name = {stage.name: stage for stage in ordered}
+
+    outputs, report = {}, []
+    for stage in ordered:
+        if stage.name not in selected:
+            continue
+        logging.info(f"[{stage.name}] iniciando")
+        started = time.perf_counter()
+        try:
+            inputs = {}
+            for dep in stage.deps:
+                if dep not in outputs:
+                    logging.info(f"[{stage.name}] leyendo la salida guardada de '{dep}'")
+                    outputs[dep] = by_name[dep].load(options)
+                inputs.update(outputs[dep])
+            with instrumentation.timer(stage.name, pipeline="etl"):
+                outputs[stage.name] = stage.run(inputs, options)
+            status = "ok"
+        except Exception as e:
+            logging.error(f"[{stage.name}] falló: {e}")
+            status = "error"
+        report.append(
+            {
+                "etapa": stage.name,
+                "estado": status,
+                "segundos": round(time.perf_counter() - started, 3),
+                "pico_rss_mb": peak_rss_mb(),
+            }
+        )
+        if status == "error":
+            break
+
+    with pd.option_context("display.width", 200):
+        logging.info(f"Resumen del proceso:\n{pd.DataFrame(report)}")
+    return report
+
+
+def main(argv=None):
+    """
+    Ejecuta las etapas seleccionadas del proceso.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    stage_names = [stage.name for stage in topological_order(STAGES)]
+    parser = argparse.ArgumentParser(
+        description="Ejecuta el proceso completo (o desde una etapa) en un solo proceso"
+    )
+    parser.add_argument("--from-stage", choices=stage_names, default=stage_names[0])
+    parser.add_argument("--to-stage", choices=stage_names, default=stage_names[-1])
+    parser.add_argument(
+        "--skip", choices=stage_names, action="append", help="Etapa a omitir (repetible)"
+    )
+    parser.add_argument("--report", help="Ruta de un JSON donde guardar el resumen por etapa")
+    # Opciones de las etapas, con los mismos valores por defecto que cada script
+    parser.add_argument("--start", default="2024-01-01", help="Fecha inicial YYYY-MM-DD")
+    parser.add_argument("--end", default="2024-01-31", help="Fecha final YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, help="Hilos de la extracción")
+    parser.add_argument("--base-url", help="URL del endpoint de la API")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--raw-format", choices=raw_store.available_formats(), default=raw_store.RAW_FORMAT
+    )
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        default=1,
+        help="Procesos para transformar los JSON en paralelo (por defecto en serie)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Transforma los JSON archivo por archivo, con memoria acotada por un archivo",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Transforma solo los días nuevos o modificados desde la última transformación",
+    )
+    parser.add_argument("--ydata", action="store_true")
+    parser.add_argument("--mode", choices=clean.WRITE_MODES, default="overwrite_partitions")
+    parser.add_argument("--row-group-size", type=int, default=clean.ROW_GROUP_SIZE)
+    parser.add_argument("--rebuild", action="store_true")
+    # Instrumentación (ver instrumentation.py); también se activa con ETL_METRICS_DIR
+    parser.add_argument(
+        "--metrics-dir", help="Carpeta donde escribir events.jsonl y metrics.prom"
+    )
+    parser.add_argument(
+        "--profile-stages",
+        action="store_true",
+        help="Guarda un perfil de cProfile por etapa en la carpeta de métricas",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Agrega el pico de memoria de Python de cada etapa a los eventos",
+    )
+    args = parser.parse_args(argv)
+    args.pending_dates = None
+
+    if stage_names.index(args.from_stage) > stage_names.index(args.to_stage):
+        parser.error("--from-stage debe ir antes que --to-stage")
+    if args.stream and args.transform_workers > 1:
+        parser.error("--stream no se puede combinar con --transform-workers")
+    metrics_dir = args.metrics_dir or os.environ.get("ETL_METRICS_DIR")
+    if (args.profile_stages or args.tracemalloc) and not metrics_dir:
+        parser.error("--profile-stages y --tracemalloc requieren --metrics-dir")
+    if args.metrics_dir or args.profile_stages or args.tracemalloc:
+        instrumentation.configure(
+            metrics_dir, profile=args.profile_stages, tracemalloc=args.tracemalloc
+        )
+    report = run_pipeline(args)
+    ok = {step["etapa"] for step in report if step["estado"] == "ok"}
+    if "transform" in ok:
+        http_cache.mark_consumed(dfs_creation.JSON_FOLDER, args.pending_dates)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+    if any(step["estado"] == "error" for step in report):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import os
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+"""
+Profiling liviano de los DataFrames de episodios y shows.
+
+Calcula, con operaciones vectorizadas de pandas, las métricas que se usan en
+profiling/ANALISIS.md: porcentaje de nulos, cardinalidad, mínimo/máximo, media y coeficiente
+de variación, valores más frecuentes y duplicados. Los perfiles son combinables: se pueden
+calcular por partición (día) o sobre una muestra, guardar como JSON compacto y luego unir,
+de modo que una ejecución diaria solo perfila los datos nuevos.
+
+La cardinalidad se estima con un sketch KMV (los k hashes más pequeños de los valores), que
+es exacto mientras la columna tenga menos de k valores distintos. Los duplicados se cuentan
+dentro de cada perfil; al unir perfiles no se detectan duplicados entre particiones.
+"""
+
+TOP_K = 10
+TOP_STORED = 50  # valores frecuentes guardados por perfil, para que la unión sea más precisa
+SKETCH_SIZE = 256
+HASH_SPACE = 2.0**64
+NULL_PARTITION = "__null__"  # nombre del perfil de las filas sin valor de partición
+
+
+def _hashable(values: pd.Series) -> pd.Series:
+    """
+    Convierte a texto los valores no hasheables (listas, diccionarios) para poder contarlos.
+    """
+    if values.dtype != object:
+        return values
+    try:
+        pd.util.hash_pandas_object(values, index=False)
+        return values
+    except TypeError:
+        return values.map(str)
+
+
+def profile_column(series: pd.Series, is_list: bool = False) -> dict:
+    """
+    Calcula las métricas de una columna.
+    :argumento series: SERIES de pandas.
+    :argumento is_list: BOOL, si es True la columna contiene listas y las métricas de valores
+        se calculan sobre sus elementos (p. ej. cada género por separado).
+    :return: DICCIONARIO con las métricas de la columna.
+    """
+    nulls = series.isna().to_numpy()
+    if not is_list and not pd.api.types.is_numeric_dtype(series):
+        # los textos vacíos de la API se cuentan como nulos
+        nulls |= series.eq("").fillna(False).to_numpy(dtype=bool)
+    values = series[~nulls]
+    if is_list:
+        values = values.explode().dropna()
+    values = _hashable(values)
+
+    stats = {"count": int(len(series)), "nulls": int(nulls.sum())}
+    numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+    if len(values) and numeric:
+        numbers = values.astype("float64")
+        stats.update(
+            kind="numeric",
+            min=float(numbers.min()),
+            max=float(numbers.max()),
+            sum=float(numbers.sum()),
+            sum_sq=float((numbers**2).sum()),
+            n=int(len(numbers)),
+        )
+    elif len(values):
+        text = values.astype(str)
+        stats.update(kind="text", min=text.min(), max=text.max())
+
+    top = values.value_counts()
+    top = top[top > 0].head(TOP_STORED)  # en las category se cuentan también las vacías
+    stats["top"] = [[_to_json(v), int(c)] for v, c in top.items()]
+    hashes = np.unique(pd.util.hash_pandas_object(values, index=False).to_numpy())
+    stats["sketch"] = [int(h) for h in hashes[:SKETCH_SIZE]]
+    return stats
+
+
+def profile_dataframe(df: pd.DataFrame, key: str = "id", list_columns=()) -> dict:
+    """
+    Calcula el perfil de un DataFrame.
+    :argumento df: DATAFRAME a perfilar.
+    :argumento key: STRING con la columna identificadora, para contar ids duplicados.
+    :argumento list_columns: columnas que contienen listas (p. ej. genres, schedule_days).
+    :return: DICCIONARIO con el perfil, serializable como JSON.
+    """
+    hashable = df.apply(lambda c: c.map(str) if c.name in list_columns else _hashable(c))
+    return {
+        "rows": int(len(df)),
+        "duplicate_rows": int(
+            pd.util.hash_pandas_object(hashable, index=False).duplicated().sum()
+        ),
+        "duplicate_keys": int(df[key].duplicated().sum()) if key in df.columns else 0,
+        "columns": {
+            column: profile_column(df[column], column in list_columns)
+            for column in df.columns
+        },
+    }
+
+
+def _to_json(value):
+    """
+    Convierte escalares de numpy a tipos nativos de Python para json.dump.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _merge_column(a: dict, b: dict) -> dict:
+    merged = {"count": a["count"] + b["count"], "nulls": a["nulls"] + b["nulls"]}
+    kind = a.get("kind") or b.get("kind")
+    if kind:
+        merged["kind"] = kind
+        present = [s for s in (a, b) if "min" in s]
+        merged["min"] = min(s["min"] for s in present)
+        merged["max"] = max(s["max"] for s in present)
+        if kind == "numeric":
+            for field in ("sum", "sum_sq", "n"):
+                merged[field] = sum(s.get(field, 0) for s in present)
+    counts = {}
+    for value, count in a["top"] + b["top"]:
+        key = json.dumps(value)
+        counts[key] = counts.get(key, 0) + count
+    top = sorted(counts.items(), key=lambda item: -item[1])[:TOP_STORED]
+    merged["top"] = [[json.loads(k), c] for k, c in top]
+    merged["sketch"] = sorted(set(a["sketch"]) | set(b["sketch"]))[:SKETCH_SIZE]
+    return merged
+
+
+def merge_profiles(profiles) -> dict:
+    """
+    Une varios perfiles (p. ej. uno por día) en uno solo.
+    :argumento profiles: ITERABLE de perfiles generados por profile_dataframe.
+    :return: DICCIONARIO con el perfil combinado o None si no hay perfiles.
+    """
+    merged = None
+    for profile in profiles:
+        if merged is None:
+            merged = json.loads(json.dumps(profile))  # copia
+            continue
+        merged["rows"] += profile["rows"]
+        merged["duplicate_rows"] += profile["duplicate_rows"]
+        merged["duplicate_keys"] += profile["duplicate_keys"]
+        for column, stats in profile["columns"].items():
+            if column in merged["columns"]:
+                merged["columns"][column] = _merge_column(merged["columns"][column], stats)
+            else:
+                merged["columns"][column] = stats
+    return merged
+
+
+def estimate_distinct(stats: dict) -> int:
+    """
+    Estima la cantidad de valores distintos a partir del sketch KMV de una columna.
+    """
+    sketch = stats["sketch"]
+    if len(sketch) < SKETCH_SIZE:
+        return len(sketch)
+    return int((SKETCH_SIZE - 1) / (sketch[SKETCH_SIZE - 1] / HASH_SPACE))
+
+
+def summarize(profile: dict) -> pd.DataFrame:
+    """
+    Resume un perfil en una tabla legible, una fila por columna.
+    :argumento profile: DICCIONARIO de perfil.
+    :return: DATAFRAME con nulos (%), distintos, mínimo, máximo, media, cv y valores frecuentes.
+    """
+    rows = []
+    for column, stats in profile["columns"].items():
+        row = {
+            "columna": column,
+            "nulos_%": round(100 * stats["nulls"] / stats["count"], 1) if stats["count"] else 0.0,
+            "distintos": estimate_distinct(stats),
+            "min": stats.get("min"),
+            "max": stats.get("max"),
+            "top": ", ".join(f"{v} ({c})" for v, c in stats["top"][:3]),
+        }
+        if stats.get("kind") == "numeric" and stats["n"]:
+            mean = stats["sum"] / stats["n"]
+            variance = max(stats["sum_sq"] / stats["n"] - mean**2, 0.0)
+            row["media"] = round(mean, 2)
+            row["cv_%"] = round(100 * variance**0.5 / mean, 1) if mean else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def reservoir_sample(chunks, k: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Muestra aleatoria uniforme de k filas sobre un flujo de DataFrames, sin tenerlo completo en
+    memoria: a cada fila se le asigna una clave aleatoria y se conservan las k menores.
+    :argumento chunks: ITERABLE de DataFrames.
+    :argumento k: INT con el tamaño de la muestra.
+    :argumento seed: INT semilla del generador aleatorio.
+    :return: DATAFRAME con la muestra.
+    """
+    rng = np.random.default_rng(seed)
+    sample = None
+    for chunk in chunks:
+        chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        sample = sample.nsmallest(k, "_sample_key")
+    if sample is None:
+        return pd.DataFrame()
+    return sample.drop(columns="_sample_key").reset_index(drop=True)
+
+
+def save_profile(profile: dict, path: str) -> None:
+    """
+    Guarda un perfil como JSON compacto.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def load_profile(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def partition_name(partition) -> str:
+    """
+    :argumento partition: valor de la columna de partición.
+    :return: STRING con el nombre del perfil de la partición; las filas sin valor van a
+        NULL_PARTITION.
+    """
+    return NULL_PARTITION if pd.isna(partition) else str(partition)
+
+
+def profile_by_partition(
+    df: pd.DataFrame, partition_column: str, stats_folder: str, refresh=(), **kwargs
+) -> dict:
+    """
+    Perfila un DataFrame por partición (p. ej. por airdate). Solo se perfilan las particiones
+    que aún no tienen archivo en stats_folder o que están en `refresh`.
+    :argumento df: DATAFRAME a perfilar.
+    :argumento partition_column: STRING con la columna de partición.
+    :argumento stats_folder: STRING con la carpeta de los perfiles por partición.
+    :argumento refresh: colección de particiones a recalcular aunque ya existan.
+    :argumento kwargs: argumentos adicionales para profile_dataframe.
+    :return: DICCIONARIO nombre de partición -> perfil.
+    """
+    refresh = set(refresh)
+    profiles = {}
+    for partition, group in df.groupby(partition_column, dropna=False, sort=True):
+        name = partition_name(partition)
+        path = os.path.join(stats_folder, f"{name}.json")
+        if os.path.exists(path) and name not in refresh:
+            continue
+        profiles[name] = profile_dataframe(group, **kwargs)
+    return profiles
+
+
+def merge_partition_profiles(profiles: dict, new: dict) -> dict:
+    """
+    Agrega a `profiles` los perfiles por partición de otro trozo de datos, uniendo los de una
+    misma partición (p. ej. un airdate repartido en varios archivos).
+    :argumento profiles: DICCIONARIO nombre de partición -> perfil, se actualiza.
+    :argumento new: DICCIONARIO nombre de partición -> perfil del trozo.
+    :return: DICCIONARIO profiles actualizado.
+    """
+    for name, profile in new.items():
+        profiles[name] = merge_profiles([profiles[name], profile]) if name in profiles else profile
+    return profiles
+
+
+def save_partition_profiles(profiles: dict, stats_folder: str) -> int:
+    """
+    Guarda un JSON por partición, reemplazando el anterior.
+    :argumento profiles: DICCIONARIO nombre de partición -> perfil (ver profile_by_partition).
+    :argumento stats_folder: STRING con la carpeta de los perfiles por partición.
+    :return: INT con el número de particiones guardadas.
+    """
+    os.makedirs(stats_folder, exist_ok=True)
+    for name, profile in profiles.items():
+        save_profile(profile, os.path.join(stats_folder, f"{name}.json"))
+    return len(profiles)
+
+
+def load_partition_profiles(stats_folder: str) -> dict:
+    """
+    :argumento stats_folder: STRING con la carpeta de los perfiles por partición.
+    :return: DICCIONARIO con el perfil combinado de todas las particiones de la carpeta.
+    """
+    return merge_profiles(
+        load_profile(os.path.join(stats_folder, f))
+        for f in sorted(os.listdir(stats_folder))
+        if f.endswith(".json")
+    )
+
+
+def profile_partitions(
+    df: pd.DataFrame, partition_column: str, stats_folder: str, refresh=(), **kwargs
+) -> dict:
+    """
+    Perfila un DataFrame por partición con save_partition_profiles y une los perfiles de
+    todas las particiones de la carpeta.
+    :argumento df: DATAFRAME a perfilar.
+    :argumento partition_column: STRING con la columna de partición.
+    :argumento stats_folder: STRING con la carpeta de los perfiles por partición.
+    :argumento refresh: colección de particiones a recalcular aunque ya existan.
+    :argumento kwargs: argumentos adicionales para profile_dataframe.
+    :return: DICCIONARIO con el perfil combinado de todas las particiones.
+    """
+    profiled = save_partition_profiles(
+        profile_by_partition(df, partition_column, stats_folder, refresh, **kwargs), stats_folder
+    )
+    logging.info(f"Particiones perfiladas: {profiled} (en {stats_folder})")
+    return load_partition_profiles(stats_folder)
@@ -0,0 +1,375 @@
+import os
+import argparse
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import instrumentation
+
+"""
+Servicio de consultas de solo lectura sobre entretenimiento.db, pensado para atender tableros:
+
+- un pool de conexiones de solo lectura (mode=ro, query_only, mmap_size) que se reutilizan
+  entre consultas e hilos, en lugar de abrir una conexión por consulta,
+- consultas analíticas con parámetros (runtime por tipo, géneros, dominios por fuente,
+  episodios en un rango de fechas),
+- una caché LRU de resultados por consulta y parámetros, que se vacía cuando cambia la versión
+  de los datos que load.py incrementa en load_meta en cada carga,
+- un endpoint HTTP opcional que devuelve los resultados como JSON.
+
+    python SRC/query_service.py genre_counts --param limit=5
+    python SRC/query_service.py --serve --port 8080
+    curl "http://127.0.0.1:8080/query/episodes_in_range?start=2024-01-01&end=2024-01-07"
+
+La base la deja en modo WAL load.py, de modo que las lecturas no bloquean una carga en curso.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "..", "db", "entretenimiento.db")
+
+POOL_SIZE = 4
+CACHE_SIZE = 256
+# Cada cuántos segundos se consulta load_meta para saber si hubo una carga nueva
+VERSION_CHECK_SECONDS = 1.0
+READ_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA cache_size = -32768",  # 32 MB por conexión
+)
+
+# Cada parámetro es (nombre, conversión, valor por defecto). Un LIMIT de -1 devuelve todas las
+# filas; los parámetros con valor por defecto REQUIRED son obligatorios.
+Query = namedtuple("Query", ["sql", "params"])
+REQUIRED = object()
+
+
+def iso_date(value):
+    """
+    :argumento value: STRING con una fecha YYYY-MM-DD.
+    :return: STRING con la fecha, o ValueError si no tiene ese formato.
+    """
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+QUERIES = {
+    "runtime": Query(
+        "SELECT show_count, avg_runtime, min_runtime, max_runtime FROM agg_runtime",
+        (),
+    ),
+    "runtime_by_type": Query(
+        """
+        SELECT type, COUNT(averageRuntime) AS show_count, AVG(averageRuntime) AS avg_runtime,
+               MIN(averageRuntime) AS min_runtime, MAX(averageRuntime) AS max_runtime
+        FROM shows
+        WHERE :type IS NULL OR type = :type
+        GROUP BY type
+        ORDER BY show_count DESC
+        """,
+        (("type", str, None),),
+    ),
+    "genre_counts": Query(
+        "SELECT genre, show_count FROM agg_genre_counts ORDER BY show_count DESC LIMIT :limit",
+        (("limit", int, -1),),
+    ),
+    "domains": Query(
+        "SELECT domain, show_count FROM agg_domains ORDER BY show_count DESC LIMIT :limit",
+        (("limit", int, -1),),
+    ),
+    # Usa el índice (source, domain_id, show_id) de show_domains sin leer la tabla
+    "domains_by_source": Query(
+        """
+        SELECT d.name AS domain, c.show_count
+        FROM (
+            SELECT domain_id, COUNT(*) AS show_count FROM show_domains
+            WHERE source = :source GROUP BY domain_id
+        ) c JOIN domain_dim d ON d.id = c.domain_id
+        ORDER BY c.show_count DESC, d.name
+        LIMIT :limit
+        """,
+        (("source", str, "officialSite"), ("limit", int, -1)),
+    ),
+    "episodes_in_range": Query(
+        """
+        SELECT e.id, e.airdate, e.airtime, e.name, e.season, e.number, e.show_id,
+               s.name AS show_name
+        FROM episodes e JOIN shows s ON s.id = e.show_id
+        WHERE e.airdate BETWEEN :start AND :end
+        ORDER BY e.airdate, e.airtime, e.id
+        LIMIT :limit
+        """,
+        (("start", iso_date, REQUIRED), ("end", iso_date, REQUIRED), ("limit", int, 1000)),
+    ),
+}
+
+
+def bind_params(name, params):
+    """
+    Valida y convierte los parámetros de una consulta, completando los valores por defecto.
+    :argumento name: STRING con el nombre de la consulta (ver QUERIES).
+    :argumento params: DICCIONARIO parámetro -> valor (los valores pueden venir como texto).
+    :return: DICCIONARIO con los parámetros listos para sqlite3.
+    """
+    if name not in QUERIES:
+        raise KeyError(f"Consulta desconocida: {name}")
+    spec = QUERIES[name].params
+    unknown = set(params) - {param for param, _, _ in spec}
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos para {name}: {sorted(unknown)}")
+    bound = {}
+    for param, kind, default in spec:
+        value = params.get(param, default)
+        if value is REQUIRED:
+            raise ValueError(f"Falta el parámetro {param} de {name}")
+        bound[param] = None if value is None else kind(value)
+    return bound
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones de solo lectura a la base de datos, compartido entre hilos.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE):
+        self.db_path = db_path
+        self.connections = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self.connections.put(self._connect())
+
+    def _connect(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión del pool (espera si están todas en uso) y la devuelve al terminar.
+        """
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+class QueryService:
+    """
+    Ejecuta las consultas de QUERIES sobre un pool de conexiones, con caché LRU de resultados.
+    Los resultados son LISTAS de DICCIONARIOS y se comparten entre llamadas: no modificarlos.
+    """
+
+    def __init__(self, db_path=DB_PATH, pool_size=POOL_SIZE, cache_size=CACHE_SIZE):
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.version_checked = 0.0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        with self.pool.connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode != "wal":
+            logging.warning(
+                f"La base está en modo {journal_mode}; load.py la deja en WAL para que las "
+                "lecturas no se bloqueen durante una carga"
+            )
+
+    @staticmethod
+    def _read_version(conn):
+        try:
+            return conn.execute("SELECT version FROM load_meta WHERE id = 1").fetchone()[0]
+        except (sqlite3.OperationalError, TypeError):
+            return 0
+
+    def data_version(self):
+        """
+        :return: INT con la versión de los datos en load_meta (0 si la tabla no existe).
+        """
+        with self.pool.connection() as conn:
+            return self._read_version(conn)
+
+    def _check_version(self):
+        """
+        Vacía la caché si load.py cargó datos nuevos. La versión se consulta como mucho una vez
+        cada VERSION_CHECK_SECONDS.
+        """
+        now = time.monotonic()
+        if now - self.version_checked < VERSION_CHECK_SECONDS:
+            return
+        version = self.data_version()
+        with self.lock:
+            self.version_checked = now
+            if version != self.version:
+                if self.version is not None:
+                    self.stats["invalidations"] += 1
+                    logging.info(f"Datos en versión {version}, se vacía la caché de consultas")
+                self.cache.clear()
+                self.version = version
+
+    def query(self, name, params=None):
+        """
+        Ejecuta una consulta con parámetros, usando la caché si el resultado ya se calculó
+        para la versión actual de los datos.
+        :argumento name: STRING con el nombre de la consulta (ver QUERIES).
+        :argumento params: DICCIONARIO opcional parámetro -> valor (ver bind_params).
+        :return: LISTA de DICCIONARIOS columna -> valor.
+        """
+        bound = bind_params(name, params or {})
+        key = (name, tuple(sorted(bound.items())))
+        self._check_version()
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["hits"] += 1
+                instrumentation.count("query_cache_total", query=name, result="hit")
+                return self.cache[key]
+            self.stats["misses"] += 1
+        instrumentation.count("query_cache_total", query=name, result="miss")
+
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            # La versión y la consulta se leen en la misma transacción, es decir sobre la misma
+            # instantánea del WAL, así se sabe con qué versión de los datos se calculó el resultado
+            conn.execute("BEGIN")
+            try:
+                version = self._read_version(conn)
+                cursor = conn.execute(QUERIES[name].sql, bound)
+                columns = [column[0] for column in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            finally:
+                conn.rollback()
+        instrumentation.observe("sqlite_query_seconds", time.perf_counter() - started, query=name)
+
+        with self.lock:
+            # Si mientras tanto otro hilo vació la caché por una carga nueva (o la consulta ya vio
+            # una versión que la caché todavía no conoce), el resultado se devuelve sin guardarlo
+            if version == self.version:
+                self.cache[key] = rows
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return rows
+
+    def close(self):
+        self.pool.close()
+
+
+def make_handler(service):
+    """
+    Construye el handler HTTP del servicio:
+        GET /queries               lista las consultas y sus parámetros
+        GET /query/<nombre>?p=v    ejecuta una consulta
+        GET /health                versión de los datos y estadísticas de la caché
+    :argumento service: QueryService
+    :return: Clase handler para ThreadingHTTPServer.
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/health":
+                self.send_json(200, {"version": service.version, **service.stats})
+                return
+            if parsed.path == "/queries":
+                self.send_json(
+                    200,
+                    {
+                        name: [param for param, _, _ in query.params]
+                        for name, query in QUERIES.items()
+                    },
+                )
+                return
+            if not parsed.path.startswith("/query/"):
+                self.send_json(404, {"error": "ruta no encontrada"})
+                return
+            name = parsed.path[len("/query/") :]
+            params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            try:
+                rows = service.query(name, params)
+            except KeyError as e:
+                self.send_json(404, {"error": str(e.args[0])})
+            except ValueError as e:
+                self.send_json(400, {"error": str(e)})
+            except sqlite3.Error as e:
+                logging.error(f"Error al ejecutar la consulta {name}: {e}")
+                self.send_json(500, {"error": "error al ejecutar la consulta"})
+            else:
+                self.send_json(200, {"query": name, "rows": rows})
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    return QueryHandler
+
+
+def serve(service, host="127.0.0.1", port=8080):
+    """
+    Atiende consultas HTTP hasta que se interrumpa el proceso.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    logging.info(f"Sirviendo consultas en http://{host}:{server.server_address[1]}/queries")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """
+    Ejecuta una consulta del servicio o levanta el endpoint HTTP.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(
+        description="Consultas de solo lectura sobre entretenimiento.db, con pool y caché"
+    )
+    parser.add_argument("query", nargs="?", choices=sorted(QUERIES))
+    parser.add_argument(
+        "--param", action="append", default=[], help="Parámetro nombre=valor (repetible)"
+    )
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--serve", action="store_true", help="Levanta el endpoint HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    args = parser.parse_args(argv)
+
+    if not args.serve and not args.query:
+        parser.error("indique una consulta o --serve")
+    service = QueryService(args.db, pool_size=args.pool_size)
+    try:
+        if args.serve:
+            serve(service, args.host, args.port)
+        else:
+            params = dict(param.split("=", 1) for param in args.param)
+            print(json.dumps(service.query(args.query, params), ensure_ascii=False, indent=2))
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import os
+import argparse
+import gzip
+import json
+import logging
+import time
+
+try:
+    import zstandard  # opcional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+import instrumentation
+
+"""
+Formato de almacenamiento de las respuestas crudas de la API (la carpeta JSON).
+
+Cada día se guarda como tv_shows_YYYY-MM-DD.<extensión>, en uno de estos formatos:
+
+- json: el formato original, JSON con indent=4 (fácil de leer a mano, pero ~12 veces más
+  grande que ndjson.gz),
+- ndjson.gz: un episodio por línea en JSON compacto, comprimido con gzip,
+- ndjson.zst: igual, comprimido con zstd (requiere el paquete opcional zstandard).
+
+Los lectores aceptan cualquiera de los formatos, de modo que una carpeta puede tener días en
+formatos distintos mientras se migra. Al guardar un día se borran los archivos de ese día en
+los otros formatos, para que nunca haya dos versiones de la misma fecha.
+
+    python SRC/raw_store.py --to ndjson.gz          # migra la carpeta JSON
+    python SRC/raw_store.py --to json --folder otra  # vuelve al formato original
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JSON_FOLDER = os.path.join(BASE_DIR, "..", "JSON")
+
+PREFIX = "tv_shows_"
+# Formatos en orden de preferencia si un día aparece en más de uno
+FORMATS = ("ndjson.zst", "ndjson.gz", "json")
+RAW_FORMAT = "ndjson.gz"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def available_formats() -> list:
+    """
+    :return: LISTA de formatos que se pueden escribir con los paquetes instalados.
+    """
+    return [fmt for fmt in FORMATS if fmt != "ndjson.zst" or zstandard is not None]
+
+
+def raw_path(folder: str, date: str, fmt: str = RAW_FORMAT) -> str:
+    """
+    :argumento folder: STRING con la carpeta de los archivos crudos.
+    :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+    :argumento fmt: STRING con el formato (ver FORMATS).
+    :return: STRING con la ruta del archivo de ese día en ese formato.
+    """
+    return os.path.join(folder, f"{PREFIX}{date}.{fmt}")
+
+
+def parse_file_name(file_name: str):
+    """
+    :argumento file_name: STRING con el nombre de un archivo de la carpeta.
+    :return: TUPLA (fecha, formato) o None si no es un archivo crudo.
+    """
+    if not file_name.startswith(PREFIX):
+        return None
+    for fmt in FORMATS:
+        if file_name.endswith(f".{fmt}"):
+            return file_name[len(PREFIX) : -len(fmt) - 1], fmt
+    return None
+
+
+def list_raw_files(folder: str, dates=None) -> list:
+    """
+    Lista los archivos crudos de la carpeta, uno por día y ordenados por fecha. Si un día
+    está en más de un formato se usa el primero según FORMATS.
+    :argumento folder: STRING con la carpeta de los archivos crudos.
+    :argumento dates: colección opcional de fechas YYYY-MM-DD a incluir.
+    :return: LISTA de tuplas (fecha, ruta).
+    """
+    by_date = {}
+    for file_name in os.listdir(folder):
+        parsed = parse_file_name(file_name)
+        if parsed is None:
+            continue
+        date, fmt = parsed
+        if dates is not None and date not in dates:
+            continue
+        current = by_date.get(date)
+        if current is None or FORMATS.index(fmt) < FORMATS.index(current[0]):
+            by_date[date] = (fmt, os.path.join(folder, file_name))
+        if current is not None:
+            logging.warning(
+                f"La fecha {date} está en más de un formato, se usa {by_date[date][0]}"
+            )
+    return [(date, by_date[date][1]) for date in sorted(by_date)]
+
+
+def find_raw(folder: str, date: str):
+    """
+    :return: STRING con la ruta del archivo de esa fecha en cualquier formato, o None.
+    """
+    for fmt in FORMATS:
+        path = raw_path(folder, date, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _open(path: str, mode: str):
+    """
+    Abre un archivo crudo comprimiendo o descomprimiendo según la extensión.
+    :argumento path: STRING con la ruta del archivo.
+    :argumento mode: STRING "rb" para leer o "wt" para escribir.
+    """
+    encoding = "utf-8" if "t" in mode else None
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL, encoding=encoding)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Se necesita el paquete zstandard para leer {path}")
+        return zstandard.open(
+            path, mode, cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL), encoding=encoding
+        )
+    return open(path, mode, encoding=encoding)
+
+
+def read_raw(path: str) -> list:
+    """
+    Lee un archivo crudo en cualquiera de los formatos.
+    :argumento path: STRING con la ruta del archivo.
+    :return: LISTA de diccionarios de episodios.
+    """
+    with _open(path, "rb") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        return json.loads(content)
+    # Un episodio por línea: se unen en un solo arreglo para parsearlo con un json.loads,
+    # más rápido que uno por línea. json.dumps escapa los saltos de línea dentro de los
+    # textos, así que los únicos saltos de línea son los separadores.
+    return json.loads(b"[" + content.strip().replace(b"\n", b",") + b"]")
+
+
+def write_raw(
+    data: list, folder: str, date: str, fmt: str = RAW_FORMAT, remove_others: bool = True
+) -> str:
+    """
+    Guarda los episodios de un día de forma atómica.
+    :argumento data: LISTA de diccionarios de episodios (respuesta de la API).
+    :argumento folder: STRING con la carpeta de los archivos crudos.
+    :argumento date: STRING de Fecha en formato YYYY-MM-DD.
+    :argumento fmt: STRING con el formato (ver FORMATS).
+    :argumento remove_others: BOOL, borra los archivos del mismo día en otros formatos.
+    :return: STRING con la ruta del archivo guardado.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    os.makedirs(folder, exist_ok=True)
+    path = raw_path(folder, date, fmt)
+    # El temporal conserva la extensión para que _open elija el compresor
+    tmp_path = os.path.join(folder, f".tmp_{os.path.basename(path)}")
+    with _open(tmp_path, "wt") as f:
+        if fmt == "json":
+            json.dump(data, f, indent=4)
+        else:
+            for episode in data:
+                f.write(json.dumps(episode, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+    os.replace(tmp_path, path)
+    if remove_others:
+        for other in FORMATS:
+            if other != fmt and os.path.exists(raw_path(folder, date, other)):
+                os.remove(raw_path(folder, date, other))
+    return path
+
+
+def migrate(folder: str, fmt: str = RAW_FORMAT) -> dict:
+    """
+    Convierte todos los archivos crudos de la carpeta al formato indicado, verificando que el
+    contenido releído sea igual al original antes de borrar cada archivo.
+    :argumento folder: STRING con la carpeta de los archivos crudos.
+    :argumento fmt: STRING con el formato destino.
+    :return: DICCIONARIO con los archivos convertidos y los bytes antes y después.
+    """
+    summary = {"archivos": 0, "bytes_antes": 0, "bytes_despues": 0}
+    for date, path in list_raw_files(folder):
+        summary["bytes_antes"] += os.path.getsize(path)
+        if path.endswith(f".{fmt}"):
+            summary["bytes_despues"] += os.path.getsize(path)
+            continue
+        data = read_raw(path)
+        new_path = write_raw(data, folder, date, fmt, remove_others=False)
+        if read_raw(new_path) != data:
+            os.remove(new_path)
+            raise RuntimeError(f"La migración de {path} no conserva el contenido")
+        os.remove(path)
+        summary["archivos"] += 1
+        summary["bytes_despues"] += os.path.getsize(new_path)
+    return summary
+
+
+def main(argv=None):
+    """
+    Migra los archivos crudos al formato indicado.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(
+        description="Migra los archivos crudos de la API a otro formato de almacenamiento"
+    )
+    parser.add_argument("--to", choices=available_formats(), default=RAW_FORMAT)
+    parser.add_argument("--folder", default=JSON_FOLDER)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summary = migrate(args.folder, args.to)
+    logging.info(
+        f"{summary['archivos']} archivos migrados a {args.to} en "
+        f"{time.perf_counter() - started:.2f}s: {summary['bytes_antes'] / 2**20:.1f} MB -> "
+        f"{summary['bytes_despues'] / 2**20:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
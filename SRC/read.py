@@ -1,8 +1,12 @@
 import os
+import argparse
+import time
 import pandas as pd
 import logging
 import sqlite3
 
+import instrumentation
+
 """
 Script para responder las preguntas planteadas en la prueba.
 
@@ -10,18 +14,88 @@ De acuerdo a los datos extraídos y procesados, se realizarán consultas:
 a. Runtime promedio (averageRuntime).
 b. Conteo de shows de TV por género.
 c. Listar los dominios únicos (web) del sitio oficial de los shows.
-"""
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+Además se puede consultar la cantidad de episodios y el runtime promedio por día en un rango
+de fechas, y buscar texto en los nombres y resúmenes con los índices FTS5 de load.py
+(--search). Por defecto las consultas se hacen sobre entretenimiento.db (backend sqlite); con
+--backend arrow o --backend duckdb se calculan directamente sobre los Parquet limpios de
+clean.py (ver parquet_backends.py).
+"""
 
 # Definir la ruta de la base de datos
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FOLDER = os.path.join(BASE_DIR, "..", "db")
 DB_PATH = os.path.join(DB_FOLDER, "entretenimiento.db")
 
+# Consultas de las preguntas de la prueba: nombre -> (descripción, SQL). Las tres primeras
+# leen las tablas de agregados que mantiene load.py; :start y :end son fechas YYYY-MM-DD o NULL
+# (sin límite), con COALESCE en lugar de OR para que SQLite use el índice sobre airdate.
+QUERIES = {
+    "runtime": (
+        "Runtime promedio de los shows",
+        """
+        SELECT show_count AS cantidad_shows, avg_runtime AS runtime_promedio,
+               min_runtime, max_runtime
+        FROM agg_runtime;
+        """,
+    ),
+    "genre_counts": (
+        "Cantidad de shows por género",
+        """
+        SELECT genre AS genero, show_count AS cantidad_shows
+        FROM agg_genre_counts
+        ORDER BY show_count DESC;
+        """,
+    ),
+    "domains": (
+        "Dominios únicos del sitio oficial de los shows",
+        """
+        SELECT domain AS dominio, show_count AS cantidad_shows
+        FROM agg_domains
+        ORDER BY show_count DESC;
+        """,
+    ),
+    "episodes_by_day": (
+        "Episodios y runtime promedio por día",
+        """
+        SELECT airdate AS fecha, COUNT(id) AS episodios, AVG(runtime) AS runtime_promedio
+        FROM episodes
+        WHERE airdate BETWEEN COALESCE(:start, '0000-01-01') AND COALESCE(:end, '9999-12-31')
+        GROUP BY airdate
+        ORDER BY airdate;
+        """,
+    ),
+}
+BACKENDS = ("sqlite", "arrow", "duckdb")
+
+# Búsqueda en los índices FTS5 de load.py: los mejores resultados de cada índice (ORDER BY rank
+# con LIMIT usa el camino rápido de FTS5) y luego los mejores de ambos. rank es bm25 (más
+# negativo es más relevante) y no es comparable entre search_shows y search_episodes, así que
+# la relevancia es el rank dividido por el mejor rank del mismo índice: 1 para el mejor
+# resultado de cada tipo y más cerca de 0 cuanto menos relevante.
+SEARCH_QUERY = """
+SELECT * FROM (
+    SELECT 'show' AS tipo, s.id, s.name AS nombre, s.name AS show, f.fragmento, f.relevancia
+    FROM (
+        SELECT rowid, rank / MIN(rank) OVER () AS relevancia, fragmento FROM (
+            SELECT rowid, rank, snippet(search_shows, -1, '[', ']', '...', 12) AS fragmento
+            FROM search_shows WHERE search_shows MATCH :query ORDER BY rank LIMIT :limit
+        )
+    ) f JOIN shows s ON s.id = f.rowid
+)
+UNION ALL
+SELECT * FROM (
+    SELECT 'episodio', e.id, e.name, s.name, f.fragmento, f.relevancia
+    FROM (
+        SELECT rowid, rank / MIN(rank) OVER () AS relevancia, fragmento FROM (
+            SELECT rowid, rank, snippet(search_episodes, -1, '[', ']', '...', 12) AS fragmento
+            FROM search_episodes WHERE search_episodes MATCH :query ORDER BY rank LIMIT :limit
+        )
+    ) f JOIN episodes e ON e.id = f.rowid LEFT JOIN shows s ON s.id = e.show_id
+)
+ORDER BY relevancia DESC, tipo DESC LIMIT :limit;
+"""
+
 
 def connect_db():
     """
@@ -36,21 +110,138 @@ def connect_db():
         return None
 
 
-def execute_query(conn, query):
+def execute_query(conn, query, name=None, params=None):
     """
-    Ejecuta una consulta SQL y maneja errores en caso de que falle.
+    Ejecuta una consulta SQL y maneja errores en caso de que falle. Si la instrumentación está
+    activa registra el tiempo de la consulta en el histograma sqlite_query_seconds.
+    :argumento conn: sqlite3.Connection
+    :argumento query: STRING con la consulta SQL.
+    :argumento name: STRING opcional con el nombre de la consulta para las métricas.
+    :argumento params: DICCIONARIO opcional con los parámetros de la consulta.
+    :return: DATAFRAME con el resultado o None si falla.
     """
+    started = time.perf_counter()
     try:
-        df = pd.read_sql(query, conn)
-        return df
+        df = pd.read_sql(query, conn, params=params)
     except Exception as e:
         logging.error(f"Error al ejecutar la consulta: {query}\n{e}")
+        instrumentation.count("sqlite_query_errors_total", query=name or "sql")
         return None
+    if instrumentation.enabled():
+        seconds = time.perf_counter() - started
+        instrumentation.observe("sqlite_query_seconds", seconds, query=name or "sql")
+        instrumentation.emit(
+            "query", query=name or query, seconds=round(seconds, 6), rows=len(df)
+        )
+    return df
+
+
+def explain_query(conn, query, params=None):
+    """
+    Obtiene el plan de ejecución de una consulta, para verificar el uso de índices.
+    :argumento conn: sqlite3.Connection
+    :argumento query: STRING con la consulta SQL.
+    :argumento params: DICCIONARIO opcional con los parámetros de la consulta.
+    :return: DATAFRAME con el resultado de EXPLAIN QUERY PLAN.
+    """
+    return pd.read_sql(f"EXPLAIN QUERY PLAN {query}", conn, params=params)
 
 
-def read_db():
+def time_query(conn, query, repeat=5, params=()):
+    """
+    Mide el tiempo de una consulta, tomando el mejor de varios intentos.
+    :argumento conn: sqlite3.Connection
+    :argumento query: STRING con la consulta SQL.
+    :argumento repeat: INT con el número de ejecuciones.
+    :argumento params: parámetros opcionales de la consulta.
+    :return: FLOAT con los milisegundos de la ejecución más rápida.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def search_terms(text):
+    """
+    Convierte un texto libre en una consulta FTS5: cada palabra entre comillas (sin operadores
+    ni caracteres especiales de FTS5) y todas deben aparecer.
+    :argumento text: STRING con el texto a buscar.
+    :return: STRING con la consulta para MATCH.
+    """
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+def search(conn, text, limit=10):
+    """
+    Busca un texto en los nombres y resúmenes de los shows y en los nombres de los episodios.
+    :argumento conn: sqlite3.Connection
+    :argumento text: STRING con las palabras a buscar (sin distinguir mayúsculas ni tildes).
+    :argumento limit: INT con el número máximo de resultados.
+    :return: DATAFRAME con tipo, id, nombre, show, fragmento y relevancia (bm25 relativo al
+        mejor resultado del mismo tipo, de 0 a 1), del más relevante al menos, o None si falla.
+    """
+    return execute_query(
+        conn, SEARCH_QUERY, name="search", params={"query": search_terms(text), "limit": limit}
+    )
+
+
+def execute_parquet_query(backend, name, start=None, end=None):
+    """
+    Ejecuta una consulta de QUERIES en un backend de parquet_backends y maneja errores en caso
+    de que falle.
+    :argumento backend: ArrowBackend o DuckDBBackend.
+    :argumento name: STRING con el nombre de la consulta.
+    :argumento start: STRING con la fecha inicial YYYY-MM-DD o None.
+    :argumento end: STRING con la fecha final YYYY-MM-DD o None.
+    :return: pa.Table con el resultado o None si falla.
+    """
+    import parquet_backends
+
+    try:
+        return parquet_backends.run_query(backend, name, start, end)
+    except Exception as e:
+        logging.error(f"Error al ejecutar la consulta {name} con {backend.name}: {e}")
+        instrumentation.count("parquet_query_errors_total", backend=backend.name, query=name)
+        return None
+
+
+def read_parquet(backend="arrow", start=None, end=None, data_folder=None):
+    """
+    Ejecuta las consultas directamente sobre los Parquet limpios, sin la base de datos.
+    :argumento backend: STRING, "arrow" o "duckdb".
+    :argumento start: STRING con la fecha inicial YYYY-MM-DD de los episodios o None.
+    :argumento end: STRING con la fecha final YYYY-MM-DD de los episodios o None.
+    :argumento data_folder: STRING con la carpeta de los Parquet limpios (por defecto DATA).
+    """
+    # Import diferido: pyarrow.dataset y load solo se necesitan para leer los Parquet
+    import parquet_backends
+
+    try:
+        conn = parquet_backends.connect(backend, data_folder or parquet_backends.DATA_FOLDER)
+    except ImportError as e:
+        logging.error(f"{e}. Saliendo del script.")
+        return
+
+    for name, (desc, _) in QUERIES.items():
+        logging.info(f"Ejecutando consulta: {desc} ({backend})")
+        result = execute_parquet_query(conn, name, start, end)
+        if result is not None:
+            print(f"\n{desc}:")
+            print(result.to_pandas())
+        else:
+            logging.warning(f"No se pudo obtener resultados para: {desc}")
+    conn.close()
+
+
+def read_db(explain=False, start=None, end=None):
     """
     Realiza la lectura de la base de datos y ejecuta consultas.
+    :argumento explain: BOOL, si es True imprime el plan de ejecución y el tiempo de cada consulta.
+    :argumento start: STRING con la fecha inicial YYYY-MM-DD de los episodios o None.
+    :argumento end: STRING con la fecha final YYYY-MM-DD de los episodios o None.
     """
     conn = connect_db()
     if not conn:
@@ -59,18 +250,17 @@ def read_db():
         )
         return
 
-    queries = {
-        "Shows con promedio de runtime": "SELECT name, averageRuntime FROM shows LIMIT 10;",
-        "Cantidad de shows por género": "SELECT genres AS genero, COUNT(id) AS cantidad_shows FROM genres GROUP BY genres LIMIT 10;",
-        "Sitios oficiales de algunos shows": "SELECT officialSite FROM shows LIMIT 10;",
-    }
-
-    for desc, query in queries.items():
+    params = {"start": start, "end": end}
+    for name, (desc, query) in QUERIES.items():
         logging.info(f"Ejecutando consulta: {desc}")
-        result = execute_query(conn, query)
+        result = execute_query(conn, query, name=name, params=params)
         if result is not None:
             print(f"\n{desc}:")
             print(result)
+            if explain:
+                plan = explain_query(conn, query, params)
+                print(plan[["detail"]].to_string(index=False))
+                print(f"Tiempo: {time_query(conn, query, params=params):.3f} ms")
         else:
             logging.warning(f"No se pudo obtener resultados para: {desc}")
 
@@ -78,5 +268,59 @@ def read_db():
     logging.info("Conexión a la base de datos cerrada.")
 
 
+def search_db(text, limit=10):
+    """
+    Imprime los resultados de search y el tiempo de la búsqueda.
+    :argumento text: STRING con el texto a buscar.
+    :argumento limit: INT con el número máximo de resultados.
+    """
+    conn = connect_db()
+    if not conn:
+        return
+    started = time.perf_counter()
+    result = search(conn, text, limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    conn.close()
+    if result is None:
+        logging.warning(f"No se pudo buscar: {text}")
+        return
+    with pd.option_context("display.width", 200, "display.max_colwidth", 80):
+        print(result.to_string(index=False) if len(result) else "Sin resultados")
+    print(f"{len(result)} resultados en {elapsed:.2f} ms")
+
+
+def main(argv=None):
+    """
+    Responde las consultas de la prueba con el backend indicado.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(description="Consultas sobre entretenimiento.db")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Imprime EXPLAIN QUERY PLAN y el tiempo de cada consulta (solo sqlite)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="sqlite",
+        help="sqlite lee entretenimiento.db; arrow y duckdb leen los Parquet limpios de DATA",
+    )
+    parser.add_argument("--start", help="Fecha inicial YYYY-MM-DD de los episodios")
+    parser.add_argument("--end", help="Fecha final YYYY-MM-DD de los episodios")
+    parser.add_argument(
+        "--search", help="Busca el texto en los shows y episodios en lugar de las consultas"
+    )
+    parser.add_argument("--limit", type=int, default=10, help="Resultados de --search")
+    args = parser.parse_args(argv)
+    if args.search:
+        search_db(args.search, args.limit)
+    elif args.backend == "sqlite":
+        read_db(explain=args.explain, start=args.start, end=args.end)
+    else:
+        read_parquet(args.backend, start=args.start, end=args.end)
+
+
 if __name__ == "__main__":
-    read_db()
+    main()
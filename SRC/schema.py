@@ -0,0 +1,219 @@
+import os
+import argparse
+import logging
+
+import pandas as pd
+import pyarrow as pa
+
+import instrumentation
+
+"""
+Dtypes explícitos de los DataFrames de episodios, shows y géneros, compartidos por
+dfs_creation.py, clean.py y load.py:
+
+- enteros nullable (Int16/Int32/Int64) en lugar de float64 cuando hay nulos,
+- category para los textos con pocos valores distintos (type, language, status, ...),
+- string[pyarrow] para el resto de textos, en lugar de objetos de Python.
+
+Las listas (genres, schedule_days) y dvd_country se dejan como object. En Parquet las
+columnas category se guardan como string (el Parquet ya las codifica por diccionario) y se
+vuelven a convertir a category al leer, así el formato en disco no depende de pandas.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
+
+STRING = "string[pyarrow]"
+
+EPISODES = {
+    "id": "Int64",
+    "name": STRING,
+    "season": "Int32",
+    "number": "Int32",
+    "type": "category",
+    "airdate": STRING,
+    "airtime": "category",
+    "airstamp": STRING,
+    "runtime": "Int32",
+    "rating": "float64",
+    "show_id": "Int64",
+}
+
+SHOWS = {
+    "id": "Int64",
+    "url": STRING,
+    "name": STRING,
+    "type": "category",
+    "language": "category",
+    "genres": "object",  # lista de textos
+    "status": "category",
+    "runtime": "Int32",
+    "averageRuntime": "Int32",
+    "premiered": STRING,
+    "ended": STRING,
+    "officialSite": STRING,
+    "schedule_time": "category",
+    "schedule_days": "object",  # lista de textos
+    "rating": "float64",
+    "weight": "Int16",
+    "summary": STRING,
+    "webChannel_name": "category",
+    "webChannel_site": "category",
+    "dvd_country": "object",  # diccionario name/code/timezone
+    "externals_tvrage": "Int64",
+    "externals_thetvdb": "Int64",
+    "externals_imdb": STRING,
+    "updated": "Int64",
+}
+# Dominios registrables de las URLs, que agrega clean.domains_creation: no están en el
+# shows.parquet de dfs_creation.py, solo en shows_cleaned.parquet
+DOMAIN_COLUMNS = {
+    "officialSite_domain": "category",
+    "url_domain": "category",
+    "webChannel_domain": "category",
+}
+SHOWS.update(DOMAIN_COLUMNS)
+
+GENRES = {"id": "Int64", "show_id": "Int64", "genres": "category"}
+
+# Columnas de partición del dataset de episodios limpios
+PARTITIONS = {"year": "Int16", "month": "Int8", "day": "Int8"}
+
+ARROW_TYPES = {
+    "Int8": pa.int8(),
+    "Int16": pa.int16(),
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "float64": pa.float64(),
+    "category": pa.string(),
+    STRING: pa.string(),
+}
+# Tipo Arrow del objeto anidado dvdCountry de TVMaze
+DVD_COUNTRY_TYPE = pa.struct(
+    [("name", pa.string()), ("code", pa.string()), ("timezone", pa.string())]
+)
+# Tipos Arrow de las columnas object
+OBJECT_TYPES = {
+    "genres": pa.list_(pa.string()),
+    "schedule_days": pa.list_(pa.string()),
+    "dvd_country": DVD_COUNTRY_TYPE,
+}
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Convierte las columnas presentes en el DataFrame a los dtypes indicados. Si un entero
+    llega con decimales se deja como Float64 en lugar de truncarlo.
+    :argumento df: DATAFRAME a convertir.
+    :argumento dtypes: DICCIONARIO columna -> dtype (EPISODES, SHOWS o GENRES).
+    :return: DATAFRAME con los dtypes aplicados.
+    """
+    converted = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns or dtype == "object" or df[column].dtype == dtype:
+            continue
+        try:
+            converted[column] = df[column].astype(dtype)
+        except (TypeError, ValueError):
+            logging.warning(
+                f"La columna {column} no se pudo convertir a {dtype}, queda como Float64"
+            )
+            converted[column] = df[column].astype("Float64")
+    return df.assign(**converted) if converted else df
+
+
+def arrow_schema(dtypes: dict, columns=None) -> pa.Schema:
+    """
+    Construye el esquema Arrow con el que se guardan los DataFrames en Parquet, de modo que
+    las listas (genres, schedule_days) se guardan como list<string> y no como texto.
+    :argumento dtypes: DICCIONARIO columna -> dtype.
+    :argumento columns: LISTA opcional con las columnas a incluir, en orden.
+    :return: pa.Schema
+    """
+    fields = []
+    for column in dtypes if columns is None else columns:
+        dtype = dtypes[column]
+        fields.append(
+            pa.field(column, OBJECT_TYPES[column] if dtype == "object" else ARROW_TYPES[dtype])
+        )
+    return pa.schema(fields)
+
+
+def to_arrow(df: pd.DataFrame, dtypes: dict) -> pa.Table:
+    """
+    Convierte un DataFrame a una tabla Arrow con el esquema de arrow_schema.
+    :argumento df: DATAFRAME a convertir.
+    :argumento dtypes: DICCIONARIO columna -> dtype; debe incluir todas las columnas de df.
+    :return: pa.Table
+    """
+    return pa.Table.from_pandas(
+        df, schema=arrow_schema(dtypes, list(df.columns)), preserve_index=False
+    )
+
+
+def untyped(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Devuelve el DataFrame con los dtypes que pandas infiere por defecto (object para los
+    textos, float64 para los enteros con nulos), como referencia para memory_report.
+    """
+    converted = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            converted[column] = df[column].astype(object).where(df[column].notna(), None)
+        elif pd.api.types.is_extension_array_dtype(dtype) and dtype.kind in "iuf":
+            has_nulls = df[column].isna().any()
+            converted[column] = df[column].astype(
+                "float64" if has_nulls or dtype.kind == "f" else "int64"
+            )
+    return df.assign(**converted) if converted else df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara la memoria por columna de dos versiones de un DataFrame.
+    :argumento before: DATAFRAME con los dtypes originales.
+    :argumento after: DATAFRAME con los dtypes de este módulo.
+    :return: DATAFRAME con dtype y MB antes y después por columna, más una fila de total.
+    """
+    report = pd.DataFrame(
+        {
+            "dtype_antes": before.dtypes.astype(str),
+            "mb_antes": before.memory_usage(deep=True, index=False) / 2**20,
+            "dtype_despues": after.dtypes.astype(str),
+            "mb_despues": after.memory_usage(deep=True, index=False) / 2**20,
+        }
+    )
+    report.loc["TOTAL"] = ["", report["mb_antes"].sum(), "", report["mb_despues"].sum()]
+    report["reduccion"] = report["mb_antes"] / report["mb_despues"]
+    return report.round(3)
+
+
+def main(argv=None):
+    """
+    Muestra la memoria por columna de los Parquet de DATA.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(
+        description="Muestra la memoria por columna de los Parquet de DATA antes y después de los dtypes"
+    )
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    args = parser.parse_args(argv)
+
+    for file_name, dtypes in (
+        ("episodes.parquet", EPISODES),
+        ("shows.parquet", SHOWS),
+        ("genres_cleaned.parquet", GENRES),
+    ):
+        path = os.path.join(args.data_folder, file_name)
+        if not os.path.exists(path):
+            logging.warning(f"No existe {path}")
+            continue
+        typed = apply_dtypes(pd.read_parquet(path), dtypes)
+        with pd.option_context("display.width", 200, "display.max_rows", None):
+            print(f"\n{file_name}:\n{memory_report(untyped(typed), typed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import os
+import argparse
+import logging
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import instrumentation
+import schema
+
+"""
+Validación de calidad de datos entre dfs_creation.py y clean.py, a partir de los problemas
+descritos en profiling/ANALISIS.md: ids nulos o duplicados, episodios sin show, runtimes y
+temporadas fuera de rango y fechas inválidas.
+
+Las reglas son declarativas (EPISODE_RULES y SHOW_RULES): cada una devuelve una máscara
+booleana con las filas que la incumplen, calculada sobre la columna completa. Todas las
+máscaras de un DataFrame se evalúan una vez y se combinan, sin filtrar el DataFrame regla por
+regla. Las filas que incumplen alguna regla de cuarentena se apartan a
+DATA/quarantine/<episodes|shows>_quarantine.parquet con la columna reasons (las reglas
+incumplidas, separadas por ;). Las reglas de aviso solo se cuentan. Los conteos por regla se
+registran en el log y en la instrumentación (validation_rows_total).
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(BASE_DIR, "..", "DATA")
+QUARANTINE_FOLDER = os.path.join(DATA_FOLDER, "quarantine")
+
+QUARANTINE = "quarantine"  # la fila se aparta a la cuarentena
+WARN = "warn"  # la fila se conserva, solo se cuenta
+MAX_RUNTIME = 24 * 60  # minutos
+
+# check recibe el DataFrame y el contexto (p. ej. los ids de shows válidos) y devuelve una
+# máscara con True en las filas que incumplen la regla
+Rule = namedtuple("Rule", ["name", "check", "action", "description"])
+
+
+def _outside(series, low=None, high=None):
+    """
+    :return: máscara con True donde el valor (no nulo) es menor que low o mayor que high.
+    """
+    mask = pd.Series(False, index=series.index)
+    if low is not None:
+        mask |= (series < low).fillna(False)
+    if high is not None:
+        mask |= (series > high).fillna(False)
+    return mask
+
+
+def _parse_dates(series):
+    """
+    :return: pa.Array de timestamps, nulo donde el texto no es una fecha YYYY-MM-DD.
+    """
+    # Las fechas se repiten mucho: cada texto distinto se interpreta una sola vez
+    dates = pa.array(series, type=pa.string(), from_pandas=True)
+    if isinstance(dates, pa.ChunkedArray):  # las columnas string[pyarrow] pueden venir en trozos
+        dates = dates.combine_chunks()
+    dates = dates.dictionary_encode()
+    texts = dates.dictionary
+    parsed = pc.strptime(texts, format="%Y-%m-%d", unit="s", error_is_null=True)
+    # strptime corre los días fuera del mes (2024-02-30 -> 2024-03-01): solo es válida la
+    # fecha que vuelve a escribirse igual
+    same = pc.equal(pc.strftime(parsed, format="%Y-%m-%d"), texts)
+    parsed = pc.if_else(same, parsed, pa.scalar(None, parsed.type))
+    return parsed.take(dates.indices)
+
+
+def _invalid_date(series):
+    """
+    :return: máscara con True donde hay un texto que no es una fecha YYYY-MM-DD (los nulos y
+        los textos vacíos no cuentan).
+    """
+    present = series.notna() & (series != "")
+    return present.fillna(False) & _parse_dates(series).is_null().to_numpy(zero_copy_only=False)
+
+
+def _ended_before_premiered(df):
+    ended = _parse_dates(df["ended"])
+    premiered = _parse_dates(df["premiered"])
+    return pc.fill_null(pc.less(ended, premiered), False).to_numpy(zero_copy_only=False)
+
+
+EPISODE_RULES = [
+    Rule("id_null", lambda df, ctx: df["id"].isna(), QUARANTINE, "Episodio sin id"),
+    Rule(
+        "id_duplicated",
+        # Se conserva la última aparición, como el upsert de load.py
+        lambda df, ctx: df["id"].duplicated(keep="last") & df["id"].notna(),
+        QUARANTINE,
+        "Id de episodio repetido",
+    ),
+    Rule(
+        "show_unknown",
+        lambda df, ctx: ~df["show_id"].isin(ctx["show_ids"]),
+        QUARANTINE,
+        "show_id nulo o de un show que no está (o quedó en cuarentena)",
+    ),
+    Rule(
+        "runtime_out_of_range",
+        lambda df, ctx: _outside(df["runtime"], 1, MAX_RUNTIME),
+        QUARANTINE,
+        f"runtime fuera de 1..{MAX_RUNTIME} minutos",
+    ),
+    Rule(
+        "season_number_negative",
+        lambda df, ctx: _outside(df["season"], low=0) | _outside(df["number"], low=0),
+        QUARANTINE,
+        "season o number negativo",
+    ),
+    Rule(
+        "airdate_invalid",
+        lambda df, ctx: _invalid_date(df["airdate"]),
+        QUARANTINE,
+        "airdate no tiene el formato YYYY-MM-DD",
+    ),
+    Rule("airdate_null", lambda df, ctx: df["airdate"].isna(), WARN, "Episodio sin airdate"),
+    Rule("runtime_null", lambda df, ctx: df["runtime"].isna(), WARN, "Episodio sin runtime"),
+]
+
+SHOW_RULES = [
+    Rule("id_null", lambda df, ctx: df["id"].isna(), QUARANTINE, "Show sin id"),
+    Rule(
+        "id_duplicated",
+        lambda df, ctx: df["id"].duplicated(keep="last") & df["id"].notna(),
+        QUARANTINE,
+        "Id de show repetido",
+    ),
+    Rule(
+        "average_runtime_out_of_range",
+        lambda df, ctx: _outside(df["averageRuntime"], 1, MAX_RUNTIME),
+        QUARANTINE,
+        f"averageRuntime fuera de 1..{MAX_RUNTIME} minutos",
+    ),
+    Rule(
+        "weight_out_of_range",
+        lambda df, ctx: _outside(df["weight"], 0, 100),
+        QUARANTINE,
+        "weight fuera de 0..100",
+    ),
+    Rule(
+        "premiered_invalid",
+        lambda df, ctx: _invalid_date(df["premiered"]),
+        QUARANTINE,
+        "premiered no tiene el formato YYYY-MM-DD",
+    ),
+    Rule(
+        "ended_invalid",
+        lambda df, ctx: _invalid_date(df["ended"]),
+        QUARANTINE,
+        "ended no tiene el formato YYYY-MM-DD",
+    ),
+    Rule(
+        "ended_before_premiered",
+        lambda df, ctx: _ended_before_premiered(df),
+        QUARANTINE,
+        "ended es anterior a premiered",
+    ),
+    Rule("name_null", lambda df, ctx: df["name"].isna(), WARN, "Show sin nombre"),
+]
+
+
+def evaluate_rules(df, rules, context=None):
+    """
+    Evalúa todas las reglas sobre el DataFrame.
+    :argumento df: DATAFRAME a validar.
+    :argumento rules: LISTA de Rule.
+    :argumento context: DICCIONARIO opcional que reciben las reglas.
+    :return: DATAFRAME booleano con una columna por regla (True = la fila la incumple).
+    """
+    return pd.DataFrame(
+        {
+            rule.name: np.asarray(rule.check(df, context or {}), dtype=bool)
+            for rule in rules
+        },
+        index=df.index,
+    )
+
+
+def split_rows(df, rules, context=None):
+    """
+    Separa las filas válidas de las que incumplen alguna regla de cuarentena.
+    :argumento df: DATAFRAME a validar.
+    :argumento rules: LISTA de Rule.
+    :argumento context: DICCIONARIO opcional que reciben las reglas.
+    :return: TUPLA (DATAFRAME válido, DATAFRAME en cuarentena con la columna reasons,
+        SERIE regla -> filas que la incumplen).
+    """
+    masks = evaluate_rules(df, rules, context)
+    quarantine_rules = [rule.name for rule in rules if rule.action == QUARANTINE]
+    bad = masks[quarantine_rules].to_numpy().any(axis=1)
+    counts = masks.sum()
+    if not bad.any():
+        return df, df.iloc[:0].assign(reasons=pd.Series(dtype=schema.STRING)), counts
+
+    # bool * str es el nombre de la regla o "", y la suma por fila los concatena
+    labels = np.array([f"{name};" for name in quarantine_rules], dtype=object)
+    reasons = (masks.loc[bad, quarantine_rules].to_numpy(dtype=object) * labels).sum(axis=1)
+    quarantined = df[bad].assign(
+        reasons=pd.Series(reasons, index=df.index[bad]).str.rstrip(";").astype(schema.STRING)
+    )
+    return df[~bad], quarantined, counts
+
+
+def save_quarantine(df, dtypes, name, folder=QUARANTINE_FOLDER):
+    """
+    Guarda las filas en cuarentena (reemplaza las de la ejecución anterior).
+    :argumento df: DATAFRAME con las filas en cuarentena y la columna reasons.
+    :argumento dtypes: DICCIONARIO columna -> dtype de schema.py.
+    :argumento name: STRING, "episodes" o "shows".
+    :argumento folder: STRING con la carpeta de cuarentena.
+    :return: STRING con la ruta del archivo.
+    """
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}_quarantine.parquet")
+    table = schema.to_arrow(df, {**dtypes, "reasons": schema.STRING})
+    pq.write_table(table, path, compression="snappy")
+    return path
+
+
+@instrumentation.timed(rows=lambda result: len(result[0]) + len(result[1]))
+def validate(episodes_df, shows_df, quarantine_folder=QUARANTINE_FOLDER):
+    """
+    Aplica las reglas a shows y episodios, aparta las filas inválidas a la carpeta de
+    cuarentena y registra los conteos por regla.
+    :argumento episodes_df: DATAFRAME de episodios de dfs_creation.transform_data.
+    :argumento shows_df: DATAFRAME de shows de dfs_creation.transform_data.
+    :argumento quarantine_folder: STRING con la carpeta de cuarentena (None para no guardarla).
+    :return: TUPLA (episodios válidos, shows válidos, DATAFRAME con frame, rule, action y rows).
+    """
+    shows_valid, shows_bad, show_counts = split_rows(shows_df, SHOW_RULES)
+    # Los episodios se validan contra los shows que pasaron la validación
+    episodes_valid, episodes_bad, episode_counts = split_rows(
+        episodes_df, EPISODE_RULES, {"show_ids": shows_valid["id"].to_numpy()}
+    )
+
+    rows = []
+    for frame, rules, counts, bad, dtypes in (
+        ("shows", SHOW_RULES, show_counts, shows_bad, schema.SHOWS),
+        ("episodes", EPISODE_RULES, episode_counts, episodes_bad, schema.EPISODES),
+    ):
+        for rule in rules:
+            failed = int(counts[rule.name])
+            rows.append({"frame": frame, "rule": rule.name, "action": rule.action, "rows": failed})
+            instrumentation.count(
+                "validation_rows_total", failed, frame=frame, rule=rule.name, action=rule.action
+            )
+        if quarantine_folder:
+            save_quarantine(bad, dtypes, frame, quarantine_folder)
+        if len(bad):
+            logging.warning(f"{len(bad)} filas de {frame} en cuarentena")
+    report = pd.DataFrame(rows)
+    failed = report[report["rows"] > 0]
+    logging.info(
+        "Validación terminada. Filas que incumplen cada regla:\n"
+        + (failed.to_string(index=False) if len(failed) else "ninguna")
+    )
+    return episodes_valid, shows_valid, report
+
+
+def main(argv=None):
+    """
+    Valida los Parquet de dfs_creation.py y guarda la cuarentena.
+    :argumento argv: LISTA con los argumentos de la línea de comandos (None para usar sys.argv).
+    """
+    instrumentation.configure_script()
+    parser = argparse.ArgumentParser(
+        description="Valida los Parquet de dfs_creation.py y aparta las filas inválidas"
+    )
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    parser.add_argument("--quarantine-folder", default=QUARANTINE_FOLDER)
+    args = parser.parse_args(argv)
+
+    episodes = schema.apply_dtypes(
+        pd.read_parquet(os.path.join(args.data_folder, "episodes.parquet")), schema.EPISODES
+    )
+    shows = schema.apply_dtypes(
+        pd.read_parquet(os.path.join(args.data_folder, "shows.parquet")), schema.SHOWS
+    )
+    _, _, report = validate(episodes, shows, args.quarantine_folder)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
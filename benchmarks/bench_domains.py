@@ -0,0 +1,100 @@
+import argparse
+import random
+import time
+from urllib.parse import urlparse
+
+import pandas as pd
+
+import common  # noqa: F401  (agrega SRC al path)
+import domains
+
+"""
+Compara la extracción de dominios registrables de domains.py (funciones de texto de pyarrow
+sobre la columna completa) con urlparse fila a fila (Series.map), sobre URLs sintéticas con
+los casos que aparecen en officialSite y webChannel_site: subdominios, sufijos de dos niveles,
+URLs sin esquema, puertos, usuarios, mayúsculas, IPs, textos que no son URLs y nulos.
+Verifica que las dos versiones devuelvan los mismos dominios.
+"""
+
+HOSTS = [
+    "www.site{i}.com", "site{i}.net", "v.qq.com", "www.bbc.co.uk", "iview.abc.net.au",
+    "www.sbs.com.au", "abcnews.go.com", "tv.site{i}.co.jp", "www.netflix.com", "m.site{i}.org",
+    "10.0.{j}.1", "site{i}.com.br", "WWW.Site{i}.COM", "news.site{i}.co.kr",
+]
+TEMPLATES = [
+    "https://{host}/shows/{n}", "http://{host}", "{host}/path?x={n}", "https://{host}:8080/{n}",
+    "https://user@{host}/a#b", "  https://{host}./  ", "//{host}/x",
+]
+NOISE = [None, "", "n/a", "sin sitio", "https://", "localhost"]
+
+
+def synthetic_urls(size, seed=0):
+    """
+    :return: SERIE de pandas con `size` URLs (string[pyarrow]), con ~5% de valores inválidos.
+    """
+    rng = random.Random(seed)
+    urls = []
+    for n in range(size):
+        if rng.random() < 0.05:
+            urls.append(rng.choice(NOISE))
+            continue
+        host = rng.choice(HOSTS).format(i=rng.randrange(5000), j=rng.randrange(256))
+        urls.append(rng.choice(TEMPLATES).format(host=host, n=n))
+    return pd.Series(urls, dtype="string[pyarrow]")
+
+
+SUFFIXES = frozenset(domains.MULTI_LEVEL_SUFFIXES)
+
+
+def registrable_domain_rowwise(url):
+    """
+    Versión fila a fila con urlparse de domains.registrable_domains, como referencia.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip().lower()
+    host = urlparse(url if "//" in url else f"//{url}").hostname
+    host = (host or "").rstrip(".")
+    labels = host.split(".")
+    if len(labels) < 2 or not all(labels) or any(c.isspace() for c in host):
+        return None
+    if len(labels) == 4 and all(label.isdigit() and len(label) <= 3 for label in labels):
+        return host
+    if ".".join(labels[-2:]) in SUFFIXES:
+        return ".".join(labels[-3:]) if len(labels) >= 3 else None
+    return ".".join(labels[-2:])
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    urls = synthetic_urls(args.rows)
+    rowwise_time, rowwise = best_of(
+        lambda: urls.astype(object).map(registrable_domain_rowwise), args.repeat
+    )
+    vectorized_time, vectorized = best_of(
+        lambda: domains.registrable_domains(urls).to_pandas(), args.repeat
+    )
+
+    same = (rowwise == vectorized) | (rowwise.isna() & vectorized.isna())
+    print(f"{len(urls)} URLs, {int(vectorized.notna().sum())} con dominio, "
+          f"{vectorized.nunique()} dominios distintos")
+    print(f"urlparse fila a fila: {rowwise_time:.3f}s")
+    print(f"pyarrow vectorizado:  {vectorized_time:.3f}s ({rowwise_time / vectorized_time:.1f}x)")
+    if not same.all():
+        diff = pd.DataFrame({"url": urls, "fila_a_fila": rowwise, "vectorizado": vectorized})
+        print(f"\n{int((~same).sum())} URLs no coinciden:\n{diff[~same].drop_duplicates('url').head(20)}")
+        raise SystemExit(1)
+    print("Los dominios coinciden en todas las URLs")
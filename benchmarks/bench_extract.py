@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import common  # noqa: F401  (agrega SRC al path)
+from extract import date_range, fetch_date_range, fetch_tv_shows
+from stub_server import start_server
+
+"""
+Compara la extracción secuencial (una petición por fecha) con la extracción concurrente
+contra el servidor local, reportando latencia por fecha y throughput total.
+"""
+
+
+def bench_sequential(base_url, start, end):
+    started = time.perf_counter()
+    for date in date_range(start, end):
+        fetch_tv_shows(date, base_url=base_url)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-01-31")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency=args.latency, error_rate=args.error_rate)
+    n_dates = len(date_range(args.start, args.end))
+    sequential = bench_sequential(base_url, args.start, args.end)
+    summary = fetch_date_range(
+        args.start,
+        args.end,
+        max_workers=args.workers,
+        rate_limit=args.rate,
+        burst=args.workers,
+        base_url=base_url,
+        on_result=lambda date, data: True,
+    )
+    server.shutdown()
+
+    latencies = sorted(summary["latencies"].values())
+    print(f"Secuencial: {sequential:.2f}s ({n_dates / sequential:.2f} fechas/s)")
+    print(
+        f"Concurrente: {summary['elapsed']:.2f}s ({summary['throughput']:.2f} fechas/s), "
+        f"fallidas: {len(summary['failed'])}"
+    )
+    if latencies:
+        print(
+            f"Latencia por fecha: p50={latencies[len(latencies) // 2]:.3f}s "
+            f"max={latencies[-1]:.3f}s"
+        )
@@ -0,0 +1,68 @@
+import argparse
+import ast
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import common
+from clean import delete_unnecessary_columns, genres_creation
+from dfs_creation import iter_episodes, load_dfs, transform_data
+
+"""
+Compara la etapa intermedia en CSV (to_csv, read_csv y ast.literal_eval de genres) con la
+etapa intermedia en Parquet tipado, desde los DataFrames de transform_data hasta genres_creation.
+Reporta tiempo total y bytes escritos.
+"""
+
+
+def csv_path(episodes_df, shows_df, folder):
+    episodes_df.to_csv(os.path.join(folder, "episodes.csv"), index=False)
+    shows_df.to_csv(os.path.join(folder, "shows.csv"), index=False)
+    episodes_df = pd.read_csv(os.path.join(folder, "episodes.csv"))
+    shows_df = pd.read_csv(os.path.join(folder, "shows.csv"))
+    shows_df["genres"] = shows_df["genres"].apply(
+        lambda x: ast.literal_eval(x) if isinstance(x, str) else x
+    )
+    episodes_df, shows_df = delete_unnecessary_columns(episodes_df, shows_df)
+    return genres_creation(shows_df)
+
+
+def parquet_path(episodes_df, shows_df, folder):
+    load_dfs(episodes_df, shows_df, data_folder=folder)
+    episodes_df = pd.read_parquet(os.path.join(folder, "episodes.parquet"))
+    shows_df = pd.read_parquet(os.path.join(folder, "shows.parquet"))
+    episodes_df, shows_df = delete_unnecessary_columns(episodes_df, shows_df)
+    return genres_creation(shows_df)
+
+
+def folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--factor", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        common.replicate_json_folder(common.JSON_FOLDER, os.path.join(tmp, "json"), args.factor)
+        episodes_df, shows_df = transform_data(iter_episodes(os.path.join(tmp, "json")))
+        print(f"{len(episodes_df)} episodios, {len(shows_df)} shows")
+
+        results = {}
+        for name, func in (("csv", csv_path), ("parquet", parquet_path)):
+            folder = os.path.join(tmp, name)
+            os.makedirs(folder)
+            started = time.perf_counter()
+            genres_df, _ = func(episodes_df, shows_df.copy(), folder)
+            results[name] = (time.perf_counter() - started, folder_bytes(folder), genres_df)
+
+        pd.testing.assert_frame_equal(
+            results["csv"][2].reset_index(drop=True),
+            results["parquet"][2].reset_index(drop=True),
+            check_dtype=False,
+        )
+        for name, (seconds, written, _) in results.items():
+            print(f"{name:>8}: {seconds:.3f}s, {written / 1024:.0f} KB escritos")
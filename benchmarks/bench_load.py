@@ -0,0 +1,72 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+import common
+import load
+
+"""
+Compara la carga anterior (DROP + to_sql(if_exists="replace")) con la carga por upserts en
+lotes dentro de una transacción, sobre los Parquet limpios replicados N veces con ids nuevos.
+También mide una segunda carga sin cambios y una con un día modificado.
+"""
+
+
+def synthetic(episodes, shows, genres, factor):
+    """
+    Replica los DataFrames `factor` veces desplazando los ids para que no choquen.
+    """
+    ep_offset = int(episodes["id"].max()) + 1
+    show_offset = int(shows["id"].max()) + 1
+    eps, shs, gns = [], [], []
+    for k in range(factor):
+        eps.append(episodes.assign(id=episodes["id"] + k * ep_offset, show_id=episodes["show_id"] + k * show_offset))
+        shs.append(shows.assign(id=shows["id"] + k * show_offset))
+        gns.append(genres.assign(show_id=genres["show_id"] + k * show_offset))
+    genres = pd.concat(gns, ignore_index=True)
+    genres["id"] = range(1, len(genres) + 1)
+    return pd.concat(eps, ignore_index=True), pd.concat(shs, ignore_index=True), genres
+
+
+def legacy_load(episodes, shows, genres, db_path):
+    conn = sqlite3.connect(db_path)
+    episodes.to_sql("episodes", conn, if_exists="replace", index=False)
+    load.serialize_lists(shows).to_sql("shows", conn, if_exists="replace", index=False)
+    genres.to_sql("genres", conn, if_exists="replace", index=False)
+    conn.commit()
+    conn.close()
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--factor", type=int, default=10)
+    args = parser.parse_args()
+
+    episodes, shows, genres = load.load_data(load.episodes_path, load.shows_path, load.genres_path)
+    episodes, shows, genres = synthetic(episodes, shows, genres, args.factor)
+    print(f"{len(episodes)} episodios, {len(shows)} shows, {len(genres)} géneros")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        load.create_tables(rebuild=True, db_path=legacy_db)
+        print(f"to_sql replace:        {timed(legacy_load, episodes, shows, genres, legacy_db):.2f}s")
+
+        db = os.path.join(tmp, "upsert.db")
+        load.create_tables(rebuild=True, db_path=db)
+        print(f"upsert carga completa: {timed(load.load_dfs_to_tables, episodes, shows, genres, db):.2f}s")
+        print(f"upsert sin cambios:    {timed(load.load_dfs_to_tables, episodes, shows, genres, db):.2f}s")
+
+        day = episodes[episodes["airdate"] == "2024-01-15"].assign(runtime=1.0)
+        day_shows = shows[shows["id"].isin(day["show_id"])]
+        day_genres = genres[genres["show_id"].isin(day_shows["id"])]
+        print(f"upsert de un día:      {timed(load.load_dfs_to_tables, day, day_shows, day_genres, db):.2f}s ({len(day)} episodios)")
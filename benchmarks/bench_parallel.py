@@ -0,0 +1,37 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import common
+from dfs_creation import iter_episodes, transform_data, transform_data_parallel
+
+"""
+Mide transform_data_parallel con distinto número de procesos sobre los 31 días replicados
+y verifica que el resultado sea idéntico al de transform_data en serie.
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        common.replicate_json_folder(common.JSON_FOLDER, tmp, args.factor)
+
+        started = time.perf_counter()
+        serial = transform_data(iter_episodes(tmp))
+        baseline = time.perf_counter() - started
+        print(f"serie: {baseline:.2f}s ({len(serial[0])} episodios)")
+
+        for workers in sorted(set(args.workers)):
+            started = time.perf_counter()
+            result = transform_data_parallel(tmp, workers)
+            elapsed = time.perf_counter() - started
+            pd.testing.assert_frame_equal(serial[0], result[0])
+            pd.testing.assert_frame_equal(serial[1], result[1])
+            print(f"{workers:>2} procesos: {elapsed:.2f}s (speedup {baseline / elapsed:.1f}x)")
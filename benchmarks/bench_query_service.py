@@ -0,0 +1,100 @@
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from urllib.request import urlopen
+
+import pandas as pd
+
+import common  # noqa: F401  (agrega SRC al path)
+import query_service
+
+"""
+Compara la latencia de las consultas de query_service.py:
+
+- como read.py: una conexión nueva y pd.read_sql por consulta,
+- con el pool de conexiones y sin caché (la caché se vacía antes de cada consulta),
+- con el pool y la caché,
+- por HTTP con varios clientes concurrentes, con la caché activa.
+
+Requiere la base db/entretenimiento.db cargada por load.py.
+"""
+
+CASES = [
+    ("runtime_by_type", {}),
+    ("genre_counts", {"limit": 10}),
+    ("domains", {"limit": 10}),
+    ("domains_by_source", {"source": "webChannel", "limit": 10}),
+    ("episodes_in_range", {"start": "2024-01-01", "end": "2024-01-07"}),
+]
+
+
+def per_call_ms(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def read_sql_once(db_path, name, params):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql(
+            query_service.QUERIES[name].sql, conn, params=query_service.bind_params(name, params)
+        )
+    finally:
+        conn.close()
+
+
+def uncached(service, name, params):
+    with service.lock:
+        service.cache.clear()
+    return service.query(name, params)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=query_service.DB_PATH)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args()
+
+    service = query_service.QueryService(args.db)
+    print(f"{'consulta':<20} {'read_sql':>10} {'pool':>10} {'pool+caché':>12}  (ms por consulta)")
+    for name, params in CASES:
+        rows = service.query(name, params)
+        assert len(read_sql_once(args.db, name, params)) == len(rows)
+        times = [
+            per_call_ms(lambda: read_sql_once(args.db, name, params), args.repeat),
+            per_call_ms(lambda: uncached(service, name, params), args.repeat),
+            per_call_ms(lambda: service.query(name, params), args.repeat),
+        ]
+        print(f"{name:<20} {times[0]:10.3f} {times[1]:10.3f} {times[2]:12.4f}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), query_service.make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    urls = [
+        f"{base_url}/{name}?" + "&".join(f"{k}={v}" for k, v in params.items())
+        for name, params in CASES
+    ]
+
+    def fetch(i):
+        with urlopen(urls[i % len(urls)]) as response:
+            return len(json.load(response)["rows"])
+
+    requests_count = args.repeat * len(urls)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        list(executor.map(fetch, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"\nHTTP: {requests_count} peticiones con {args.clients} clientes en {elapsed:.2f}s "
+        f"({requests_count / elapsed:.0f} peticiones/s), caché: {service.stats}"
+    )
+    server.shutdown()
+    service.close()
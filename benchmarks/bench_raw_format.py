@@ -0,0 +1,59 @@
+import argparse
+import os
+import tempfile
+import time
+
+import common
+import raw_store
+from dfs_creation import iter_episodes, transform_data
+
+"""
+Compara los formatos crudos de raw_store.py sobre los archivos de la carpeta JSON: tamaño en
+disco, tiempo de escritura, tiempo de lectura (parseo) y tiempo de transform_data leyendo
+desde cada formato. Verifica que todos los formatos devuelvan los mismos episodios.
+"""
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json-folder", default=common.JSON_FOLDER)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    days = [
+        (date, raw_store.read_raw(path))
+        for date, path in raw_store.list_raw_files(args.json_folder)
+    ]
+    print(f"{len(days)} días, {sum(len(data) for _, data in days)} episodios")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        for fmt in raw_store.available_formats()[::-1]:
+            folder = os.path.join(tmp, fmt)
+            started = time.perf_counter()
+            for date, data in days:
+                raw_store.write_raw(data, folder, date, fmt)
+            written = time.perf_counter() - started
+            size = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+            paths = [path for _, path in raw_store.list_raw_files(folder)]
+
+            episodes = [raw_store.read_raw(path) for path in paths]
+            if reference is None:
+                reference = episodes
+            assert episodes == reference, f"{fmt} no devuelve los mismos episodios"
+
+            read = best_of(lambda: [raw_store.read_raw(path) for path in paths], args.repeat)
+            transform = best_of(lambda: transform_data(iter_episodes(folder)), args.repeat)
+            print(
+                f"{fmt:>10}: {size / 2**20:6.2f} MB, escritura {written:.3f}s, "
+                f"lectura {read:.3f}s, lectura + transform_data {transform:.3f}s"
+            )
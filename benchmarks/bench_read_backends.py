@@ -0,0 +1,115 @@
+import os
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+import common  # noqa: F401  (agrega SRC al path)
+import synthetic
+import clean
+import dfs_creation
+import load
+import parquet_backends
+import read
+
+"""
+Compara las consultas de read.py en el backend sqlite (entretenimiento.db) con los backends
+de parquet_backends.py (arrow y, si está instalado, duckdb), sobre datos sintéticos a 1x, 10x
+y 100x los de enero de 2024. Para cada escala genera los JSON, corre transform, clean y load
+en una carpeta temporal y mide cada consulta (mejor de varias ejecuciones), con todo el rango
+de fechas y con una semana. Verifica que todos los backends devuelvan lo mismo.
+"""
+
+SCALES = [1, 10, 100]
+START = date(2024, 1, 1)
+
+
+def build_scale(scale, workdir):
+    """
+    Genera los datos de una escala y los deja en Parquet (DATA) y en SQLite.
+    :return: TUPLA (carpeta DATA, ruta de la base de datos, cantidad de episodios).
+    """
+    json_folder = os.path.join(workdir, "JSON")
+    data_folder = os.path.join(workdir, "DATA")
+    db_path = os.path.join(workdir, "entretenimiento.db")
+    os.makedirs(data_folder)
+    synthetic.generate(json_folder, days=synthetic.DAYS * scale, start=START)
+
+    episodes, shows = dfs_creation.transform_data(dfs_creation.iter_episodes(json_folder))
+    episodes, shows = clean.delete_unnecessary_columns(episodes, shows)
+    genres, shows = clean.genres_creation(shows)
+    shows = clean.domains_creation(shows)
+    shows = clean.strip_html(shows)
+    clean.save_as_parquet(episodes, shows, genres, mode="overwrite", data_folder=data_folder)
+    load.create_tables(db_path=db_path)
+    load.load_dfs_to_tables(episodes, shows, genres, db_path=db_path)
+    return data_folder, db_path, len(episodes)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def normalized(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def run_scale(scale, repeat):
+    workdir = tempfile.mkdtemp(prefix=f"bench_read_{scale}x_")
+    try:
+        data_folder, db_path, episodes = build_scale(scale, workdir)
+        days = synthetic.DAYS * scale
+        week = (START + timedelta(days=days // 2)).isoformat()
+        week_end = (START + timedelta(days=days // 2 + 6)).isoformat()
+        cases = [(name, None, None) for name in read.QUERIES]
+        cases.append(("episodes_by_day", week, week_end))
+
+        backends = [
+            parquet_backends.connect(backend, data_folder)
+            for backend in parquet_backends.available_backends()
+        ]
+        conn = load.connect(db_path)
+        print(f"\nescala {scale}x: {episodes} episodios ({days} días)")
+        header = "".join(f" {backend.name:>10}" for backend in backends)
+        print(f"  {'consulta':<28} {'sqlite':>10}{header}  (ms)")
+        for name, start, end in cases:
+            sql = read.QUERIES[name][1]
+            params = {"start": start, "end": end}
+            sqlite_ms, expected = best_of(lambda: pd.read_sql(sql, conn, params=params), repeat)
+            times = []
+            for backend in backends:
+                ms, table = best_of(lambda: backend.query(name, start, end), repeat)
+                result = table.to_pandas()[list(expected.columns)]
+                pd.testing.assert_frame_equal(
+                    normalized(expected), normalized(result), check_dtype=False
+                )
+                times.append(ms)
+            label = name if start is None else f"{name} (7 días)"
+            print(f"  {label:<28} {sqlite_ms:10.2f}" + "".join(f" {ms:10.2f}" for ms in times))
+        conn.close()
+        for backend in backends:
+            backend.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"backends de Parquet disponibles: {parquet_backends.available_backends()}")
+    for scale in args.scales:
+        run_scale(scale, args.repeat)
+    print("\nTodos los backends devuelven los mismos resultados")
@@ -0,0 +1,147 @@
+import os
+import argparse
+import logging
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import common  # noqa: F401  (agrega SRC al path)
+import synthetic
+import clean
+import dfs_creation
+import load
+import read
+
+"""
+Mide la búsqueda de texto de read.search (índices FTS5 de load.py) frente a un LIKE sobre
+las mismas columnas, sobre datos sintéticos (por defecto 100x los de enero de 2024) a los que
+se les ponen nombres y resúmenes con palabras de un vocabulario con distribución de Zipf (unas
+pocas palabras muy comunes y muchas raras). Mide también:
+
+- la carga inicial (que construye los índices al final) y la reconstrucción completa,
+- una carga incremental que cambia el nombre de algunos episodios, verificando que la
+  búsqueda encuentre los nombres nuevos y ya no los anteriores.
+"""
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "tu", "ne", "so", "vi", "da", "pe", "gu", "zo", "li", "an"]
+
+
+def vocabulary(size, rng):
+    """
+    :return: LISTA de `size` palabras distintas.
+    """
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, rng.integers(2, 5))))
+    return sorted(words)
+
+
+def random_texts(count, words, length, rng):
+    """
+    :return: LISTA de `count` textos de `length` palabras elegidas con distribución de Zipf.
+    """
+    weights = 1 / np.arange(1, len(words) + 1)
+    picks = rng.choice(len(words), size=(count, length), p=weights / weights.sum())
+    vocab = np.array(words, dtype=object)
+    return [" ".join(row) for row in vocab[picks]]
+
+
+def add_texts(episodes, shows, words, rng):
+    """
+    Reemplaza los nombres y resúmenes sintéticos por textos del vocabulario.
+    """
+    episodes = episodes.assign(
+        name=pd.array(random_texts(len(episodes), words, 3, rng), dtype="string[pyarrow]")
+    )
+    summaries = [f"<p>{text}</p>" for text in random_texts(len(shows), words, 40, rng)]
+    shows = shows.assign(
+        name=pd.array(random_texts(len(shows), words, 2, rng), dtype="string[pyarrow]"),
+        summary=pd.array(summaries, dtype="string[pyarrow]"),
+    )
+    return episodes, shows
+
+
+LIKE_QUERY = """
+SELECT 'show' AS tipo, id, name FROM shows WHERE name LIKE :pattern OR summary LIKE :pattern
+UNION ALL
+SELECT 'episodio', id, name FROM episodes WHERE name LIKE :pattern
+"""
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    try:
+        json_folder = os.path.join(workdir, "JSON")
+        db_path = os.path.join(workdir, "entretenimiento.db")
+        synthetic.generate(json_folder, days=synthetic.DAYS * args.scale)
+        episodes, shows = dfs_creation.transform_data(dfs_creation.iter_episodes(json_folder))
+        episodes, shows = clean.delete_unnecessary_columns(episodes, shows)
+        words = vocabulary(20000, rng)
+        episodes, shows = add_texts(episodes, shows, words, rng)
+        genres, shows = clean.genres_creation(shows)
+        shows = clean.strip_html(clean.domains_creation(shows))
+
+        load.create_tables(db_path=db_path)
+        load_ms, _ = best_of(
+            lambda: load.load_dfs_to_tables(episodes, shows, genres, db_path=db_path), 1
+        )
+        conn = sqlite3.connect(db_path)
+        rebuild_ms, _ = best_of(lambda: load.rebuild_search_index(conn), 1)
+        conn.commit()
+        print(f"escala {args.scale}x: {len(episodes)} episodios y {len(shows)} shows")
+        print(f"carga inicial (con la construcción de los índices): {load_ms / 1000:.2f}s")
+        print(f"reconstrucción completa de los índices:             {rebuild_ms / 1000:.2f}s")
+
+        # Carga incremental: cambia el nombre del 1% de los episodios
+        changed = episodes.sample(frac=0.01, random_state=0)
+        renamed = changed.assign(name="zzrenombrado")
+        incremental_ms, _ = best_of(
+            lambda: load.load_dfs_to_tables(
+                renamed, shows.iloc[:0], genres.iloc[:0], db_path=db_path
+            ),
+            1,
+        )
+        found = read.search(conn, "zzrenombrado", limit=len(renamed) + 1)
+        assert len(found) == len(renamed), (len(found), len(renamed))
+        previous = read.search(conn, changed["name"].iloc[0], limit=len(episodes))
+        assert changed["id"].iloc[0] not in set(previous["id"])
+        print(f"carga incremental de {len(renamed)} episodios renombrados: "
+              f"{incremental_ms / 1000:.2f}s (el índice quedó al día)")
+        integrity = load.check_search_index(conn)
+        assert not any(integrity.values()), integrity
+
+        # Palabras de distinta frecuencia del vocabulario y una frase de dos palabras
+        cases = [words[0], words[50], words[5000], f"{words[3]} {words[7]}"]
+        print(f"\n  {'búsqueda':<22} {'con LIKE':>14} {'fts5 ms':>10} {'like ms':>10}")
+        for text in cases:
+            fts_ms, result = best_of(lambda: read.search(conn, text), args.repeat)
+            like_ms, matches = best_of(
+                lambda: pd.read_sql(
+                    LIKE_QUERY, conn, params={"pattern": f"%{text.split()[0]}%"}
+                ),
+                args.repeat,
+            )
+            print(f"  {text:<22} {len(matches):>14} {fts_ms:10.2f} {like_ms:10.2f}")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
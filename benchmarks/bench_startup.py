@@ -0,0 +1,85 @@
+import os
+import argparse
+import subprocess
+import sys
+import time
+
+import common  # noqa: F401  (agrega SRC al path)
+import cli
+
+"""
+Mide el tiempo de arranque de cada comando de SRC/cli.py con `python -X importtime`
+(`cli.py <comando> --help`: importa el script del comando y termina antes de trabajar) y lo
+compara con un presupuesto por comando. Termina con error si algún comando lo supera, así que
+se puede usar para detectar imports pesados agregados a nivel de módulo:
+
+    python benchmarks/bench_startup.py
+"""
+
+CLI_PATH = os.path.join(common.SRC_FOLDER, "cli.py")
+# Presupuesto (ms) del tiempo de importación de cada comando. Los que leen o escriben
+# DataFrames necesitan pandas y pyarrow (~400 ms); el resto no debería cargarlos.
+BUDGETS_MS = {
+    "": 60,  # cli.py --help, sin comando
+    "extract": 200,
+    "query": 120,
+    "raw": 80,
+    "transform": 700,
+    "validate": 700,
+    "clean": 700,
+    "load": 700,
+    "read": 600,
+    "pipeline": 800,
+    "schema": 600,
+}
+
+
+def import_times(command):
+    """
+    Ejecuta `cli.py <comando> --help` con -X importtime.
+    :return: TUPLA (ms de importación de los módulos de primer nivel, ms totales del proceso,
+        LISTA de (ms, módulo) de primer nivel).
+    """
+    args = [sys.executable, "-X", "importtime", CLI_PATH] + ([command] if command else [])
+    started = time.perf_counter()
+    result = subprocess.run(args + ["--help"], capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Los módulos de primer nivel no tienen sangría; sus hijos ya están en su acumulado
+        if not name.startswith("  "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sum(ms for ms, _ in modules), wall_ms, modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("commands", nargs="*", default=list(BUDGETS_MS))
+    args = parser.parse_args()
+
+    print(f"{'comando':<10} {'import ms':>10} {'total ms':>10} {'presupuesto':>12}  más pesados")
+    over = []
+    for command in args.commands:
+        runs = [import_times(command) for _ in range(args.repeat)]
+        imports_ms, wall_ms, modules = min(runs, key=lambda run: run[0])
+        heaviest = ", ".join(
+            f"{name} {ms:.0f}" for ms, name in sorted(modules, reverse=True)[:3]
+        )
+        budget = BUDGETS_MS.get(command)
+        print(
+            f"{command or '(ayuda)':<10} {imports_ms:10.1f} {min(r[1] for r in runs):10.1f} "
+            f"{budget or '-':>12}  {heaviest}"
+        )
+        if budget is not None and imports_ms > budget:
+            over.append(command or "(ayuda)")
+    missing = set(cli.COMMANDS) - set(BUDGETS_MS)
+    if missing:
+        print(f"Comandos sin presupuesto: {sorted(missing)}")
+    if over:
+        print(f"Superan el presupuesto: {over}")
+        raise SystemExit(1)
+    print("Todos los comandos están dentro del presupuesto")
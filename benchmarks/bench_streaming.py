@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+
+"""
+Compara el pico de memoria de tres formas de transformar los JSON, sobre los 31 días de la
+carpeta JSON replicados N veces:
+
+- baseline: el camino original, todos los episodios en una sola lista (load_json_files),
+  transform_data por fila (bench_transform.legacy_transform_data) y CSV,
+- memoria: todo en memoria con el transform_data columnar actual y los Parquet de load_dfs
+  (dfs_creation.py sin --stream),
+- stream: archivo por archivo con transform_stream (dfs_creation.py --stream).
+
+Cada modo se ejecuta en un subproceso aparte y escribe en una carpeta temporal.
+"""
+
+MODES = ("baseline", "memoria", "stream")
+
+
+def run_mode(mode, json_folder):
+    from bench_transform import legacy_transform_data
+    from dfs_creation import load_dfs, load_json_files, transform_data, transform_stream
+
+    data_folder = os.path.join(json_folder, "DATA")
+    os.makedirs(data_folder, exist_ok=True)
+    started = time.perf_counter()
+    if mode == "baseline":
+        episodes_df, shows_df = legacy_transform_data(load_json_files(json_folder))
+        episodes_df.to_csv(os.path.join(data_folder, "episodes.csv"), index=False)
+        shows_df.to_csv(os.path.join(data_folder, "shows.csv"), index=False)
+        rows = len(episodes_df)
+    elif mode == "memoria":
+        episodes_df, shows_df = transform_data(load_json_files(json_folder))
+        load_dfs(episodes_df, shows_df, data_folder=data_folder)
+        rows = len(episodes_df)
+    else:
+        rows = transform_stream(json_folder, data_folder=data_folder, profile=False)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"mode": mode, "rows": rows, "seconds": elapsed, "peak_rss_mb": common.peak_rss_mb()}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--factor", type=int, default=50)
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--json-folder")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.json_folder)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        n_files = common.replicate_json_folder(common.JSON_FOLDER, tmp, args.factor)
+        print(f"{n_files} archivos ({args.factor}x)")
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--json-folder", tmp],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:>8}: {result['rows']} filas en {result['seconds']:.1f}s, "
+                f"pico RSS {result['peak_rss_mb']:.0f} MB"
+            )
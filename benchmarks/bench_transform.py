@@ -0,0 +1,155 @@
+import argparse
+import time
+
+import pandas as pd
+
+import common
+import schema
+from dfs_creation import iter_json_files, transform_data
+
+"""
+Compara transform_data (columnar) con la implementación anterior que armaba un diccionario
+por fila: verifica que los DataFrames y los CSV resultantes sean idénticos y mide filas/s.
+transform_data ya devuelve los dtypes de schema.py, así que la implementación por fila se
+mide también con la conversión de apply_dtypes.
+"""
+
+
+def legacy_transform_data(json_data, seen_shows: set = None) -> tuple:
+    """
+    Transforma los datos JSON en DataFrames normalizados para episodios y shows.
+
+    :argumento json_data: LISTA o GENERADOR de diccionarios con los datos extraídos de los archivos JSON.
+    :argumento seen_shows: SET opcional con los ids de series ya emitidas en trozos anteriores;
+        se actualiza con las series nuevas.
+    :return: TUPLA de dos DataFrames (episodes_df, shows_df).
+    """
+
+    episodes_list = []  # Lista para episodios
+    shows_dict = {}  # Diccionario para series (evita duplicados)
+    if seen_shows is None:
+        seen_shows = set()
+
+    for item in json_data:
+        show_data = item.get("_embedded", {}).get(
+            "show", {}
+        )  # Extraer info del show (serie)
+
+        # Extraer ID del show
+        show_id = show_data.get("id")
+
+        # Guardar información de la serie si aún no está
+        if show_id and show_id not in seen_shows:
+            seen_shows.add(show_id)
+            shows_dict[show_id] = {
+                "id": show_id,
+                "url": show_data.get("url", pd.NA),
+                "name": show_data.get("name", pd.NA),
+                "type": show_data.get("type", pd.NA),
+                "language": show_data.get("language", pd.NA),
+                "genres": show_data.get("genres") if show_data.get("genres") else pd.NA,
+                "status": show_data.get("status", pd.NA),
+                "runtime": show_data.get("runtime", pd.NA),
+                "averageRuntime": show_data.get("averageRuntime", pd.NA),
+                "premiered": show_data.get("premiered", pd.NA),
+                "ended": show_data.get("ended", pd.NA),
+                "officialSite": show_data.get("officialSite", pd.NA),
+                "schedule_time": show_data.get("schedule", {}).get("time", pd.NA),
+                "schedule_days": (
+                    show_data.get("schedule", {}).get("days")
+                    if show_data.get("schedule", {}).get("days")
+                    else pd.NA
+                ),
+                "rating": show_data.get("rating", {}).get("average", pd.NA),
+                "weight": show_data.get("weight", pd.NA),
+                "summary": show_data.get("summary", pd.NA),
+                "webChannel_name": (show_data.get("webChannel") or {}).get(
+                    "name", pd.NA
+                ),
+                "webChannel_site": (show_data.get("webChannel") or {}).get(
+                    "officialSite", pd.NA
+                ),
+                "dvd_country": show_data.get("dvdCountry", pd.NA),
+                "externals_tvrage": (show_data.get("externals") or {}).get(
+                    "tvrage", pd.NA
+                ),
+                "externals_thetvdb": (show_data.get("externals") or {}).get(
+                    "thetvdb", pd.NA
+                ),
+                "externals_imdb": (show_data.get("externals") or {}).get("imdb", pd.NA),
+                "updated": show_data.get("updated", pd.NA),
+            }
+
+        # Guardar episodio con referencia al show
+        episodes_list.append(
+            {
+                "id": item.get("id", pd.NA),
+                "name": item.get("name", pd.NA),
+                "season": item.get("season", pd.NA),
+                "number": item.get("number", pd.NA),
+                "type": item.get("type", pd.NA),
+                "airdate": item.get("airdate", pd.NA),
+                "airtime": item.get("airtime", pd.NA),
+                "airstamp": item.get("airstamp", pd.NA),
+                "runtime": item.get("runtime", pd.NA),
+                "rating": item.get("rating", {}).get("average", pd.NA),
+                "show_id": show_id,  # Clave foránea para relacionarlo con la serie
+            }
+        )
+
+    # Convertimos datos procesados a dataframes
+    episodes_df = pd.DataFrame(episodes_list)
+    shows_df = pd.DataFrame(shows_dict.values())
+
+    return episodes_df, shows_df
+
+
+def legacy_typed(json_data) -> tuple:
+    """
+    :return: TUPLA (episodes_df, shows_df) de legacy_transform_data con los dtypes de schema.py.
+    """
+    episodes_df, shows_df = legacy_transform_data(json_data)
+    return (
+        schema.apply_dtypes(episodes_df, schema.EPISODES),
+        schema.apply_dtypes(shows_df, schema.SHOWS),
+    )
+
+
+def check_equivalence(records):
+    """
+    Lanza AssertionError si los DataFrames o sus CSV difieren entre ambas implementaciones.
+    La implementación original infería los dtypes, así que se le aplican los de schema.py.
+    """
+    old_episodes, old_shows = legacy_typed(records)
+    new_episodes, new_shows = transform_data(records)
+    for old, new in ((old_episodes, new_episodes), (old_shows, new_shows)):
+        pd.testing.assert_frame_equal(old, new)
+        assert old.to_csv(index=False) == new.to_csv(index=False)
+
+
+def rows_per_second(func, records, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(records)
+        best = min(best, time.perf_counter() - started)
+    return len(records) / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = [item for _, data in iter_json_files(common.JSON_FOLDER) for item in data]
+    check_equivalence(records)
+    print(f"Equivalencia verificada sobre {len(records)} episodios")
+
+    records = records * args.factor
+    old = rows_per_second(legacy_transform_data, records, args.repeat)
+    typed = rows_per_second(legacy_typed, records, args.repeat)
+    new = rows_per_second(transform_data, records, args.repeat)
+    print(f"Por fila, sin dtypes:  {old:,.0f} filas/s")
+    print(f"Por fila + dtypes:     {typed:,.0f} filas/s")
+    print(f"Columnar con dtypes:   {new:,.0f} filas/s ({new / typed:.1f}x)")
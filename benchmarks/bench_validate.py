@@ -0,0 +1,111 @@
+import os
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import common  # noqa: F401  (agrega SRC al path)
+import synthetic
+import clean
+import dfs_creation
+import validate
+
+"""
+Mide cuánto agrega validate.py al proceso, sobre datos sintéticos (por defecto 100x los de
+enero de 2024) con errores inyectados en ~1% de los episodios y shows: runtimes negativos o
+enormes, fechas inválidas, episodios de shows inexistentes, ids duplicados y ended anterior a
+premiered. Compara el tiempo de la validación con el de transform + clean + save, y verifica
+que la cuarentena tenga exactamente las filas con errores.
+"""
+
+
+def inject_faults(episodes, shows, fraction, seed=0):
+    """
+    Agrega errores a una fracción de las filas.
+    :return: TUPLA (episodios, shows, INT episodios con errores, INT shows con errores).
+    """
+    rng = np.random.default_rng(seed)
+    episodes = episodes.copy()
+    shows = shows.copy()
+    faulty = rng.choice(len(episodes), int(len(episodes) * fraction), replace=False)
+    kinds = np.array_split(faulty, 4)
+    episodes.iloc[kinds[0], episodes.columns.get_loc("runtime")] = -30
+    episodes.iloc[kinds[1], episodes.columns.get_loc("runtime")] = 100_000
+    episodes.iloc[kinds[2], episodes.columns.get_loc("airdate")] = "2024-02-30"
+    episodes.iloc[kinds[3], episodes.columns.get_loc("show_id")] = -1
+    # Una copia de algunos episodios al principio: se conserva la última aparición
+    duplicates = episodes.iloc[rng.choice(len(episodes), len(kinds[0]), replace=False)]
+    episodes = pd.concat([duplicates, episodes], ignore_index=True)
+
+    bad_shows = rng.choice(len(shows), max(1, int(len(shows) * fraction)), replace=False)
+    shows.iloc[bad_shows, shows.columns.get_loc("premiered")] = "2030-01-01"
+    shows.iloc[bad_shows, shows.columns.get_loc("ended")] = "2020-01-01"
+    # Los episodios de los shows en cuarentena también quedan en cuarentena
+    orphaned = episodes["show_id"].isin(shows["id"].iloc[bad_shows]).to_numpy()
+    orphaned[len(duplicates):][faulty] = True
+    orphaned[: len(duplicates)] = True
+    return episodes, shows, int(orphaned.sum()), len(bad_shows)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--fraction", type=float, default=0.01)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    workdir = tempfile.mkdtemp(prefix="bench_validate_")
+    try:
+        json_folder = os.path.join(workdir, "JSON")
+        data_folder = os.path.join(workdir, "DATA")
+        os.makedirs(data_folder)
+        synthetic.generate(json_folder, days=synthetic.DAYS * args.scale)
+
+        transform_time, (episodes, shows) = timed(
+            lambda: dfs_creation.transform_data(dfs_creation.iter_episodes(json_folder))
+        )
+        episodes, shows, bad_episodes, bad_shows = inject_faults(episodes, shows, args.fraction)
+        validate_time, (episodes, shows, report) = timed(
+            lambda: validate.validate(episodes, shows, os.path.join(data_folder, "quarantine"))
+        )
+
+        def clean_and_save():
+            episodes_clean, shows_clean = clean.delete_unnecessary_columns(episodes, shows)
+            genres, shows_clean = clean.genres_creation(shows_clean)
+            shows_clean = clean.domains_creation(shows_clean)
+            shows_clean = clean.strip_html(shows_clean)
+            clean.save_as_parquet(
+                episodes_clean, shows_clean, genres, mode="overwrite", data_folder=data_folder
+            )
+
+        clean_time, _ = timed(clean_and_save)
+        quarantined = {
+            frame: len(pd.read_parquet(
+                os.path.join(data_folder, "quarantine", f"{frame}_quarantine.parquet")
+            ))
+            for frame in ("episodes", "shows")
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    etl_time = transform_time + clean_time
+    print(f"escala {args.scale}x: {len(episodes)} episodios y {len(shows)} shows válidos")
+    print(report[report["rows"] > 0].to_string(index=False))
+    print(f"\ntransform + clean + save: {etl_time:.3f}s")
+    print(f"validate:                 {validate_time:.3f}s "
+          f"({100 * validate_time / etl_time:.1f}% del proceso)")
+    print(f"cuarentena: {quarantined}")
+    if quarantined != {"episodes": bad_episodes, "shows": bad_shows}:
+        print(f"Se esperaban {bad_episodes} episodios y {bad_shows} shows en cuarentena")
+        raise SystemExit(1)
+    print("La cuarentena tiene exactamente las filas con errores")
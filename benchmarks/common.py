@@ -0,0 +1,48 @@
+import os
+import sys
+
+"""
+Utilidades compartidas por los benchmarks: agrega SRC al path para importar los scripts del ETL.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_FOLDER = os.path.join(BASE_DIR, "..", "SRC")
+JSON_FOLDER = os.path.join(BASE_DIR, "..", "JSON")
+
+if SRC_FOLDER not in sys.path:
+    sys.path.insert(0, SRC_FOLDER)
+
+
+def replicate_json_folder(src_folder, dst_folder, factor):
+    """
+    Replica los archivos tv_shows_*.json `factor` veces con fechas consecutivas nuevas,
+    usando enlaces simbólicos para no ocupar disco.
+    :argumento src_folder: STRING con la carpeta original.
+    :argumento dst_folder: STRING con la carpeta destino.
+    :argumento factor: INT con el número de copias.
+    :return: INT con el número de archivos creados.
+    """
+    from datetime import date, timedelta
+
+    os.makedirs(dst_folder, exist_ok=True)
+    files = sorted(f for f in os.listdir(src_folder) if f.startswith("tv_shows_"))
+    day = date(2024, 1, 1)
+    for _ in range(factor):
+        for file_name in files:
+            suffix = file_name[len("tv_shows_YYYY-MM-DD") :]
+            target = os.path.join(dst_folder, f"tv_shows_{day.isoformat()}{suffix}")
+            os.symlink(os.path.abspath(os.path.join(src_folder, file_name)), target)
+            day += timedelta(days=1)
+    return factor * len(files)
+
+
+def peak_rss_mb():
+    """
+    :return: FLOAT con el pico de memoria residente del proceso en MB (None si no está disponible).
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
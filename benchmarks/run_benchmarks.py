@@ -0,0 +1,285 @@
+import os
+import argparse
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import common
+import synthetic
+from stub_server import start_server
+
+"""
+Mide cada etapa del ETL sobre datos sintéticos a distintas escalas (1x, 10x y 100x los datos
+de enero de 2024) y guarda los resultados en JSON para comparar entre commits:
+
+    python benchmarks/run_benchmarks.py --scales 1 10 100
+    python benchmarks/run_benchmarks.py --compare results/antes.json results/despues.json
+
+Cada escala corre en un proceso aparte, así el pico de memoria de una no afecta a la otra.
+El pico de memoria es el del proceso al terminar cada etapa (ru_maxrss), y `crecimiento_mb`
+es cuánto subió ese pico durante la etapa.
+"""
+
+RESULTS_FOLDER = os.path.join(common.BASE_DIR, "results")
+SCALES = [1, 10, 100]
+# Diferencias menores a este tiempo se consideran ruido al comparar
+NOISE_SECONDS = 0.05
+
+
+def git_commit():
+    """
+    :return: STRING con el hash corto del commit actual, o "sin-git".
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=common.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+
+def measure(results, stage, func, rows=None):
+    """
+    Ejecuta func() y agrega a results el tiempo, el throughput y la memoria de la etapa.
+    :argumento results: DICCIONARIO etapa -> métricas.
+    :argumento stage: STRING con el nombre de la etapa.
+    :argumento func: función sin argumentos.
+    :argumento rows: función opcional que recibe el resultado y devuelve las filas procesadas.
+    :return: el resultado de func().
+    """
+    rss_before = common.peak_rss_mb()
+    started = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - started
+    rss_after = common.peak_rss_mb()
+    count = rows(value) if rows else None
+    results[stage] = {
+        "segundos": round(seconds, 4),
+        "filas": count,
+        "filas_por_segundo": round(count / seconds, 1) if count and seconds else None,
+        "pico_rss_mb": None if rss_after is None else round(rss_after, 1),
+        "crecimiento_mb": None if rss_after is None else round(rss_after - rss_before, 1),
+    }
+    print(f"  {stage:<32} {seconds:8.3f}s  {count or '':>8}")
+    return value
+
+
+def run_scale(scale, workdir):
+    """
+    Genera los datos de una escala y mide cada etapa del ETL sobre ellos.
+    :argumento scale: INT, multiplica los días de los datos de enero de 2024.
+    :argumento workdir: STRING con la carpeta temporal de trabajo.
+    :return: DICCIONARIO con los datos generados y las métricas por etapa.
+    """
+    import dfs_creation
+    import clean
+    import load
+    import parquet_backends
+    import read
+    import validate
+    from extract import fetch_date_range, save_json
+
+    logging.getLogger().setLevel(logging.WARNING)
+    source = os.path.join(workdir, "source")
+    json_folder = os.path.join(workdir, "JSON")
+    data_folder = os.path.join(workdir, "DATA")
+    db_path = os.path.join(workdir, "entretenimiento.db")
+    os.makedirs(data_folder)
+
+    start = date(2024, 1, 1)
+    started = time.perf_counter()
+    generated = synthetic.generate(source, days=synthetic.DAYS * scale, start=start)
+    generated["segundos"] = round(time.perf_counter() - started, 2)
+    print(f"escala {scale}x: {generated}")
+
+    results = {}
+    server, base_url = start_server(source)
+    try:
+        measure(
+            results,
+            "fetch_tv_shows",
+            lambda: fetch_date_range(
+                start.isoformat(),
+                (start + timedelta(days=generated["days"] - 1)).isoformat(),
+                rate_limit=1e6,
+                burst=1000,
+                base_url=base_url,
+                on_result=lambda day, data: save_json(data, day, json_folder),
+            ),
+            rows=lambda summary: len(summary["latencies"]),
+        )
+    finally:
+        server.shutdown()
+
+    records = measure(
+        results, "load_json_files", lambda: dfs_creation.load_json_files(json_folder), len
+    )
+    episodes, shows = measure(
+        results,
+        "transform_data",
+        lambda: dfs_creation.transform_data(records),
+        lambda dfs: len(dfs[0]),
+    )
+    del records
+    episodes, shows, _ = measure(
+        results,
+        "validate",
+        lambda: validate.validate(episodes, shows, os.path.join(data_folder, "quarantine")),
+        lambda r: len(r[0]) + len(r[1]),
+    )
+    episodes, shows = clean.delete_unnecessary_columns(episodes, shows)
+    genres, shows = measure(
+        results, "genres_creation", lambda: clean.genres_creation(shows), lambda r: len(r[0])
+    )
+    shows = measure(results, "domains_creation", lambda: clean.domains_creation(shows), len)
+    shows = measure(results, "strip_html", lambda: clean.strip_html(shows), len)
+    measure(
+        results,
+        "save_as_parquet",
+        lambda: clean.save_as_parquet(
+            episodes, shows, genres, mode="overwrite", data_folder=data_folder
+        ),
+        lambda _: len(episodes),
+    )
+    load.create_tables(db_path=db_path)
+    measure(
+        results,
+        "load_dfs_to_tables",
+        lambda: load.load_dfs_to_tables(episodes, shows, genres, db_path=db_path),
+        lambda _: len(episodes) + len(shows) + len(genres),
+    )
+
+    conn = load.connect(db_path)
+    params = {"start": None, "end": None}
+    for name, (_, query) in read.QUERIES.items():
+        measure(
+            results,
+            f"read_sqlite_{name}",
+            lambda: read.execute_query(conn, query, params=params),
+            len,
+        )
+    conn.close()
+    # Las mismas consultas directamente sobre los Parquet limpios
+    for backend_name in parquet_backends.available_backends():
+        backend = parquet_backends.connect(backend_name, data_folder)
+        for name in read.QUERIES:
+            measure(
+                results,
+                f"read_{backend_name}_{name}",
+                lambda: parquet_backends.run_query(backend, name),
+                lambda table: table.num_rows,
+            )
+        backend.close()
+    return {"datos": generated, "etapas": results}
+
+
+def run_all(scales, output):
+    """
+    Corre cada escala en un proceso aparte y guarda un JSON con todos los resultados.
+    :argumento scales: LISTA de INT.
+    :argumento output: STRING con la ruta del JSON de resultados.
+    :return: DICCIONARIO con los resultados.
+    """
+    report = {
+        "commit": git_commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "escalas": {},
+    }
+    for scale in scales:
+        workdir = tempfile.mkdtemp(prefix=f"bench_{scale}x_")
+        result_path = os.path.join(workdir, "result.json")
+        try:
+            subprocess.run(
+                [sys.executable, __file__, "--single-scale", str(scale), "--workdir", workdir],
+                check=True,
+            )
+            with open(result_path, "r", encoding="utf-8") as f:
+                report["escalas"][str(scale)] = json.load(f)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Resultados guardados en {output}")
+    return report
+
+
+def compare(base_path, new_path, threshold):
+    """
+    Compara los tiempos de dos archivos de resultados, etapa por etapa.
+    :argumento base_path: STRING con el JSON de referencia.
+    :argumento new_path: STRING con el JSON nuevo.
+    :argumento threshold: FLOAT, aumento relativo del tiempo a partir del cual hay regresión.
+    :return: BOOL, True si alguna etapa empeoró más del umbral.
+    """
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{base['commit']} -> {new['commit']}")
+    regression = False
+    for scale, new_scale in new["escalas"].items():
+        base_scale = base["escalas"].get(scale)
+        if base_scale is None:
+            continue
+        print(f"\nescala {scale}x")
+        for stage, metrics in new_scale["etapas"].items():
+            before = base_scale["etapas"].get(stage)
+            if before is None:
+                continue
+            ratio = metrics["segundos"] / before["segundos"] if before["segundos"] else float("inf")
+            worse = (
+                ratio > 1 + threshold
+                and metrics["segundos"] - before["segundos"] > NOISE_SECONDS
+            )
+            regression |= worse
+            print(
+                f"  {stage:<32} {before['segundos']:8.3f}s -> {metrics['segundos']:8.3f}s "
+                f"({ratio:5.2f}x){'  REGRESIÓN' if worse else ''}"
+            )
+    return regression
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del ETL por etapa y escala")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--output", help="Ruta del JSON de resultados")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASE", "NUEVO"), help="Compara dos JSON de resultados"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Aumento relativo del tiempo que se considera regresión al comparar",
+    )
+    # Uso interno: corre una sola escala en este proceso
+    parser.add_argument("--single-scale", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(1 if compare(*args.compare, args.threshold) else 0)
+    if args.single_scale:
+        result = run_scale(args.single_scale, args.workdir)
+        with open(os.path.join(args.workdir, "result.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=4)
+    else:
+        output = args.output or os.path.join(
+            RESULTS_FOLDER, f"{time.strftime('%Y%m%d-%H%M%S')}-{git_commit()}.json"
+        )
+        run_all(args.scales, output)
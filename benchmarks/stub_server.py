@@ -0,0 +1,121 @@
+import os
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import common  # noqa: F401  (agrega SRC al path)
+import raw_store
+
+"""
+Servidor HTTP local que imita el endpoint /schedule/web de TVMaze a partir de los
+archivos de la carpeta JSON. Sirve para probar y medir la extracción sin salir a internet.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JSON_FOLDER = os.path.join(BASE_DIR, "..", "JSON")
+
+
+def make_handler(json_folder, latency=0.0, error_rate=0.0, errors=None, retry_after="0"):
+    """
+    Construye el handler del servidor.
+    :argumento json_folder: STRING con la carpeta de donde se leen las respuestas.
+    :argumento latency: FLOAT con los segundos de latencia simulada por petición.
+    :argumento error_rate: FLOAT entre 0 y 1 con la probabilidad de responder 429/503.
+    :argumento errors: LISTA opcional de respuestas para las primeras peticiones, en orden:
+        un código de estado HTTP o "close" para cortar la conexión sin responder.
+    :argumento retry_after: STRING con la cabecera Retry-After de los 429 de `errors`.
+    :return: Clase handler para ThreadingHTTPServer.
+    """
+    scripted = list(errors or [])
+    lock = threading.Lock()
+
+    class ScheduleHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            date = parse_qs(parsed.query).get("date", [""])[0]
+            with lock:
+                self.server.requests.append((time.monotonic(), date))
+                error = scripted.pop(0) if scripted else None
+            if latency:
+                time.sleep(latency)
+            if error == "close":
+                self.close_connection = True
+                return
+            if error is not None:
+                self.send_response(error)
+                if error == 429:
+                    self.send_header("Retry-After", retry_after)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if error_rate and random.random() < error_rate:
+                self.send_response(random.choice([429, 503]))
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            file_path = raw_store.find_raw(json_folder, date)
+            if file_path is None:
+                body = json.dumps([]).encode("utf-8")
+            elif file_path.endswith(".json"):
+                with open(file_path, "rb") as f:
+                    body = f.read()
+            else:
+                body = json.dumps(raw_store.read_raw(file_path)).encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScheduleHandler
+
+
+def start_server(
+    json_folder=JSON_FOLDER, latency=0.0, error_rate=0.0, port=0, errors=None, retry_after="0"
+):
+    """
+    Arranca el servidor en un hilo en segundo plano. Los argumentos son los de make_handler.
+    :return: TUPLA (servidor, base_url) donde base_url apunta a /schedule/web. En
+        servidor.requests queda la lista de peticiones recibidas (instante, fecha).
+    """
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port),
+        make_handler(json_folder, latency, error_rate, errors, retry_after),
+    )
+    server.requests = []
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/schedule/web"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita TVMaze")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json-folder", default=JSON_FOLDER)
+    args = parser.parse_args()
+    server, base_url = start_server(
+        args.json_folder, args.latency, args.error_rate, args.port
+    )
+    print(f"Sirviendo en {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,171 @@
+import os
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+"""
+Generador de datos sintéticos con la misma estructura que la respuesta de /schedule/web de
+TVMaze (episodios con el show embebido), para medir el ETL a escalas mayores que la de los
+datos de enero de 2024 incluidos en la carpeta JSON.
+
+Los valores por defecto reproducen esos datos: 31 días, ~157 episodios por día, ~85% de los
+episodios de shows que ya aparecieron antes y hasta 4 géneros por show.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DAYS = 31
+EPISODES_PER_DAY = 157
+SHOW_OVERLAP = 0.855
+MAX_GENRES = 4
+
+GENRES = [
+    "Drama", "Comedy", "Romance", "Adventure", "Fantasy", "Action", "Crime", "Anime",
+    "Mystery", "Thriller", "History", "Children", "Food", "Sports", "Travel", "Music",
+    "Family", "Science-Fiction", "War", "Supernatural", "Medical", "Nature", "Horror",
+    "DIY", "Legal", "Adult",
+]
+TYPES = ["Scripted", "Animation", "Documentary", "Reality", "Talk Show", "News", "Variety"]
+LANGUAGES = ["English", "Chinese", "Russian", "Japanese", "Korean", "Spanish", "German", None]
+STATUSES = ["Running", "Ended", "To Be Determined"]
+WEB_CHANNELS = [
+    ("YouTube", "https://www.youtube.com"),
+    ("Tencent QQ", "https://v.qq.com/"),
+    ("BBC iPlayer", "https://www.bbc.co.uk/iplayer"),
+    ("Netflix", "https://www.netflix.com/"),
+    ("Prime Video", "https://www.primevideo.com"),
+    ("iQiyi", None),
+]
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SITE_DOMAINS = 200  # dominios distintos para officialSite
+
+
+def make_show(show_id, rng, max_genres=MAX_GENRES):
+    """
+    Crea un show con los campos que usa el ETL.
+    :argumento show_id: INT con el id del show.
+    :argumento rng: random.Random
+    :argumento max_genres: INT con el máximo de géneros del show.
+    :return: DICCIONARIO con el show.
+    """
+    premiered = date(2000, 1, 1) + timedelta(days=rng.randrange(9000))
+    channel = rng.choice(WEB_CHANNELS)
+    runtime = rng.choice([15, 20, 25, 30, 45, 60, None])
+    site = (
+        f"https://www.site{rng.randrange(SITE_DOMAINS)}.com/shows/{show_id}"
+        if rng.random() < 0.89
+        else None
+    )
+    return {
+        "id": show_id,
+        "url": f"https://www.tvmaze.com/shows/{show_id}/show-{show_id}",
+        "name": f"Show {show_id}",
+        "type": rng.choice(TYPES),
+        "language": rng.choice(LANGUAGES),
+        "genres": rng.sample(GENRES, rng.randint(0, max_genres)),
+        "status": rng.choice(STATUSES),
+        "runtime": runtime,
+        "averageRuntime": runtime or rng.choice([22, 40, 50]),
+        "premiered": premiered.isoformat(),
+        "ended": (premiered + timedelta(days=365)).isoformat() if rng.random() < 0.25 else None,
+        "officialSite": site,
+        "schedule": {
+            "time": rng.choice(["", "10:00", "12:00", "20:00"]),
+            "days": rng.sample(DAYS_OF_WEEK, rng.randint(0, 2)),
+        },
+        "rating": {"average": round(rng.uniform(5, 9), 1) if rng.random() < 0.2 else None},
+        "weight": rng.randrange(101),
+        "network": None,
+        "webChannel": {"id": WEB_CHANNELS.index(channel), "name": channel[0], "officialSite": channel[1]},
+        "dvdCountry": None,
+        "externals": {
+            "tvrage": None,
+            "thetvdb": rng.randrange(70000, 460000) if rng.random() < 0.7 else None,
+            "imdb": f"tt{rng.randrange(10**7, 10**8)}" if rng.random() < 0.5 else None,
+        },
+        "image": None,
+        "summary": f"<p>Resumen del show <b>{show_id}</b>.</p>" if rng.random() < 0.86 else None,
+        "updated": 1700000000 + rng.randrange(40000000),
+        "_links": {"self": {"href": f"https://api.tvmaze.com/shows/{show_id}"}},
+    }
+
+
+def generate(
+    json_folder,
+    days=DAYS,
+    episodes_per_day=EPISODES_PER_DAY,
+    show_overlap=SHOW_OVERLAP,
+    max_genres=MAX_GENRES,
+    start=date(2024, 1, 1),
+    seed=0,
+):
+    """
+    Escribe un archivo tv_shows_YYYY-MM-DD.json por día en json_folder.
+    :argumento json_folder: STRING con la carpeta destino.
+    :argumento days: INT con el número de días.
+    :argumento episodes_per_day: INT con los episodios por día.
+    :argumento show_overlap: FLOAT entre 0 y 1, probabilidad de que un episodio sea de un show
+        que ya apareció (el resto crea un show nuevo).
+    :argumento max_genres: INT con el máximo de géneros por show.
+    :argumento start: date con el primer día.
+    :argumento seed: INT semilla del generador aleatorio.
+    :return: DICCIONARIO con la cantidad de días, episodios y shows generados.
+    """
+    os.makedirs(json_folder, exist_ok=True)
+    rng = random.Random(seed)
+    shows, episode_id = [], 1
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        episodes = []
+        for _ in range(episodes_per_day):
+            if shows and rng.random() < show_overlap:
+                show = rng.choice(shows)
+            else:
+                show = make_show(len(shows) + 1, rng, max_genres)
+                shows.append(show)
+            airtime = rng.choice(["", "06:00", "10:00", "12:00", "20:00", "23:35"])
+            episodes.append(
+                {
+                    "id": episode_id,
+                    "url": f"https://www.tvmaze.com/episodes/{episode_id}",
+                    "name": f"Episode {rng.randint(1, 20)}",
+                    "season": rng.choice([1, 1, 1, 2, 3, 2024]),
+                    "number": rng.randint(1, 200) if rng.random() < 0.99 else None,
+                    "type": "regular" if rng.random() < 0.99 else "insignificant_special",
+                    "airdate": day,
+                    "airtime": airtime,
+                    "airstamp": f"{day}T{airtime or '00:00'}:00+00:00",
+                    "runtime": show["averageRuntime"] if rng.random() < 0.9 else None,
+                    "rating": {"average": 7.5 if rng.random() < 0.07 else None},
+                    "image": None,
+                    "summary": None,
+                    "_links": {"self": {"href": f"https://api.tvmaze.com/episodes/{episode_id}"}},
+                    "_embedded": {"show": show},
+                }
+            )
+            episode_id += 1
+        with open(os.path.join(json_folder, f"tv_shows_{day}.json"), "w", encoding="utf-8") as f:
+            json.dump(episodes, f, indent=4)
+    return {"days": days, "episodes": episode_id - 1, "shows": len(shows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera JSON sintéticos con el formato de TVMaze")
+    parser.add_argument("json_folder")
+    parser.add_argument("--days", type=int, default=DAYS)
+    parser.add_argument("--episodes-per-day", type=int, default=EPISODES_PER_DAY)
+    parser.add_argument("--show-overlap", type=float, default=SHOW_OVERLAP)
+    parser.add_argument("--max-genres", type=int, default=MAX_GENRES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(
+        generate(
+            args.json_folder,
+            args.days,
+            args.episodes_per_day,
+            args.show_overlap,
+            args.max_genres,
+            seed=args.seed,
+        )
+    )
@@ -0,0 +1,91 @@
+import pandas as pd
+
+"""
+Copia congelada de transform_data tal como estaba en dfs_creation.py antes de la versión
+columnar. Es la referencia de tests/test_transform.py y no se debe modificar: así los cambios
+en SRC o en benchmarks no cambian lo que verifican las pruebas.
+"""
+
+
+def transform_data(json_data: list) -> tuple:
+    """
+    Transforma los datos JSON en DataFrames normalizados para episodios y shows.
+
+    :argumento json_data: LISTA de diccionarios con los datos extraídos de los archivos JSON.
+    :return: TUPLA de dos DataFrames (episodes_df, shows_df).
+    """
+
+    episodes_list = []  # Lista para episodios
+    shows_dict = {}  # Diccionario para series (evita duplicados)
+
+    for item in json_data:
+        show_data = item.get("_embedded", {}).get(
+            "show", {}
+        )  # Extraer info del show (serie)
+
+        # Extraer ID del show
+        show_id = show_data.get("id")
+
+        # Guardar información de la serie si aún no está
+        if show_id and show_id not in shows_dict:
+            shows_dict[show_id] = {
+                "id": show_id,
+                "url": show_data.get("url", pd.NA),
+                "name": show_data.get("name", pd.NA),
+                "type": show_data.get("type", pd.NA),
+                "language": show_data.get("language", pd.NA),
+                "genres": show_data.get("genres") if show_data.get("genres") else pd.NA,
+                "status": show_data.get("status", pd.NA),
+                "runtime": show_data.get("runtime", pd.NA),
+                "averageRuntime": show_data.get("averageRuntime", pd.NA),
+                "premiered": show_data.get("premiered", pd.NA),
+                "ended": show_data.get("ended", pd.NA),
+                "officialSite": show_data.get("officialSite", pd.NA),
+                "schedule_time": show_data.get("schedule", {}).get("time", pd.NA),
+                "schedule_days": (
+                    show_data.get("schedule", {}).get("days")
+                    if show_data.get("schedule", {}).get("days")
+                    else pd.NA
+                ),
+                "rating": show_data.get("rating", {}).get("average", pd.NA),
+                "weight": show_data.get("weight", pd.NA),
+                "summary": show_data.get("summary", pd.NA),
+                "webChannel_name": (show_data.get("webChannel") or {}).get(
+                    "name", pd.NA
+                ),
+                "webChannel_site": (show_data.get("webChannel") or {}).get(
+                    "officialSite", pd.NA
+                ),
+                "dvd_country": show_data.get("dvdCountry", pd.NA),
+                "externals_tvrage": (show_data.get("externals") or {}).get(
+                    "tvrage", pd.NA
+                ),
+                "externals_thetvdb": (show_data.get("externals") or {}).get(
+                    "thetvdb", pd.NA
+                ),
+                "externals_imdb": (show_data.get("externals") or {}).get("imdb", pd.NA),
+                "updated": show_data.get("updated", pd.NA),
+            }
+
+        # Guardar episodio con referencia al show
+        episodes_list.append(
+            {
+                "id": item.get("id", pd.NA),
+                "name": item.get("name", pd.NA),
+                "season": item.get("season", pd.NA),
+                "number": item.get("number", pd.NA),
+                "type": item.get("type", pd.NA),
+                "airdate": item.get("airdate", pd.NA),
+                "airtime": item.get("airtime", pd.NA),
+                "airstamp": item.get("airstamp", pd.NA),
+                "runtime": item.get("runtime", pd.NA),
+                "rating": item.get("rating", {}).get("average", pd.NA),
+                "show_id": show_id,  # Clave foránea para relacionarlo con la serie
+            }
+        )
+
+    # Convertimos datos procesados a dataframes
+    episodes_df = pd.DataFrame(episodes_list)
+    shows_df = pd.DataFrame(shows_dict.values())
+
+    return episodes_df, shows_df
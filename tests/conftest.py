@@ -0,0 +1,53 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+"""
+Agrega SRC y benchmarks al path para que las pruebas importen los scripts del ETL y el
+servidor local de benchmarks/stub_server.py que imita la API, y arma los datos limpios que
+comparten las pruebas.
+"""
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BASE_DIR, "fixtures")
+for folder in ("SRC", "benchmarks"):
+    path = os.path.join(BASE_DIR, "..", folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def fixture_records():
+    """
+    :return: LISTA con los episodios del 1 de enero de 2024 guardados en tests/fixtures.
+    """
+    path = os.path.join(FIXTURES, "tv_shows_2024-01-01.json.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def clean_data(tmp_path_factory):
+    """
+    Transforma, limpia y guarda el día de tests/fixtures en Parquet y en SQLite, en una carpeta
+    con un apóstrofo en la ruta.
+    :return: TUPLA (carpeta de los Parquet limpios, ruta de la base de datos).
+    """
+    import clean
+    import dfs_creation
+    import load
+
+    workdir = tmp_path_factory.mktemp("clean") / "datos d'enero"
+    data_folder = str(workdir / "DATA")
+    db_path = str(workdir / "entretenimiento.db")
+    episodes, shows = dfs_creation.transform_data(fixture_records())
+    episodes, shows = clean.delete_unnecessary_columns(episodes, shows)
+    genres, shows = clean.genres_creation(shows)
+    shows = clean.domains_creation(shows)
+    shows = clean.strip_html(shows)
+    clean.save_as_parquet(episodes, shows, genres, mode="overwrite", data_folder=data_folder)
+    assert load.create_tables(db_path=db_path)
+    assert load.load_dfs_to_tables(episodes, shows, genres, db_path=db_path)
+    return data_folder, db_path
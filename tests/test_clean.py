@@ -0,0 +1,25 @@
+import pandas as pd
+
+import clean
+
+"""
+Pruebas de clean.strip_html.
+"""
+
+
+def test_strip_html_unescapes_before_removing_tags():
+    shows = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "summary": [
+                "<p><b>Uno</b> &amp; dos</p>",
+                "&lt;b&gt;Escapado&lt;/b&gt; &lt;br /&gt;texto",
+                "Tres\n\n<br />  espacios&nbsp;de más",
+                "<p> </p>",
+                None,
+            ],
+        }
+    )
+    result = clean.strip_html(shows)["summary"]
+    assert result.iloc[:3].tolist() == ["Uno & dos", "Escapado texto", "Tres espacios de más"]
+    assert result.iloc[3:].isna().all()
@@ -0,0 +1,50 @@
+import pandas as pd
+
+import clean
+import validate
+
+"""
+Pruebas de clean.domains_creation con índices que no son 0..n-1, como los que deja
+validate.split_rows al apartar filas en cuarentena.
+"""
+
+SITES = [
+    "https://www.premier.one/show/1",
+    "https://iview.abc.net.au/show/2",
+    "https://v.qq.com/x/3",
+]
+EXPECTED = ["premier.one", "abc.net.au", "qq.com"]
+
+
+def make_shows(index=None):
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "name": ["Uno", "Dos", "Tres"],
+            "url": [f"https://www.tvmaze.com/shows/{i}" for i in (1, 2, 3)],
+            "officialSite": SITES,
+            "webChannel_site": [None, "https://iview.abc.net.au", None],
+            "averageRuntime": [30.0, 45.0, 60.0],
+            "weight": [50, 60, 70],
+            "premiered": ["2020-01-01", "2021-01-01", "2022-01-01"],
+            "ended": [None, None, None],
+        },
+        index=index,
+    )
+
+
+def test_domains_follow_rows_with_gapped_index():
+    shows = clean.domains_creation(make_shows(index=[5, 6, 7]))
+    assert shows["officialSite_domain"].astype(object).tolist() == EXPECTED
+    assert shows["webChannel_domain"].isna().tolist() == [True, False, True]
+    assert shows.loc[6, "webChannel_domain"] == "abc.net.au"
+    assert shows["url_domain"].astype(object).tolist() == ["tvmaze.com"] * 3
+
+
+def test_domains_after_quarantined_show():
+    shows = make_shows()
+    shows.loc[0, "weight"] = 500
+    valid, quarantined, _ = validate.split_rows(shows, validate.SHOW_RULES)
+    assert quarantined["id"].tolist() == [1]
+    valid = clean.domains_creation(valid)
+    assert valid["officialSite_domain"].astype(object).tolist() == EXPECTED[1:]
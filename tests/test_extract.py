@@ -0,0 +1,99 @@
+import time
+
+import pytest
+import requests
+
+import extract
+from stub_server import start_server
+
+"""
+Pruebas del token bucket y de los reintentos de extract.py contra el servidor local de
+benchmarks/stub_server.py.
+"""
+
+# Las pruebas del límite corren 10 veces más rápido que la API: 20 peticiones por segundo
+SPEEDUP = 10
+
+
+@pytest.fixture
+def stub(tmp_path):
+    servers = []
+
+    def start(**kwargs):
+        server, base_url = start_server(str(tmp_path), **kwargs)
+        servers.append(server)
+        return server, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def max_in_window(times, window):
+    times = sorted(times)
+    return max(sum(1 for t in times[i:] if t <= start + window) for i, start in enumerate(times))
+
+
+def test_default_limits_fit_the_api_window():
+    assert (
+        extract.RATE_LIMIT_BURST + extract.RATE * extract.RATE_LIMIT_PERIOD
+        <= extract.RATE_LIMIT_CALLS
+    )
+
+
+def test_fetch_respects_rate_limit(stub):
+    server, base_url = stub()
+    dates = extract.date_range("2024-01-01", "2024-02-09")
+    summary = extract.fetch_date_range(
+        dates[0],
+        dates[-1],
+        max_workers=8,
+        rate_limit=extract.RATE * SPEEDUP,
+        burst=extract.RATE_LIMIT_BURST,
+        base_url=base_url,
+        on_result=lambda date, data: True,
+    )
+    assert len(summary["latencies"]) == len(dates)
+    times = [t for t, _ in server.requests]
+    window = extract.RATE_LIMIT_PERIOD / SPEEDUP
+    assert max_in_window(times, window) <= extract.RATE_LIMIT_CALLS
+    # Con el bucket lleno al empezar y una ráfaga de 20 salían casi 40 en la primera ventana
+    assert max(times) - min(times) >= (len(dates) - extract.RATE_LIMIT_BURST) / (
+        extract.RATE * SPEEDUP
+    ) * 0.9
+
+
+def test_retry_after_is_respected(stub):
+    server, base_url = stub(errors=[429], retry_after="1")
+    started = time.perf_counter()
+    response = extract.get_with_retries(f"{base_url}?date=2024-01-01", backoff_factor=0.01)
+    assert response.status_code == 200
+    assert len(server.requests) == 2
+    assert time.perf_counter() - started >= 1
+
+
+def test_server_and_connection_errors_are_retried(stub):
+    server, base_url = stub(errors=[500, 503, "close"])
+    response = extract.get_with_retries(f"{base_url}?date=2024-01-01", backoff_factor=0.01)
+    assert response.json() == []
+    assert len(server.requests) == 4
+
+
+def test_gives_up_after_max_retries(stub):
+    server, base_url = stub(errors=[503] * 3)
+    with pytest.raises(requests.exceptions.HTTPError):
+        extract.get_with_retries(
+            f"{base_url}?date=2024-01-01", max_retries=2, backoff_factor=0.01
+        )
+    assert len(server.requests) == 3
+
+
+def test_connection_refused_raises_after_retries(stub):
+    server, base_url = stub()
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        extract.get_with_retries(
+            f"{base_url}?date=2024-01-01", max_retries=1, backoff_factor=0.01
+        )
@@ -0,0 +1,80 @@
+import pytest
+
+import extract
+import http_cache
+import raw_store
+from stub_server import start_server
+
+"""
+Pruebas de la extracción incremental (extract.fetch_date_range con HttpCache) contra el
+servidor local de benchmarks/stub_server.py.
+"""
+
+START, END = "2024-01-01", "2024-01-03"
+
+
+@pytest.fixture
+def server(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for date in ("2024-01-01", "2024-01-02"):  # 2024-01-03 queda vacío
+        raw_store.write_raw([{"id": 1, "airdate": date}], str(source), date)
+    server, base_url = start_server(str(source))
+    yield source, base_url
+    server.shutdown()
+
+
+def fetch(base_url, folder, on_result=None):
+    return extract.fetch_date_range(
+        START,
+        END,
+        max_workers=2,
+        rate_limit=1000,
+        base_url=base_url,
+        on_result=on_result or (lambda date, data: extract.save_day(data, date, str(folder))),
+        cache=http_cache.HttpCache(str(folder)),
+    )
+
+
+def test_unchanged_days_are_not_reported_again(server, tmp_path):
+    source, base_url = server
+    folder = tmp_path / "JSON"
+    folder.mkdir()
+    first = fetch(base_url, folder)
+    assert first["status"] == {d: "new" for d in extract.date_range(START, END)}
+    assert raw_store.find_raw(str(folder), "2024-01-03") is None
+
+    second = fetch(base_url, folder)
+    # El día vacío también se pide de forma condicional y no vuelve a darse por cambiado
+    assert set(second["status"].values()) == {"not_modified"}
+
+    raw_store.write_raw([{"id": 2, "airdate": "2024-01-02"}], str(source), "2024-01-02")
+    third = fetch(base_url, folder)
+    assert third["status"]["2024-01-02"] == "changed"
+
+
+def test_changed_dates_accumulate_until_consumed(server, tmp_path):
+    source, base_url = server
+    folder = tmp_path / "JSON"
+    folder.mkdir()
+    fetch(base_url, folder)
+    raw_store.write_raw([{"id": 2, "airdate": "2024-01-02"}], str(source), "2024-01-02")
+    fetch(base_url, folder)
+    assert http_cache.changed_dates(str(folder)) == extract.date_range(START, END)
+
+    http_cache.mark_consumed(str(folder), ["2024-01-01", "2024-01-02"])
+    assert http_cache.changed_dates(str(folder)) == ["2024-01-03"]
+
+
+def test_failed_write_is_not_recorded(server, tmp_path):
+    _, base_url = server
+    folder = tmp_path / "JSON"
+    folder.mkdir()
+    result = fetch(base_url, folder, on_result=lambda date, data: date != "2024-01-02")
+    assert list(result["failed"]) == ["2024-01-02"]
+    assert "2024-01-02" not in http_cache.read_manifest(str(folder))["dates"]
+    assert "2024-01-02" not in http_cache.changed_dates(str(folder))
+
+    retry = fetch(base_url, folder)
+    assert retry["status"]["2024-01-02"] == "new"
+    assert raw_store.find_raw(str(folder), "2024-01-02") is not None
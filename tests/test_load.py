@@ -0,0 +1,35 @@
+import load
+
+"""
+Pruebas de la creación de tablas y las migraciones de load.py.
+"""
+
+
+def index_names(db_path):
+    conn = load.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    return names, version
+
+
+def test_migrations_run_once(tmp_path):
+    db_path = str(tmp_path / "entretenimiento.db")
+    assert load.create_tables(db_path=db_path)
+    conn = load.connect(db_path)
+    conn.execute("PRAGMA user_version = 0")
+    conn.execute("CREATE INDEX idx_episodes_show_id ON episodes (show_id)")
+    conn.close()
+
+    # Base de una versión anterior: la migración borra el índice viejo
+    assert load.create_tables(db_path=db_path)
+    names, version = index_names(db_path)
+    assert "idx_episodes_show_id" not in names
+    assert version == len(load.MIGRATIONS)
+
+    # Ya migrada: create_tables no vuelve a tocar los índices
+    conn = load.connect(db_path)
+    conn.execute("CREATE INDEX idx_episodes_show_id ON episodes (show_id)")
+    conn.close()
+    assert load.create_tables(db_path=db_path)
+    assert "idx_episodes_show_id" in index_names(db_path)[0]
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+import load
+import parquet_backends
+import read
+
+"""
+Verifica que los backends de parquet_backends.py devuelvan lo mismo que las consultas SQLite
+de read.py, sobre los datos de tests/fixtures guardados en una carpeta con un apóstrofo en la
+ruta. El backend duckdb se omite si DuckDB no está instalado.
+"""
+
+
+def normalized(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("backend_name", ["arrow", "duckdb"])
+def test_backend_matches_sqlite(clean_data, backend_name):
+    if backend_name == "duckdb":
+        pytest.importorskip("duckdb")
+    data_folder, db_path = clean_data
+    backend = parquet_backends.connect(backend_name, data_folder)
+    conn = load.connect(db_path)
+    try:
+        cases = [(name, None, None) for name in read.QUERIES]
+        cases.append(("episodes_by_day", "2024-01-01", "2024-01-01"))
+        cases.append(("episodes_by_day", "2024-02-01", "2024-02-07"))
+        for name, start, end in cases:
+            expected = pd.read_sql(read.QUERIES[name][1], conn, params={"start": start, "end": end})
+            result = backend.query(name, start, end).to_pandas()[list(expected.columns)]
+            pd.testing.assert_frame_equal(
+                normalized(expected), normalized(result), check_dtype=False
+            )
+    finally:
+        conn.close()
+        backend.close()
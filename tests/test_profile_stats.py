@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+
+import profile_stats
+
+"""
+Pruebas de los perfiles por partición de profile_stats.py.
+"""
+
+
+def make_episodes(ids, airdates, runtimes):
+    return pd.DataFrame(
+        {
+            "id": pd.array(ids, dtype="Int64"),
+            "airdate": pd.array(airdates, dtype="string"),
+            "runtime": pd.array(runtimes, dtype="Int32"),
+        }
+    )
+
+
+def test_partition_spread_over_chunks_is_merged(tmp_path):
+    first = make_episodes(
+        [1, 2, 3, 4], ["2024-01-01", "2024-01-01", "2024-01-02", None], [30, 60, 45, 20]
+    )
+    second = make_episodes([5, 6], ["2024-01-01", "2024-01-01"], [None, 90])
+
+    streamed = {}
+    for chunk in (first, second):
+        profile_stats.merge_partition_profiles(
+            streamed, profile_stats.profile_by_partition(chunk, "airdate", str(tmp_path / "a"))
+        )
+    profile_stats.save_partition_profiles(streamed, str(tmp_path / "a"))
+    profile_stats.profile_partitions(
+        pd.concat([first, second], ignore_index=True), "airdate", str(tmp_path / "b")
+    )
+
+    assert sorted(os.listdir(tmp_path / "a")) == [
+        "2024-01-01.json",
+        "2024-01-02.json",
+        f"{profile_stats.NULL_PARTITION}.json",
+    ]
+    for name in os.listdir(tmp_path / "b"):
+        expected = profile_stats.load_profile(str(tmp_path / "b" / name))
+        result = profile_stats.load_profile(str(tmp_path / "a" / name))
+        assert result["rows"] == expected["rows"]
+        for column, stats in expected["columns"].items():
+            merged = result["columns"][column]
+            for field in ("count", "nulls", "min", "max", "sum", "n", "sketch"):
+                assert merged.get(field) == stats.get(field), (name, column, field)
+    assert profile_stats.load_profile(str(tmp_path / "a" / "2024-01-01.json"))["rows"] == 4
+
+
+def test_existing_partitions_are_skipped_unless_refreshed(tmp_path):
+    folder = str(tmp_path)
+    episodes = make_episodes([1, 2], ["2024-01-01", "2024-01-02"], [30, 60])
+    profile_stats.profile_partitions(episodes, "airdate", folder)
+    assert profile_stats.profile_by_partition(episodes, "airdate", folder) == {}
+    refreshed = profile_stats.profile_by_partition(
+        episodes, "airdate", folder, refresh=["2024-01-02"]
+    )
+    assert list(refreshed) == ["2024-01-02"]
@@ -0,0 +1,54 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import load
+import query_service
+
+"""
+Pruebas del servicio de consultas sobre una base vacía creada con load.create_tables.
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "entretenimiento.db")
+    assert load.create_tables(db_path=db_path)
+    service = query_service.QueryService(db_path, pool_size=2)
+    yield service
+    service.close()
+
+
+def test_result_read_under_new_version_is_not_cached(service):
+    service.query("genre_counts")
+    assert len(service.cache) == 1
+    # Una carga incrementa la versión, pero el servicio todavía no la consultó
+    conn = load.connect(service.pool.db_path)
+    with conn:
+        load.bump_load_version(conn)
+    conn.close()
+    service.version_checked = float("inf")
+    with service.lock:
+        service.cache.clear()
+    service.query("genre_counts")
+    assert len(service.cache) == 0
+
+
+def test_http_rejects_unknown_params(service):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), query_service.make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/genre_counts?name=x")
+        assert error.value.code == 400
+        assert "name" in json.loads(error.value.read())["error"]
+        with urllib.request.urlopen(f"{base_url}/genre_counts?limit=2") as response:
+            assert json.loads(response.read())["rows"] == []
+    finally:
+        server.shutdown()
+        server.server_close()
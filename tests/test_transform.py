@@ -0,0 +1,107 @@
+import pandas as pd
+
+import baseline_transform
+import schema
+from conftest import fixture_records
+from dfs_creation import transform_data
+
+"""
+Verifica que transform_data (columnar) dé los mismos DataFrames y CSV que la implementación
+original por fila (copia congelada en tests/baseline_transform.py), sobre el 1 de enero de
+2024 (tests/fixtures) y sobre días armados a mano con los casos que esos datos no cubren.
+"""
+
+def check_equivalence(records):
+    """
+    Lanza AssertionError si los DataFrames o sus CSV difieren entre ambas implementaciones.
+    La implementación original infería los dtypes, así que se le aplican los de schema.py.
+    """
+    old_episodes, old_shows = baseline_transform.transform_data(records)
+    old_episodes = schema.apply_dtypes(old_episodes, schema.EPISODES)
+    old_shows = schema.apply_dtypes(old_shows, schema.SHOWS)
+    new_episodes, new_shows = transform_data(records)
+    for old, new in ((old_episodes, new_episodes), (old_shows, new_shows)):
+        pd.testing.assert_frame_equal(old, new)
+        assert old.to_csv(index=False) == new.to_csv(index=False)
+
+
+def make_show(show_id, **fields):
+    """
+    :return: DICCIONARIO con un show de TVMaze con los campos que usa el ETL.
+    """
+    show = {
+        "id": show_id,
+        "url": f"https://www.tvmaze.com/shows/{show_id}",
+        "name": f"Show {show_id}",
+        "type": "Scripted",
+        "language": "English",
+        "genres": ["Drama", "Comedy"],
+        "status": "Running",
+        "runtime": 30,
+        "averageRuntime": 30,
+        "premiered": "2020-01-01",
+        "ended": None,
+        "officialSite": f"https://www.site{show_id}.com/",
+        "schedule": {"time": "20:00", "days": ["Monday"]},
+        "rating": {"average": 7.5},
+        "weight": 90,
+        "webChannel": {"id": 1, "name": "Netflix", "officialSite": "https://www.netflix.com/"},
+        "dvdCountry": None,
+        "externals": {"tvrage": None, "thetvdb": 12345, "imdb": "tt1234567"},
+        "summary": "<p>Resumen</p>",
+        "updated": 1700000000,
+    }
+    show.update(fields)
+    return show
+
+
+def make_episode(episode_id, show, **fields):
+    """
+    :return: DICCIONARIO con un episodio de TVMaze con el show embebido.
+    """
+    episode = {
+        "id": episode_id,
+        "name": f"Episode {episode_id}",
+        "season": 1,
+        "number": episode_id,
+        "type": "regular",
+        "airdate": "2024-02-01",
+        "airtime": "20:00",
+        "airstamp": "2024-02-01T20:00:00+00:00",
+        "runtime": 30,
+        "rating": {"average": None},
+        "_embedded": {"show": show},
+    }
+    episode.update(fields)
+    return episode
+
+
+def test_fixture_day():
+    check_equivalence(fixture_records())
+
+
+def test_integer_numbers():
+    # Todos los number son enteros: la inferencia de pandas da int64, no float64
+    shows = [make_show(1), make_show(2, weight=0)]
+    check_equivalence([make_episode(i, shows[i % 2]) for i in range(1, 6)])
+
+
+def test_missing_values():
+    shows = [
+        make_show(1, genres=[], schedule={"time": "", "days": []}, webChannel=None),
+        make_show(2, runtime=None, rating={"average": None}, externals={}, summary=None),
+    ]
+    check_equivalence(
+        [
+            make_episode(1, shows[0], number=None, runtime=None),
+            make_episode(2, shows[1], rating={"average": 8.1}),
+            make_episode(3, shows[0], season=2024, airtime=""),
+        ]
+    )
+
+
+def test_repeated_shows_keep_first():
+    show = make_show(1)
+    records = [make_episode(i, show) for i in range(1, 4)]
+    records.append(make_episode(4, make_show(1, name="Otro nombre")))
+    check_equivalence(records)